@@ -0,0 +1,260 @@
+'''
+bench.py
+Reproducible benchmarks over the bundled namematcher.sqlite
+
+Usage:
+    python benchmarks/bench.py --sizes 10 100 --output results.json
+    python benchmarks/bench.py --compare results.json
+
+'''
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from namematcher.blocking import NgramIndex  # noqa: E402
+from namematcher.choices import Choices  # noqa: E402
+from namematcher.db import setup  # noqa: E402
+from namematcher.match import match_fuzzy, match_name  # noqa: E402
+from namematcher.name import (first_last, namestrip,  # noqa: E402
+                              parse_cache_clear)
+from namematcher.xref import Site  # noqa: E402
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+DB_FILE = os.path.join(os.path.dirname(__file__), '..', 'namematcher.sqlite')
+SEED = 20200101
+
+
+def timeit(func, repeat, before=None):
+    '''
+    Wall times of repeated calls
+
+    Args:
+        func(callable): no arguments
+        repeat(int): number of calls
+        before(callable): untimed, called before each call, default None
+
+    Returns:
+        list: of float seconds
+
+    '''
+    times = []
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+class Fixtures:
+    '''
+    Deterministic inputs drawn from the database
+
+    '''
+    def __init__(self, database_file=DB_FILE):
+        self.database_file = database_file
+        base, eng, session = setup(database='sqlite',
+                                   database_file=database_file)
+        self.site = Site(base=base, eng=eng, session=session)
+        self.base_players = self.site.get_base_players()
+        self.full_names = [p['full_name'] for p in self.base_players]
+        xref = base.classes.player_xref.__table__
+        with eng.connect() as conn:
+            rows = conn.execute(xref.select()).fetchall()
+        self.xrefs = [dict(r._mapping) for r in rows]
+        self.choices = Choices(self.full_names)
+        self.index = NgramIndex(self.full_names)
+
+    def names(self, n):
+        '''
+        n source player names, the same on every run
+
+        '''
+        rnd = random.Random('{}-{}'.format(SEED, n))
+        return [r['source_player_name']
+                for r in rnd.sample(self.xrefs, min(n, len(self.xrefs)))]
+
+    def records(self, n):
+        '''
+        n xref records shaped like Site.get_source_players
+
+        '''
+        rnd = random.Random('{}-{}'.format(SEED, n))
+        return [{k: str(v) for k, v in r.items()}
+                for r in rnd.sample(self.xrefs, min(n, len(self.xrefs)))]
+
+
+def benchmarks(fx):
+    '''
+    Benchmarks by name, each a function of input size
+    that returns the callable to time, or a (before, callable) pair
+    where before runs untimed ahead of every call
+
+    Args:
+        fx(Fixtures):
+
+    Returns:
+        dict
+
+    '''
+    def each(func, names):
+        return lambda: [func(nm) for nm in names]
+
+    return {
+        'db.setup': lambda n: lambda: setup(database='sqlite',
+                                            database_file=fx.database_file),
+        'namestrip': lambda n: each(namestrip, fx.names(n)),
+        # parse_name is cached: cold clears the cache before each call,
+        # warm repeats over names already parsed
+        'first_last': lambda n: (parse_cache_clear,
+                                 each(first_last, fx.names(n))),
+        'first_last.warm': lambda n: each(first_last, fx.names(n)),
+        'match_name': lambda n: each(
+            lambda nm: match_name(nm, fx.full_names), fx.names(n)),
+        'match_fuzzy': lambda n: each(
+            lambda nm: match_fuzzy(nm, fx.full_names), fx.names(n)),
+        'match_fuzzy.choices': lambda n: each(
+            lambda nm: match_fuzzy(nm, fx.choices, thresh=90), fx.names(n)),
+        'match_fuzzy.blocking': lambda n: each(
+            lambda nm: match_fuzzy(nm, fx.choices, index=fx.index, thresh=90),
+            fx.names(n)),
+        'Site.match': lambda n: (lambda records: lambda: fx.site.match(
+            [dict(r) for r in records], fx.base_players,
+            id_keys=(None, 'player_id')))(fx.records(n)),
+        'Site.match.blocking': lambda n: (lambda records: lambda: fx.site.match(
+            [dict(r) for r in records], fx.base_players,
+            id_keys=(None, 'player_id'), blocking=True))(fx.records(n)),
+        'make_source_based': lambda n: (lambda names: lambda:
+            fx.site.make_source_based(names))(fx.names(n)),
+    }
+
+
+# benchmarks that do not depend on input size
+UNSIZED = ('db.setup',)
+
+# benchmarks run once untimed first, so every timed call is warm
+WARM = ('first_last.warm',)
+
+
+def run(sizes, repeat=3, only=None, database_file=DB_FILE):
+    '''
+    Runs benchmarks at each size
+
+    Args:
+        sizes(list): of int
+        repeat(int): timed calls per benchmark and size, default 3
+        only(list): benchmark names to run, default all
+        database_file(str): default the bundled database
+
+    Returns:
+        dict: meta and results
+
+    '''
+    logging.getLogger().setLevel(logging.WARNING)
+    fx = Fixtures(database_file)
+    results = []
+    for name, make in benchmarks(fx).items():
+        if only and name not in only:
+            continue
+        for size in ([1] if name in UNSIZED else sizes):
+            func, before = make(size), None
+            if isinstance(func, tuple):
+                before, func = func
+            elif name in WARM:
+                func()
+            times = timeit(func, repeat, before)
+            results.append({
+                'name': name,
+                'size': size,
+                'repeat': repeat,
+                'best': min(times),
+                'mean': statistics.mean(times),
+                'per_item': min(times) / size
+            })
+            print('{:<24}{:>8}{:>12.4f}s{:>12.6f}s/item'.format(
+                name, size, min(times), min(times) / size), file=sys.stderr)
+    return {'meta': meta(), 'results': results}
+
+
+def meta():
+    '''
+    Environment the benchmarks ran in
+
+    Returns:
+        dict
+
+    '''
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'],
+                                capture_output=True, text=True,
+                                cwd=os.path.dirname(__file__)).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'commit': commit or None,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'seed': SEED
+    }
+
+
+def compare(current, baseline):
+    '''
+    Ratio of current to baseline best time per benchmark and size
+
+    Args:
+        current(dict): from run
+        baseline(dict): from run
+
+    Returns:
+        list: of dict
+
+    '''
+    before = {(r['name'], r['size']): r['best'] for r in baseline['results']}
+    return [{'name': r['name'], 'size': r['size'],
+             'baseline': before[r['name'], r['size']], 'best': r['best'],
+             'ratio': r['best'] / before[r['name'], r['size']]}
+            for r in current['results'] if (r['name'], r['size']) in before]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='namematcher benchmarks')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', nargs='+', help='benchmark names')
+    parser.add_argument('--output', help='write results as JSON')
+    parser.add_argument('--compare', help='baseline JSON to compare against')
+    parser.add_argument('--database-file', default=DB_FILE)
+    args = parser.parse_args(argv)
+    results = run(args.sizes, args.repeat, args.only, args.database_file)
+    if args.compare:
+        with open(args.compare) as f:
+            results['comparison'] = compare(results, json.load(f))
+        for r in results['comparison']:
+            print('{:<24}{:>8}{:>10.2f}x'.format(r['name'], r['size'],
+                                                r['ratio']), file=sys.stderr)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,3 +1,9 @@
+from .alias import AliasIndex
+from .blocking import NgramIndex
+from .cache import MatchCache
+from .choices import Choices
 from .match import *
 from .name import *
+from .phonetic import PhoneticIndex
+from .stats import MatchStats
 from .xref import Site
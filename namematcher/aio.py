@@ -0,0 +1,267 @@
+'''
+aio.py
+asyncio Site that loads base and xref tables concurrently
+
+'''
+
+import asyncio
+import logging
+
+import attr
+from sqlalchemy import MetaData
+from sqlalchemy.ext.automap import automap_base
+
+from .db import connection_string
+from .snapshot import Snapshot
+from .xref import Site
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+# sync driver prefix: async driver prefix
+ASYNC_DRIVERS = {
+    'sqlite://': ('sqlite+aiosqlite://', 'aiosqlite'),
+    'postgresql://': ('postgresql+asyncpg://', 'asyncpg'),
+}
+
+
+def async_url(connstr):
+    '''
+    Connection string with its sync driver swapped for an async one
+
+    Args:
+        connstr(str): e.g. 'sqlite:///namematcher.sqlite'
+
+    Returns:
+        tuple: of str, str (connection string, driver package)
+
+    '''
+    for prefix, (async_prefix, package) in ASYNC_DRIVERS.items():
+        if connstr.startswith(prefix):
+            return async_prefix + connstr[len(prefix):], package
+    return connstr, None
+
+
+def create_engine(connstr=None,
+                  database='sqlite',
+                  database_file='../namematcher.sqlite'):
+    '''
+    Async engine, with the same connection defaults as db.setup
+
+    Args:
+        connstr(str): default None
+        database(str): default 'sqlite'
+        database_file(str): default '../namematcher.sqlite'
+
+    Returns:
+        AsyncEngine
+
+    '''
+    connstr, package = async_url(
+        connection_string(connstr, database, database_file))
+    try:
+        from sqlalchemy.ext.asyncio import create_async_engine
+        return create_async_engine(connstr)
+    except ImportError as e:
+        hint = 'sqlalchemy[asyncio]' if package is None else \
+            'sqlalchemy[asyncio] {}'.format(package)
+        raise ImportError('AsyncSite requires an async driver: '
+                          'pip install {} ({})'.format(hint, e))
+
+
+async def setup(connstr=None,
+                database='sqlite',
+                database_file='../namematcher.sqlite',
+                schema=None):
+    '''
+    Automaps classes over an async engine
+
+    Args:
+        connstr(str): default None
+        database(str): default 'sqlite'
+        database_file(str): default '../namematcher.sqlite'
+        schema(str): default None
+
+    Returns:
+        Base, engine
+
+    '''
+    eng = create_engine(connstr, database, database_file)
+    metadata = MetaData()
+    async with eng.connect() as conn:
+        await conn.run_sync(metadata.reflect, schema=schema)
+    Base = automap_base(metadata=metadata)
+    Base.prepare()
+    return Base, eng
+
+
+@attr.s(kw_only=True)
+class AsyncSite(Site):
+    '''
+    Site over an async engine
+
+    load() reads the player table and the player_xref rows of several
+    sources concurrently, one connection per table. Matching is CPU
+    bound, so match_base and match_mfl run the Site methods in a worker
+    thread and leave the event loop free.
+
+    '''
+    session = attr.ib(default=None)
+
+    @classmethod
+    async def create(cls, connstr=None, database='sqlite',
+                     database_file='../namematcher.sqlite', schema=None,
+                     sources=None, **kwargs):
+        '''
+        AsyncSite with its tables loaded
+
+        Args:
+            connstr(str): default None
+            database(str): default 'sqlite'
+            database_file(str): default '../namematcher.sqlite'
+            schema(str): default None
+            sources(list): of str, xref sources to load, default source_name
+            kwargs: Site attributes, e.g. source_name
+
+        Returns:
+            AsyncSite
+
+        '''
+        base, eng = await setup(connstr, database, database_file, schema)
+        site = cls(base=base, eng=eng, **kwargs)
+        await site.load(sources)
+        return site
+
+    async def load(self, sources=None):
+        '''
+        Loads the player table and player_xref rows of sources concurrently
+        Tables already loaded are skipped
+
+        Args:
+            sources(list): of str, default [source_name] if set
+
+        Returns:
+            None
+
+        '''
+        if sources is None:
+            sources = [self.source_name] if self.source_name else []
+        xref = self.PlayerXref.__table__
+        pending = [name for name in dict.fromkeys(sources)
+                   if name not in self._xref_snapshots]
+        loads = [self._load(xref, xref.c.source == name) for name in pending]
+        if self._player_snapshot is None:
+            loads.append(self._load(self.Player.__table__))
+        snapshots = await asyncio.gather(*loads)
+        self._xref_snapshots.update(zip(pending, snapshots))
+        if len(snapshots) > len(pending):
+            self._player_snapshot = snapshots[-1]
+
+    async def _load(self, table, whereclause=None):
+        '''
+        Snapshot of table on its own connection
+
+        '''
+        async with self.eng.connect() as conn:
+            return await Snapshot.load_async(conn, table, whereclause)
+
+    async def refresh(self, full=False):
+        '''
+        Site.refresh over an async connection
+
+        Args:
+            full(bool): compare rows, not just watermarks, default False
+
+        Returns:
+            dict: of table: 'unchanged', 'appended' or 'reloaded'
+
+        '''
+        async with self.eng.connect() as conn:
+            return await conn.run_sync(self._refresh, full)
+
+    async def close(self):
+        '''
+        Disposes of the engine's connections
+
+        Returns:
+            None
+
+        '''
+        await self.eng.dispose()
+
+    def get_player_snapshot(self):
+        '''
+        Columnar snapshot of the base player table, from load()
+
+        Returns:
+            Snapshot
+
+        '''
+        if self._player_snapshot is None:
+            raise RuntimeError('player table not loaded: await load() first')
+        return self._player_snapshot
+
+    def get_xref_snapshot(self, source_name=None):
+        '''
+        Columnar snapshot of player_xref rows for a source, from load()
+
+        Args:
+            source_name(str): default self.source_name
+
+        Returns:
+            Snapshot
+
+        '''
+        if source_name is None:
+            source_name = self.source_name
+        if source_name not in self._xref_snapshots:
+            raise RuntimeError('player_xref for {} not loaded: '
+                               'await load([{!r}]) first'
+                               .format(source_name, source_name))
+        return self._xref_snapshots[source_name]
+
+    async def match_base(self, to_match, **kwargs):
+        '''
+        Site.match_base in a worker thread, loading the player table first
+
+        Args:
+            to_match(list): of dict
+            kwargs: Site.match_base arguments, interactive only 'review'
+
+        Returns:
+            list of dict, dict of list, list of dict
+            and MatchStats if stats is set
+
+        '''
+        return await self._match(super().match_base, to_match, kwargs)
+
+    async def match_mfl(self, to_match, **kwargs):
+        '''
+        Site.match_mfl in a worker thread, loading the player table first
+
+        Args:
+            to_match(list): of dict
+            kwargs: Site.match_mfl arguments, interactive only 'review'
+
+        Returns:
+            list of dict, dict of list, list of dict
+            and MatchStats if stats is set
+
+        '''
+        return await self._match(super().match_mfl, to_match, kwargs)
+
+    async def _match(self, func, to_match, kwargs):
+        '''
+        Runs a sync match method off the event loop
+
+        '''
+        if kwargs.get('interactive') is True:
+            # read_input times out with SIGALRM, main thread only
+            raise ValueError("AsyncSite needs interactive='review', "
+                             "per-name prompts only run on the main thread")
+        await self.load([])
+        return await asyncio.to_thread(func, to_match, **kwargs)
+
+
+if __name__ == '__main__':
+    pass
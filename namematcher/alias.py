@@ -0,0 +1,178 @@
+'''
+alias.py
+Alias index from player alt_names and name permutations
+
+'''
+
+import json
+import logging
+import re
+
+import attr
+
+from .name import Normalizer
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+# suffixes and commas stay: record_aliases lists each name with and
+# without them, and Sr. and Jr. are different players
+ALIAS_NORMALIZER = Normalizer(suffixes=(), commas=False, trailing_v=False,
+                              casefold=True, collapse=True)
+
+ALT_NAMES_SEP = re.compile(r'[;|\n]')
+
+
+def parse_alt_names(value):
+    '''
+    Names in an alt_names value
+
+    Accepts a JSON list, or names separated by ; | or newlines
+
+    Args:
+        value(str): or list, or None
+
+    Returns:
+        list: of str
+
+    '''
+    if not value or value == 'None':
+        return []
+    if isinstance(value, (list, tuple)):
+        names = value
+    else:
+        try:
+            names = json.loads(value)
+        except ValueError:
+            names = ALT_NAMES_SEP.split(value)
+        if isinstance(names, str):
+            names = [names]
+    return [nm.strip() for nm in names if nm and nm.strip()]
+
+
+def _part(record, key):
+    '''
+    record[key] as a stripped str, '' if missing
+
+    '''
+    value = record.get(key)
+    if value is None or value == 'None':
+        return ''
+    return str(value).strip()
+
+
+def record_aliases(record, name_key='full_name', alt_key='alt_names',
+                   first_key='first_name', last_key='last_name',
+                   suffix_key='suffix'):
+    '''
+    Names a player record may appear as
+
+    Args:
+        record(dict):
+        name_key(str): default 'full_name'
+        alt_key(str): default 'alt_names'
+        first_key(str): default 'first_name'
+        last_key(str): default 'last_name'
+        suffix_key(str): default 'suffix'
+
+    Returns:
+        list: of str
+
+    '''
+    names = [_part(record, name_key)]
+    names.extend(parse_alt_names(record.get(alt_key)))
+    first, last = _part(record, first_key), _part(record, last_key)
+    suffix = _part(record, suffix_key)
+    if first and last:
+        names.extend(['{} {}'.format(first, last),
+                      '{}, {}'.format(last, first)])
+        if suffix:
+            names.extend(['{} {} {}'.format(first, last, suffix),
+                          '{} {}, {}'.format(first, last, suffix),
+                          '{}, {} {}'.format(last, first, suffix)])
+    return [nm for nm in names if nm]
+
+
+@attr.s
+class AliasIndex:
+    '''
+    Normalized alias: records of players known by it
+
+    Aliases come from the name itself, alt_names, and first/last/suffix
+    permutations. Only aliases naming a single player are matches.
+
+    '''
+    records = attr.ib(type=list)
+    name_key = attr.ib(type=str, default='full_name')
+    id_key = attr.ib(type=str, default='player_id')
+
+    def __attrs_post_init__(self):
+        self.index = {}
+        self._index(self.records)
+        logging.debug('%s aliases for %s records', len(self.index),
+                      len(self.records))
+
+    def add(self, records):
+        '''
+        Indexes more records
+
+        Args:
+            records(list): of dict
+
+        Returns:
+            None
+
+        '''
+        records = list(records)
+        self.records = self.records + records
+        self._index(records)
+
+    def _index(self, records):
+        '''
+        Adds the aliases of records, one entry per player
+
+        '''
+        normalize = ALIAS_NORMALIZER.normalize
+        for record in records:
+            key = record.get(self.id_key, id(record))
+            for alias in dict.fromkeys(normalize(nm) for nm in
+                                       record_aliases(record, self.name_key)):
+                if not alias:
+                    continue
+                players = self.index.setdefault(alias, [])
+                if all(p.get(self.id_key, id(p)) != key for p in players):
+                    players.append(record)
+
+    def __len__(self):
+        return len(self.index)
+
+    def lookup(self, name):
+        '''
+        Records with name as an alias
+
+        Args:
+            name(str):
+
+        Returns:
+            list: of dict
+
+        '''
+        return self.index.get(ALIAS_NORMALIZER.normalize(name), [])
+
+    def match(self, name):
+        '''
+        The one record with name as an alias
+
+        Args:
+            name(str):
+
+        Returns:
+            dict or None
+
+        '''
+        records = self.lookup(name)
+        return records[0] if len(records) == 1 else None
+
+
+if __name__ == '__main__':
+    pass
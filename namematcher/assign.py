@@ -0,0 +1,172 @@
+'''
+assign.py
+One-to-one assignment over sparse match scores
+
+'''
+
+from collections import defaultdict
+import heapq
+import itertools
+import logging
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+# candidate names scored per source name in assignment mode
+ASSIGN_CANDIDATES = 5
+
+
+def components(weights):
+    '''
+    Connected groups of rows that share a candidate column
+
+    Args:
+        weights(dict): of row: dict of col: weight
+
+    Returns:
+        list: of list of rows, in the order rows first appear
+
+    '''
+    parent = {}
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for row, cols in weights.items():
+        parent.setdefault(('row', row), ('row', row))
+        for col in cols:
+            parent.setdefault(('col', col), ('col', col))
+            a, b = find(('row', row)), find(('col', col))
+            if a != b:
+                parent[b] = a
+    groups = defaultdict(list)
+    for row in weights:
+        groups[find(('row', row))].append(row)
+    return list(groups.values())
+
+
+def solve(costs, unassigned_cost):
+    '''
+    Minimum cost assignment of rows to distinct columns,
+    where leaving a row unassigned costs unassigned_cost
+
+    Successive shortest augmenting paths with Dijkstra over the
+    sparse edges; potentials keep every reduced cost non-negative.
+    Each row gets a private dummy column, so a path always exists.
+
+    Args:
+        costs(dict): of row: dict of col: cost >= 0
+        unassigned_cost(float): cost of a row without a column
+
+    Returns:
+        dict: of row: col, or None if unassigned
+
+    '''
+    edges = {}
+    for row, cols in costs.items():
+        edges[row] = dict(cols)
+        edges[row][_DUMMY, row] = unassigned_cost
+    u = dict.fromkeys(edges, 0)
+    v = defaultdict(float)
+    row_col, col_row = {}, {}
+    # warm start: a row takes its cheapest column when it is free,
+    # with u at that cost its other reduced costs stay non-negative
+    for row, cols in edges.items():
+        col = min(cols, key=cols.get)
+        if col not in col_row:
+            row_col[row], col_row[col] = col, row
+            u[row] = cols[col]
+    # breaks heap ties, rows and columns may not be comparable
+    order = itertools.count()
+    for start in [row for row in edges if row not in row_col]:
+        dist_row, dist_col, prev = {start: 0}, {}, {}
+        done_rows, done_cols = set(), set()
+        heap = [(0, 0, next(order), start)]
+        free = None
+        while heap:
+            d, kind, _, node = heapq.heappop(heap)
+            if kind == 0:
+                if node in done_rows:
+                    continue
+                done_rows.add(node)
+                for col, cost in edges[node].items():
+                    if col in done_cols:
+                        continue
+                    nd = d + cost - u[node] - v[col]
+                    if nd < dist_col.get(col, float('inf')):
+                        dist_col[col] = nd
+                        prev[col] = node
+                        heapq.heappush(heap, (nd, 1, next(order), col))
+            else:
+                if node in done_cols:
+                    continue
+                done_cols.add(node)
+                if node not in col_row:
+                    free = node
+                    break
+                row = col_row[node]
+                if row not in dist_row or d < dist_row[row]:
+                    dist_row[row] = d
+                    heapq.heappush(heap, (d, 0, next(order), row))
+        shortest = dist_col[free]
+        for row in done_rows:
+            u[row] += shortest - dist_row[row]
+        for col in done_cols:
+            v[col] -= shortest - dist_col[col]
+        # augment along the path back to start
+        col = free
+        while True:
+            row = prev[col]
+            previous = row_col.get(row)
+            row_col[row], col_row[col] = col, row
+            if row == start:
+                break
+            col = previous
+    return {row: None if _is_dummy(col) else col
+            for row, col in row_col.items()}
+
+
+# first item of the private unassigned column of a row
+_DUMMY = object()
+
+
+def _is_dummy(col):
+    '''
+    True for the private unassigned column of a row
+
+    '''
+    return isinstance(col, tuple) and len(col) == 2 and col[0] is _DUMMY
+
+
+def assign(weights):
+    '''
+    One-to-one assignment with the largest total weight
+
+    Rows and columns are split into connected components first,
+    so a roster solves as many small problems
+
+    Args:
+        weights(dict): of row: dict of col: weight > 0
+
+    Returns:
+        dict: of row: col, or None for rows left unassigned
+
+    '''
+    top = max((w for cols in weights.values() for w in cols.values()),
+              default=0)
+    assigned = {}
+    for rows in components(weights):
+        costs = {row: {col: top - w for col, w in weights[row].items()}
+                 for row in rows}
+        assigned.update(solve(costs, top))
+    logging.debug('assigned %s of %s rows',
+                  sum(col is not None for col in assigned.values()),
+                  len(assigned))
+    return assigned
+
+
+if __name__ == '__main__':
+    pass
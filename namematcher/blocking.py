@@ -0,0 +1,272 @@
+'''
+blocking.py
+Candidate blocking for fuzzy matching
+
+'''
+
+from collections import Counter, defaultdict
+import logging
+import math
+
+import attr
+from fuzzywuzzy import utils
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+PAD = '$'
+
+# scaling fuzz.WRatio applies to token and partial scores
+UNBASE_SCALE = .95
+
+
+def process_forms(name):
+    '''
+    Forms of a name that fuzz.WRatio compares:
+    processed, token-sorted and sorted unique tokens
+
+    Args:
+        name(str):
+
+    Returns:
+        tuple: of str
+
+    '''
+    processed = utils.full_process(name, force_ascii=True)
+    tokens = processed.split()
+    return (processed,
+            ' '.join(sorted(tokens)),
+            ' '.join(sorted(set(tokens))))
+
+
+def partial_scale(len1, len2):
+    '''
+    Scale fuzz.WRatio puts on partial scores, None if it skips them
+
+    Args:
+        len1(int): length of first processed string
+        len2(int): length of second processed string
+
+    Returns:
+        float
+
+    '''
+    if not min(len1, len2):
+        return None
+    len_ratio = max(len1, len2) / min(len1, len2)
+    if len_ratio < 1.5:
+        return None
+    if len_ratio > 8:
+        return .6
+    return .9
+
+
+@attr.s
+class NgramIndex:
+    '''
+    Inverted index of padded character n-grams and whole tokens
+    over a list of names
+
+    candidates() returns every name that can reach a fuzz.WRatio
+    score of thresh against the query:
+        * ratio and token sort parts through the n-gram count filter
+        * partial parts through the same filter on substrings
+        * token set parts through names sharing a whole token
+
+    '''
+    names = attr.ib(type=list)
+    q = attr.ib(type=int, default=3)
+
+    def __attrs_post_init__(self):
+        self.choices = []
+        self.choice_length = []
+        self.choice_tokens = []
+        self.form_choice = []
+        self.form_length = []
+        self.lengths = defaultdict(list)
+        self.postings = defaultdict(list)
+        self.tokens = defaultdict(list)
+        self._seen = set()
+        self._index(self.names)
+
+    def add(self, names):
+        '''
+        Indexes more names, as if they ended the original list
+
+        Args:
+            names(list): of str
+
+        Returns:
+            None
+
+        '''
+        names = list(names)
+        self.names = self.names + names
+        self._index(names)
+
+    def _index(self, names):
+        '''
+        Adds the forms and n-grams of names not yet indexed
+
+        '''
+        for name in names:
+            if name in self._seen:
+                continue
+            self._seen.add(name)
+            idx = len(self.choices)
+            forms = process_forms(name)
+            self.choices.append(name)
+            self.choice_length.append(len(forms[0]))
+            self.choice_tokens.append(set(forms[0].split()))
+            for token in self.choice_tokens[idx]:
+                self.tokens[token].append(idx)
+            for form in set(forms):
+                fid = len(self.form_choice)
+                self.form_choice.append(idx)
+                self.form_length.append(len(form))
+                self.lengths[len(form)].append(fid)
+                for gram, cnt in Counter(self.grams(form)).items():
+                    self.postings[gram].append((fid, cnt))
+
+    def grams(self, s):
+        '''
+        Padded character n-grams of a string
+
+        Args:
+            s(str):
+
+        Returns:
+            list: of str
+
+        '''
+        padded = PAD * (self.q - 1) + s + PAD * (self.q - 1)
+        return [padded[i:i + self.q] for i in range(len(padded) - self.q + 1)]
+
+    def min_shared(self, len1, len2, r, scale=None):
+        '''
+        Fewest n-grams two strings must share to reach ratio r
+
+        A ratio of r caps the insert/delete distance at (len1 + len2) * (1 - r)
+        and each edit destroys at most q n-grams (q-gram lemma).
+        With scale, a partial ratio of r / scale on the shorter string
+        is also allowed. Returns None when lengths alone rule out r.
+
+        Args:
+            len1(int): length of first string
+            len2(int): length of second string
+            r(float): ratio to reach (0-1)
+            scale(float): partial scale, default None
+
+        Returns:
+            int
+
+        '''
+        needs = []
+        total = len1 + len2
+        shorter = min(len1, len2)
+        if 2 * shorter >= r * total:
+            edits = math.floor(total * (1 - r) + 1e-9)
+            needs.append(max(len1, len2) + self.q - 1 - self.q * edits)
+        if scale and r <= scale:
+            # partial_ratio returns 100 once a window passes .995
+            edits = math.floor(2 * shorter * (1 - min(r / scale, .995)) + 1e-9)
+            needs.append(shorter - self.q + 1 - self.q * edits)
+        return min(needs) if needs else None
+
+    def token_set_bound(self, tokens1, tokens2):
+        '''
+        Upper bound on fuzz.token_set_ratio of two token sets (0-1)
+
+        Args:
+            tokens1(set): of str
+            tokens2(set): of str
+
+        Returns:
+            float
+
+        '''
+        sect = len(' '.join(tokens1 & tokens2))
+        diffs = (len(' '.join(tokens1 - tokens2)),
+                 len(' '.join(tokens2 - tokens1)))
+        combined = [sect + 1 + d if d else sect for d in diffs]
+        bounds = [2 * sect / (sect + c) for c in combined]
+        bounds.append(2 * min(combined) / sum(combined))
+        return max(bounds)
+
+    def candidates(self, to_match, thresh):
+        '''
+        Names that could score thresh or better against to_match
+
+        Every name whose fuzz.WRatio against to_match is >= thresh
+        is returned, in the original order
+
+        Args:
+            to_match(str): name to match
+            thresh(int): threshold for quality of match (1-100)
+
+        Returns:
+            list: of str
+
+        '''
+        forms = process_forms(to_match)
+        query_length = len(forms[0])
+        query_tokens = set(forms[0].split())
+        if thresh <= 1 or not query_length:
+            return list(self.choices)
+
+        # WRatio and the scores it combines each round to int,
+        # so allow a full point of slack
+        r = (thresh - 1) / 100
+        found = set()
+        scales = {}
+
+        def scale_for(idx):
+            length = self.choice_length[idx]
+            if length not in scales:
+                scales[length] = partial_scale(query_length, length)
+            return scales[length]
+
+        # character n-grams: ratio, token sort and partial parts
+        for form in set(forms):
+            shared = defaultdict(int)
+            for gram, cnt in Counter(self.grams(form)).items():
+                for fid, fcnt in self.postings.get(gram, ()):
+                    shared[fid] += min(cnt, fcnt)
+            needs = {}
+            for length, fids in self.lengths.items():
+                for scale in (None, .9, .6):
+                    needs[length, scale] = self.min_shared(
+                        len(form), length, r, scale)
+                if needs[length, None] is not None and needs[length, None] <= 0:
+                    found.update(self.form_choice[fid] for fid in fids)
+                elif any(n is not None and n <= 0 for n in
+                         (needs[length, .9], needs[length, .6])):
+                    for fid in fids:
+                        idx = self.form_choice[fid]
+                        n = needs[length, scale_for(idx)]
+                        if n is not None and n <= 0:
+                            found.add(idx)
+            for fid, cnt in shared.items():
+                idx = self.form_choice[fid]
+                n = needs[self.form_length[fid], scale_for(idx)]
+                if n is not None and cnt >= n:
+                    found.add(idx)
+
+        # whole tokens: token set parts
+        for idx in {idx for token in query_tokens
+                    for idx in self.tokens.get(token, ())}:
+            scale = scale_for(idx)
+            if scale:
+                ok = r <= UNBASE_SCALE * scale
+            else:
+                ok = self.token_set_bound(
+                    query_tokens, self.choice_tokens[idx]) >= r / UNBASE_SCALE
+            if ok:
+                found.add(idx)
+
+        logging.debug('%s candidates for %s', len(found), to_match)
+        return [self.choices[i] for i in sorted(found)]
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,191 @@
+'''
+cache.py
+Persistent cache of match decisions
+
+'''
+
+from collections import defaultdict
+import datetime
+import logging
+
+import attr
+from sqlalchemy import (Column, DateTime, Integer, MetaData, Table, Text,
+                        select)
+
+from .name import namestrip
+from .snapshot import checksum
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+def normalize(name):
+    '''
+    Normalized name used as the cache's secondary key
+
+    Args:
+        name(str):
+
+    Returns:
+        str
+
+    '''
+    return ' '.join(namestrip(name).lower().split())
+
+
+def player_fingerprint(eng, player_table):
+    '''
+    Checksum of (player_id, full_name) in player_id order, which
+    changes when players are added, removed or renamed, including
+    same-length renames and names swapped between players
+
+    Args:
+        eng(sqlalchemy engine):
+        player_table(sqlalchemy Table):
+
+    Returns:
+        str
+
+    '''
+    query = select(player_table.c.player_id, player_table.c.full_name) \
+        .order_by(player_table.c.player_id)
+    with eng.connect() as conn:
+        return checksum(conn, query)
+
+
+@attr.s
+class MatchCache:
+    '''
+    Match decisions stored in a table of the player database,
+    keyed on (source, raw name)
+
+    Entries are tagged with a fingerprint of the player table
+    and ignored once the player table changes
+
+    '''
+    eng = attr.ib()
+    base = attr.ib()
+    table_name = attr.ib(type=str, default='match_cache')
+
+    def __attrs_post_init__(self):
+        self.table = Table(
+            self.table_name, MetaData(),
+            Column('source', Text, primary_key=True),
+            Column('raw_name', Text, primary_key=True),
+            Column('normalized_name', Text, nullable=False, index=True),
+            Column('player_id', Integer, nullable=False),
+            Column('score', Integer),
+            Column('method', Text),
+            Column('fingerprint', Text, nullable=False),
+            Column('created_at', DateTime)
+        )
+        self.table.create(self.eng, checkfirst=True)
+        self.refresh()
+
+    def refresh(self):
+        '''
+        Recomputes the player table fingerprint
+
+        Returns:
+            str
+
+        '''
+        self.fingerprint = player_fingerprint(
+            self.eng, self.base.classes.player.__table__)
+        return self.fingerprint
+
+    def load(self, source):
+        '''
+        Current decisions for a source
+
+        Args:
+            source(str):
+
+        Returns:
+            tuple: dict of raw_name: dict, dict of normalized_name: dict
+            normalized names that map to several players are left out
+
+        '''
+        t = self.table
+        query = select(t).where(t.c.source == source) \
+            .where(t.c.fingerprint == self.fingerprint)
+        by_raw = {}
+        by_normalized = defaultdict(list)
+        with self.eng.connect() as conn:
+            for row in conn.execute(query):
+                entry = dict(row._mapping)
+                by_raw[entry['raw_name']] = entry
+                by_normalized[entry['normalized_name']].append(entry)
+        return by_raw, {k: v[0] for k, v in by_normalized.items()
+                        if len({e['player_id'] for e in v}) == 1}
+
+    def lookup(self, source, raw_name):
+        '''
+        Decision for one name
+
+        Args:
+            source(str):
+            raw_name(str):
+
+        Returns:
+            dict or None
+
+        '''
+        by_raw, by_normalized = self.load(source)
+        return by_raw.get(raw_name) or by_normalized.get(normalize(raw_name))
+
+    def store(self, decisions):
+        '''
+        Saves decisions in one transaction, replacing older ones
+
+        Args:
+            decisions(list): of dict with source, raw_name, player_id,
+                             and optional score and method
+
+        Returns:
+            int
+
+        '''
+        if not decisions:
+            return 0
+        now = datetime.datetime.now(datetime.timezone.utc)
+        rows = {}
+        for d in decisions:
+            rows[d['source'], d['raw_name']] = {
+                'source': d['source'],
+                'raw_name': d['raw_name'],
+                'normalized_name': normalize(d['raw_name']),
+                'player_id': int(d['player_id']),
+                'score': d.get('score'),
+                'method': d.get('method'),
+                'fingerprint': self.fingerprint,
+                'created_at': now
+            }
+        names = defaultdict(list)
+        for source, raw_name in rows:
+            names[source].append(raw_name)
+        t = self.table
+        with self.eng.begin() as conn:
+            for source, raw_names in names.items():
+                conn.execute(t.delete().where(t.c.source == source)
+                             .where(t.c.raw_name.in_(raw_names)))
+            conn.execute(t.insert(), list(rows.values()))
+        logging.debug('stored %s match decisions', len(rows))
+        return len(rows)
+
+    def purge(self):
+        '''
+        Deletes decisions made against an older player table
+
+        Returns:
+            int
+
+        '''
+        t = self.table
+        with self.eng.begin() as conn:
+            result = conn.execute(
+                t.delete().where(t.c.fingerprint != self.fingerprint))
+        return result.rowcount
+
+
+if __name__ == '__main__':
+    pass
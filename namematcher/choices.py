@@ -0,0 +1,339 @@
+'''
+choices.py
+Precompiled choice sets for fuzzy matching
+
+'''
+
+from collections import Counter
+import heapq
+import logging
+
+import attr
+from fuzzywuzzy import fuzz, utils
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+@attr.s(frozen=True, slots=True, hash=False)
+class Forms:
+    '''
+    Normalized forms of a name used by fuzz.WRatio
+
+    '''
+    processed = attr.ib(type=str)
+    sorted_tokens = attr.ib(type=str)
+    token_set = attr.ib(type=frozenset)
+    chars = attr.ib(type=Counter)
+
+
+def compile_name(name):
+    '''
+    Normalizes and tokenizes a name once
+
+    Args:
+        name(str):
+
+    Returns:
+        Forms
+
+    '''
+    processed = utils.full_process(name, force_ascii=True)
+    tokens = processed.split()
+    return Forms(processed, ' '.join(sorted(tokens)), frozenset(tokens),
+                 Counter(processed.replace(' ', '')))
+
+
+def compile_query(query):
+    '''
+    Forms of a query, processed the way process.extractOne does
+
+    Args:
+        query(str):
+
+    Returns:
+        Forms
+
+    '''
+    return compile_name(utils.full_process(query))
+
+
+def token_set(forms1, forms2, partial=False):
+    '''
+    fuzz.token_set_ratio on precompiled forms
+
+    Args:
+        forms1(Forms):
+        forms2(Forms):
+        partial(bool): use partial_ratio, default False
+
+    Returns:
+        int
+
+    '''
+    if forms1.processed == forms2.processed:
+        return 100
+    intersection = forms1.token_set & forms2.token_set
+    sorted_sect = ' '.join(sorted(intersection))
+    sorted_1to2 = ' '.join(sorted(forms1.token_set - intersection))
+    sorted_2to1 = ' '.join(sorted(forms2.token_set - intersection))
+    combined_1to2 = (sorted_sect + ' ' + sorted_1to2).strip()
+    combined_2to1 = (sorted_sect + ' ' + sorted_2to1).strip()
+    ratio_func = fuzz.partial_ratio if partial else fuzz.ratio
+    return max(ratio_func(sorted_sect, combined_1to2),
+               ratio_func(sorted_sect, combined_2to1),
+               ratio_func(combined_1to2, combined_2to1))
+
+
+def ratio_bound(s1, s2, shared, partial=False):
+    '''
+    Upper bound on fuzz.ratio or fuzz.partial_ratio of two strings
+    from their lengths and the characters they share
+
+    Args:
+        s1(str):
+        s2(str):
+        shared(int): non-space characters in common
+        partial(bool): bound partial_ratio, default False
+
+    Returns:
+        int
+
+    '''
+    common = shared + min(s1.count(' '), s2.count(' '))
+    if partial:
+        bound = 2 * common / (min(len(s1), len(s2)) + common)
+        return 100 if bound > .995 else utils.intr(100 * bound)
+    return utils.intr(200 * common / (len(s1) + len(s2)))
+
+
+def token_set_bound(forms1, forms2):
+    '''
+    Upper bound on fuzz.token_set_ratio of two names sharing a token
+
+    Args:
+        forms1(Forms):
+        forms2(Forms):
+
+    Returns:
+        int
+
+    '''
+    sect = len(' '.join(forms1.token_set & forms2.token_set))
+    diffs = (len(' '.join(forms1.token_set - forms2.token_set)),
+             len(' '.join(forms2.token_set - forms1.token_set)))
+    combined = [sect + 1 + d if d else sect for d in diffs]
+    bounds = [2 * sect / (sect + c) for c in combined]
+    bounds.append(2 * min(combined) / sum(combined))
+    return utils.intr(100 * max(bounds))
+
+
+def wratio(forms1, forms2, score_cutoff=0):
+    '''
+    fuzz.WRatio on precompiled forms, without re-processing either name
+
+    With score_cutoff, parts whose upper bound (from lengths, shared
+    characters and shared tokens) is below the cutoff are not scored.
+    Scores that reach score_cutoff are exact; lower scores may be
+    reported lower than fuzz.WRatio would.
+
+    Args:
+        forms1(Forms):
+        forms2(Forms):
+        score_cutoff(int): minimum score of interest, default 0
+
+    Returns:
+        int
+
+    '''
+    p1, p2 = forms1.processed, forms2.processed
+    if not p1 or not p2:
+        return 0
+    len_ratio = float(max(len(p1), len(p2))) / min(len(p1), len(p2))
+    cutoff = score_cutoff - .5
+    s1, s2 = forms1.sorted_tokens, forms2.sorted_tokens
+    shared = sum((forms1.chars & forms2.chars).values()) if cutoff > 0 else 0
+    # token_set without a shared token scores sorted unique tokens,
+    # which is the token sort score unless a name repeats a token
+    sect = forms1.token_set & forms2.token_set
+    same_as_sort = not sect and \
+        len(forms1.token_set) == len(s1.split()) and \
+        len(forms2.token_set) == len(s2.split())
+    scores = [0]
+
+    if cutoff <= 0 or ratio_bound(p1, p2, shared) >= cutoff:
+        scores.append(fuzz.ratio(p1, p2))
+
+    if len_ratio < 1.5:
+        if cutoff <= 0 or ratio_bound(s1, s2, shared) * .95 >= cutoff:
+            scores.append(fuzz.ratio(s1, s2) * .95)
+        if same_as_sort:
+            pass
+        elif cutoff <= 0 or not sect or \
+                token_set_bound(forms1, forms2) * .95 >= cutoff:
+            scores.append(token_set(forms1, forms2) * .95)
+        return utils.intr(max(scores))
+
+    partial_scale = .6 if len_ratio > 8 else .9
+    if cutoff <= 0 or \
+            ratio_bound(p1, p2, shared, partial=True) * partial_scale >= cutoff:
+        scores.append(fuzz.partial_ratio(p1, p2) * partial_scale)
+    if cutoff <= 0 or \
+            ratio_bound(s1, s2, shared, partial=True) * .95 * partial_scale \
+            >= cutoff:
+        scores.append(fuzz.partial_ratio(s1, s2) * .95 * partial_scale)
+    if same_as_sort:
+        pass
+    elif cutoff <= 0 or 100 * .95 * partial_scale >= cutoff:
+        scores.append(token_set(forms1, forms2, partial=True) * .95 * partial_scale)
+    return utils.intr(max(scores))
+
+
+@attr.s
+class Choices:
+    '''
+    List of names normalized and tokenized once, so matching
+    many queries against it does not re-process every choice
+
+    Can be passed as match_from to match_name, match_fuzzy,
+    match_interactive, match_many and Site.match
+
+    '''
+    names = attr.ib(type=list, converter=list)
+
+    def __attrs_post_init__(self):
+        self.forms = {}
+        self._compile(self.names)
+
+    def add(self, names):
+        '''
+        Appends names, compiling the ones not seen before
+
+        Args:
+            names(list): of str
+
+        Returns:
+            None
+
+        '''
+        names = list(names)
+        self.names.extend(names)
+        self._compile(names)
+
+    def _compile(self, names):
+        '''
+        Compiles names not yet in forms
+
+        '''
+        for name in names:
+            if name not in self.forms:
+                self.forms[name] = compile_name(name)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def scores(self, query, names=None, score_cutoff=0):
+        '''
+        Scores query against choices
+
+        Args:
+            query(str): name to match
+            names(list): subset of choices to score, default all
+            score_cutoff(int): skip work on scores below this, default 0
+
+        Returns:
+            generator: of (str, int)
+
+        '''
+        query_forms = compile_query(query)
+        if not query_forms.processed:
+            logging.warning('Applied processor reduces input query to empty '
+                            'string, all comparisons will have score 0. '
+                            '[Query: \'%s\']', query)
+        scored = {}
+        for name in self.names if names is None else names:
+            if name not in scored:
+                scored[name] = wratio(query_forms, self.forms[name],
+                                      score_cutoff)
+            yield (name, scored[name])
+
+    def extract_one(self, query, names=None, score_cutoff=0):
+        '''
+        Best match for query, like process.extractOne
+
+        Args:
+            query(str): name to match
+            names(list): subset of choices to score, default all
+            score_cutoff(int): minimum score, default 0
+
+        Returns:
+            tuple: (str, int) or None
+
+        '''
+        if names is None:
+            names = self.forms
+        best = None
+        for name, score in self.scores(query, names, score_cutoff):
+            if score >= score_cutoff and (best is None or score > best[1]):
+                best = (name, score)
+        return best
+
+    def extract(self, query, limit=5, names=None):
+        '''
+        Best matches for query, like process.extract
+
+        Args:
+            query(str): name to match
+            limit(int): number of matches, default 5
+            names(list): subset of choices to score, default all
+
+        Returns:
+            list: of (str, int)
+
+        '''
+        return heapq.nlargest(limit, self.scores(query, names),
+                              key=lambda i: i[1])
+
+    def top(self, query, limit=5, names=None, score_cutoff=0):
+        '''
+        Best distinct matches for query scoring at least score_cutoff
+
+        Keeps a heap of the best limit matches. Once it is full, a
+        candidate must beat the lowest of them, so that score is used
+        as the cutoff and wratio skips parts that cannot reach it.
+        Ties keep the earlier name, like extract.
+
+        Args:
+            query(str): name to match
+            limit(int): number of matches, None for all, default 5
+            names(list): subset of choices to score, default all
+            score_cutoff(int): minimum score, default 0
+
+        Returns:
+            list: of (str, int), highest score first
+
+        '''
+        if limit is not None and limit <= 0:
+            return []
+        query_forms = compile_query(query)
+        heap = []
+        for order, name in enumerate(dict.fromkeys(
+                self.names if names is None else names)):
+            full = limit is not None and len(heap) >= limit
+            cutoff = max(score_cutoff, heap[0][0] + 1) if full else \
+                score_cutoff
+            score = wratio(query_forms, self.forms[name], cutoff)
+            if score < cutoff:
+                continue
+            if not full:
+                heapq.heappush(heap, (score, -order, name))
+            else:
+                heapq.heapreplace(heap, (score, -order, name))
+        return [(name, score) for score, _, name in
+                sorted(heap, reverse=True)]
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,269 @@
+'''
+cli.py
+Command-line entry point for matching files of names
+
+'''
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import json
+import logging
+import os
+import sys
+import time
+
+from .db import setup
+from .indexfile import load_index
+from .xref import Site
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+FORMATS = ('csv', 'jsonl', 'parquet')
+STATUSES = ('matched', 'duplicate', 'unmatched')
+
+
+def file_format(path, fmt=None):
+    '''
+    Format of a file from its extension
+
+    Args:
+        path(str):
+        fmt(str): explicit format, default None
+
+    Returns:
+        str
+
+    '''
+    if fmt:
+        return fmt
+    ext = os.path.splitext(path)[1].lower().lstrip('.')
+    if ext in ('json', 'ndjson'):
+        return 'jsonl'
+    if ext in ('parquet', 'pq'):
+        return 'parquet'
+    if ext in FORMATS:
+        return ext
+    raise ValueError('cannot tell format of {}, use --format'.format(path))
+
+
+def read_records(path, fmt=None, chunksize=1000):
+    '''
+    Reads records lazily from a CSV, JSONL or Parquet file
+
+    Args:
+        path(str):
+        fmt(str): 'csv', 'jsonl' or 'parquet', default from extension
+        chunksize(int): Parquet rows read at a time, default 1000
+
+    Returns:
+        generator: of dict
+
+    '''
+    fmt = file_format(path, fmt)
+    if fmt == 'parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError('parquet input requires pyarrow: '
+                              'pip install pyarrow')
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield from batch.to_pylist()
+        return
+    with open(path, newline='' if fmt == 'csv' else None) as f:
+        if fmt == 'csv':
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+class RecordWriter:
+    '''
+    Writes records to a CSV or JSONL file, opened on the first record
+
+    '''
+    def __init__(self, path, fmt):
+        self.path = path
+        self.fmt = fmt
+        self.count = 0
+        self._file = None
+        self._writer = None
+
+    def write(self, record):
+        '''
+        Writes one record
+
+        Args:
+            record(dict):
+
+        Returns:
+            None
+
+        '''
+        if self._file is None:
+            self._file = open(self.path, 'w',
+                              newline='' if self.fmt == 'csv' else None)
+            if self.fmt == 'csv':
+                self._writer = csv.DictWriter(self._file,
+                                              fieldnames=list(record),
+                                              extrasaction='ignore')
+                self._writer.writeheader()
+        if self.fmt == 'csv':
+            self._writer.writerow(record)
+        else:
+            self._file.write(json.dumps(record, default=str) + '\n')
+        self.count += 1
+
+    def close(self):
+        '''
+        Closes the file if one was opened
+
+        Returns:
+            None
+
+        '''
+        if self._file is not None:
+            self._file.close()
+
+
+def parse_args(argv=None):
+    '''
+    Parses command-line arguments
+
+    Args:
+        argv(list): of str, default sys.argv[1:]
+
+    Returns:
+        argparse.Namespace
+
+    '''
+    parser = argparse.ArgumentParser(
+        prog='namematcher',
+        description='match a file of names against the base player table')
+    parser.add_argument('input', help='CSV, JSONL or Parquet file')
+    parser.add_argument('--format', choices=FORMATS,
+                        help='input format, default from extension')
+    parser.add_argument('--name-column', default='source_player_name',
+                        help='column holding names to match')
+    parser.add_argument('--output-dir', default='.',
+                        help='directory for output files')
+    parser.add_argument('--output-format', choices=('csv', 'jsonl'),
+                        default='jsonl', help='output format')
+    parser.add_argument('--prefix',
+                        help='output file prefix, default input file name')
+    parser.add_argument('--database', default='sqlite',
+                        help="'sqlite' or 'postgresql'")
+    parser.add_argument('--database-file', default='namematcher.sqlite',
+                        help='sqlite database file')
+    parser.add_argument('--connstr', help='sqlalchemy connection string')
+    parser.add_argument('--index',
+                        help='prebuilt index file, built or rebuilt '
+                             'when missing or older than the database')
+    parser.add_argument('--thresh', type=int, default=90,
+                        help='fuzzy match threshold (1-100)')
+    parser.add_argument('--blocking', action='store_true',
+                        help='fuzzy match only n-gram candidates')
+    parser.add_argument('--scorer', default=None,
+                        help="'fuzzywuzzy' or 'rapidfuzz'")
+    parser.add_argument('--workers', type=int, default=1,
+                        help='processes for fuzzy matching, 0 for all cores')
+    parser.add_argument('--chunksize', type=int, default=1000,
+                        help='records read at a time')
+    parser.add_argument('--quiet', action='store_true',
+                        help='no progress readout')
+    return parser.parse_args(argv)
+
+
+def run(args, out=sys.stderr):
+    '''
+    Matches the input file and writes matched, duplicate
+    and unmatched files
+
+    Args:
+        args(argparse.Namespace): from parse_args
+        out(file): progress stream, default sys.stderr
+
+    Returns:
+        dict: of status: count
+
+    '''
+    if args.index:
+        site = Site(index_file=load_index(args.index,
+                                          connstr=args.connstr,
+                                          database=args.database,
+                                          database_file=args.database_file))
+    else:
+        base, eng, session = setup(connstr=args.connstr,
+                                   database=args.database,
+                                   database_file=args.database_file)
+        site = Site(base=base, eng=eng, session=session)
+    prefix = args.prefix or \
+        os.path.splitext(os.path.basename(args.input))[0]
+    writers = {status: RecordWriter(
+        os.path.join(args.output_dir, '{}_{}.{}'.format(
+            prefix, status, args.output_format)), args.output_format)
+        for status in STATUSES}
+    # one pool for the whole run, rather than one per chunk and bucket
+    executor = ProcessPoolExecutor(max_workers=args.workers or None) \
+        if args.workers != 1 else None
+    results = site.match_iter(
+        read_records(args.input, args.format, args.chunksize),
+        site.get_base_players(),
+        id_keys=(None, 'player_id'),
+        name_keys=(args.name_column, 'full_name'),
+        thresh=args.thresh,
+        blocking=args.blocking,
+        workers=args.workers or None,
+        executor=executor,
+        chunksize=args.chunksize,
+        scorer=args.scorer)
+    start = time.perf_counter()
+    try:
+        for n, (status, record, matches) in enumerate(results, 1):
+            if status == 'duplicate':
+                record = dict(record)
+                record['player_id'] = ';'.join(m['player_id']
+                                               for m in matches)
+            writers[status].write(record)
+            if not args.quiet and n % args.chunksize == 0:
+                elapsed = time.perf_counter() - start
+                print('{} records, {:.0f}/s'.format(n, n / elapsed),
+                      file=out)
+    finally:
+        for writer in writers.values():
+            writer.close()
+        if executor is not None:
+            executor.shutdown()
+        if site.session is not None:
+            site.session.close()
+    counts = {status: writers[status].count for status in STATUSES}
+    if not args.quiet:
+        elapsed = time.perf_counter() - start
+        total = sum(counts.values())
+        print('{} records in {:.1f}s ({:.0f}/s): {}'.format(
+            total, elapsed, total / elapsed if elapsed else 0,
+            ', '.join('{} {}'.format(v, k) for k, v in counts.items())),
+            file=out)
+    return counts
+
+
+def main(argv=None):
+    '''
+    Console script entry point
+
+    Args:
+        argv(list): of str, default sys.argv[1:]
+
+    Returns:
+        int
+
+    '''
+    run(parse_args(argv))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
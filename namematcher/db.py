@@ -13,20 +13,19 @@ from sqlalchemy.ext.automap import automap_base
 from sqlalchemy.orm import Session
 
 
-def setup(connstr = None,
-          database='sqlite',
-          database_file='../namematcher.sqlite',
-          schema=None):
+def connection_string(connstr=None,
+                      database='sqlite',
+                      database_file='../namematcher.sqlite'):
     '''
-    Automaps classes
-    
+    Connection string for setup
+
     Args:
+        connstr(str): returned as is if set, default None
         database(str): default 'sqlite'
         database_file(str): default '../namematcher.sqlite'
-        schema(str): default None
-        
+
     Returns:
-        Base, engine, session
+        str
 
     '''
     if database in ['postgresql', 'postgres', 'pg']:
@@ -46,6 +45,26 @@ def setup(connstr = None,
         if not connstr:
             connstr = f'sqlite:///{database_file}'
 
+    return connstr
+
+
+def setup(connstr = None,
+          database='sqlite',
+          database_file='../namematcher.sqlite',
+          schema=None):
+    '''
+    Automaps classes
+    
+    Args:
+        database(str): default 'sqlite'
+        database_file(str): default '../namematcher.sqlite'
+        schema(str): default None
+        
+    Returns:
+        Base, engine, session
+
+    '''
+    connstr = connection_string(connstr, database, database_file)
     eng = create_engine(connstr)
     session = Session(eng)
 
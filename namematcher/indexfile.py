@@ -0,0 +1,408 @@
+'''
+indexfile.py
+Prebuilt match index files, loaded at startup
+
+'''
+
+import functools
+import gc
+import hashlib
+import io
+import json
+import logging
+import os
+import pickle
+import struct
+import tempfile
+
+import attr
+from sqlalchemy import column, create_engine, select, table, text
+
+from . import alias, blocking, choices, phonetic, snapshot
+from .db import connection_string, setup
+from .snapshot import Snapshot, checksum
+from .xref import Site
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+# bump when the layout changes; changes to the pickled index classes
+# are caught by code_hash
+INDEX_VERSION = 1
+MAGIC = b'NMINDEX\x00'
+PREAMBLE = struct.Struct('<II')
+
+# Site index getters stored for each player list: kind, key
+INDEXES = (
+    ('name', 'full_name'),
+    ('namepos', ('full_name', 'primary_pos')),
+    ('id', 'player_id'),
+    ('ngram', 'full_name'),
+    ('phonetic', 'full_name'),
+    ('alias', 'full_name'),
+    ('choices', 'full_name'),
+)
+
+
+def section_name(records, kind, key):
+    '''
+    Name of the section holding an index over a player list
+
+    Args:
+        records(str): 'players' or 'mfl_players'
+        kind(str): index kind, as in Site._cached_index
+        key(str): or tuple of str, name key of the index
+
+    Returns:
+        str
+
+    '''
+    if isinstance(key, tuple):
+        key = ','.join(key)
+    return '{}/{}:{}'.format(records, kind, key)
+
+
+@functools.lru_cache(maxsize=None)
+def code_hash():
+    '''
+    Hash of the source of the modules whose classes are pickled in
+    an index file, so a file built by other code is stale
+
+    Returns:
+        str
+
+    '''
+    h = hashlib.sha1()
+    for module in (alias, blocking, choices, phonetic, snapshot):
+        with open(module.__file__, 'rb') as f:
+            h.update(f.read())
+    with open(__file__, 'rb') as f:
+        h.update(f.read())
+    return h.hexdigest()
+
+
+def fingerprint(eng):
+    '''
+    What the index file was built from, to tell when it is stale
+
+    A sqlite file is checked with os.stat (size and mtime, with its
+    write-ahead log), so no query is run. Other databases are checked
+    with a checksum of every player row, since the file holds whole
+    records and any column may be read from them.
+
+    Args:
+        eng(sqlalchemy engine):
+
+    Returns:
+        dict
+
+    '''
+    url = eng.url
+    if url.get_backend_name() == 'sqlite' and \
+            url.database not in (None, '', ':memory:'):
+        path = os.path.abspath(url.database)
+        found = {'database': path}
+        for suffix in ('', '-wal'):
+            try:
+                st = os.stat(path + suffix)
+            except FileNotFoundError:
+                continue
+            found['size' + suffix] = st.st_size
+            found['mtime' + suffix] = st.st_mtime_ns
+        return found
+    player = table('player', column('player_id'))
+    query = select(text('*')).select_from(player) \
+        .order_by(player.c.player_id)
+    with eng.connect() as conn:
+        found = checksum(conn, query)
+    return {'database': url.render_as_string(hide_password=True),
+            'checksum': found}
+
+
+class _Pickler(pickle.Pickler):
+    '''
+    Pickles records of a player list as (list, row) references
+
+    '''
+    def __init__(self, file, rows):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.rows = rows
+
+    def persistent_id(self, obj):
+        return self.rows.get(id(obj))
+
+
+class _Unpickler(pickle.Unpickler):
+    '''
+    Resolves (list, row) references to loaded records
+
+    '''
+    def __init__(self, file, lists):
+        super().__init__(file)
+        self.lists = lists
+
+    def persistent_load(self, pid):
+        name, row = pid
+        return self.lists[name][row]
+
+
+@attr.s
+class MatchIndex:
+    '''
+    Base player table and the indexes Site builds over it, read from a
+    file made by MatchIndex.build
+
+    Player lists are loaded on open; each index is unpickled on first
+    use, so a process only pays for the indexes its matching needs.
+    Every process gets its own copy of what it loads. The file stays
+    open, so sections still come from the same build if the file is
+    rebuilt meanwhile. Pass it to Site(index_file=...).
+
+    Sections are pickles, and unpickling runs code named in the file:
+    only open index files you built or trust.
+
+    '''
+    path = attr.ib(type=str)
+    header = attr.ib(type=dict)
+    snapshot = attr.ib(default=None)
+    lists = attr.ib(type=dict, factory=dict)
+    _file = attr.ib(default=None, repr=False)
+    _start = attr.ib(type=int, default=0, repr=False)
+    _loaded = attr.ib(type=dict, factory=dict, repr=False)
+
+    @classmethod
+    def build(cls, path, site):
+        '''
+        Writes the player table of site and its indexes to path
+
+        The file is written next to path and renamed over it, so
+        processes opening path never see a partial file. The database
+        fingerprint is taken before the player table is read, so a
+        write in between leaves the file stale rather than wrongly
+        fresh; site should not have loaded the player table yet.
+
+        Args:
+            path(str):
+            site(Site): connected to the database
+
+        Returns:
+            MatchIndex
+
+        '''
+        found = fingerprint(site.eng)
+        snapshot = site.get_player_snapshot()
+        lists = {'players': site.get_base_players(),
+                 'mfl_players': site.get_mfl_players()}
+        sections = {'player': pickle.dumps(snapshot.columns,
+                                           pickle.HIGHEST_PROTOCOL)}
+        sections.update((name, pickle.dumps(records, pickle.HIGHEST_PROTOCOL))
+                        for name, records in lists.items())
+        getters = {'name': site.get_name_index,
+                   'namepos': site.get_namepos_index,
+                   'id': site.get_id_index,
+                   'ngram': site.get_ngram_index,
+                   'phonetic': site.get_phonetic_index,
+                   'alias': site.get_alias_index,
+                   'choices': site.get_choices}
+        for name, records in lists.items():
+            rows = {id(record): (name, row)
+                    for row, record in enumerate(records)}
+            for kind, key in INDEXES:
+                args = key if isinstance(key, tuple) else (key,)
+                buf = io.BytesIO()
+                _Pickler(buf, rows).dump(getters[kind](records, *args))
+                sections[section_name(name, kind, key)] = buf.getvalue()
+
+        offsets, offset = {}, 0
+        for name, data in sections.items():
+            offsets[name] = (offset, len(data))
+            offset += len(data)
+        header = json.dumps({
+            'version': INDEX_VERSION,
+            'code': code_hash(),
+            'fingerprint': found,
+            'lengths': {name: len(records) for name, records in lists.items()},
+            'sections': offsets,
+        }).encode()
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                   suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(MAGIC)
+                f.write(PREAMBLE.pack(INDEX_VERSION, len(header)))
+                f.write(header)
+                for data in sections.values():
+                    f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        logging.info('built %s: %s sections, %s bytes', path,
+                     len(sections), offset)
+        return cls.open(path)
+
+    @classmethod
+    def open(cls, path, eng=None):
+        '''
+        Opens an index file
+
+        Args:
+            path(str):
+            eng(sqlalchemy engine): database the file must match,
+                default None skips the check
+
+        Returns:
+            MatchIndex
+
+        Raises:
+            ValueError: if the file is not an index of this version,
+                was built by other code, cannot be read, or eng has
+                changed since it was built
+
+        '''
+        f = open(path, 'rb')
+        try:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError('{} is not an index file'.format(path))
+            try:
+                version, size = PREAMBLE.unpack(f.read(PREAMBLE.size))
+            except struct.error:
+                raise ValueError('{} is truncated'.format(path)) from None
+            if version != INDEX_VERSION:
+                raise ValueError('{} is index version {}, not {}'
+                                 .format(path, version, INDEX_VERSION))
+            try:
+                header = json.loads(f.read(size))
+            except ValueError:
+                raise ValueError('{} has a corrupt header'
+                                 .format(path)) from None
+            if header.get('code') != code_hash():
+                raise ValueError('{} was built by other code'.format(path))
+            if eng is not None and header['fingerprint'] != fingerprint(eng):
+                raise ValueError('{} is stale: the database has changed '
+                                 'since it was built'.format(path))
+        except BaseException:
+            f.close()
+            raise
+        index = cls(path=path, header=header, file=f, start=f.tell())
+        try:
+            index.snapshot = Snapshot(columns=index._section('player'))
+            index.lists = {name: index._section(name)
+                           for name in header['lengths']}
+        except BaseException:
+            index.close()
+            raise
+        return index
+
+    def _section(self, name):
+        '''
+        Unpickles a section, with the collector paused:
+        the objects it makes are all kept
+
+        Raises:
+            ValueError: if the section cannot be unpickled, so
+                load_index treats the file as stale
+
+        '''
+        offset, size = self.header['sections'][name]
+        self._file.seek(self._start + offset)
+        data = self._file.read(size)
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return _Unpickler(io.BytesIO(data), self.lists).load()
+        except Exception as e:
+            raise ValueError('{}: cannot read section {}: {!r}'
+                             .format(self.path, name, e)) from e
+        finally:
+            if enabled:
+                gc.enable()
+
+    def get(self, kind, match_from, key):
+        '''
+        Prebuilt index over match_from, for Site._cached_index
+
+        Args:
+            kind(str): index kind
+            match_from(list): of dict
+            key(str): or tuple of str
+
+        Returns:
+            index, or None if the file has none for match_from
+            or its section cannot be read
+
+        '''
+        for name, records in self.lists.items():
+            if records is match_from:
+                break
+        else:
+            return None
+        if len(match_from) != self.header['lengths'][name]:
+            return None
+        section = section_name(name, kind, key)
+        if section not in self._loaded:
+            if section not in self.header['sections'] or self._file is None:
+                return None
+            try:
+                self._loaded[section] = self._section(section)
+            except ValueError as e:
+                logging.warning('%s; building it instead', e)
+                return None
+        return self._loaded[section]
+
+    def close(self):
+        '''
+        Closes the file; indexes not yet loaded are then built
+        by Site instead
+
+        Returns:
+            None
+
+        '''
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def load_index(path,
+               connstr=None,
+               database='sqlite',
+               database_file='../namematcher.sqlite',
+               schema=None):
+    '''
+    Opens the index file at path, building it first if it is
+    missing, unreadable, built by another version or other code,
+    or older than the database
+
+    Only a rebuild reflects the database; opening a current file
+    just checks the fingerprint.
+
+    Args:
+        path(str):
+        connstr(str): default None
+        database(str): default 'sqlite'
+        database_file(str): default '../namematcher.sqlite'
+        schema(str): default None
+
+    Returns:
+        MatchIndex
+
+    '''
+    eng = create_engine(connection_string(connstr, database, database_file))
+    try:
+        return MatchIndex.open(path, eng)
+    except (FileNotFoundError, ValueError) as e:
+        logging.info('rebuilding index: %s', e)
+    finally:
+        eng.dispose()
+    base, eng, session = setup(connstr, database, database_file, schema)
+    try:
+        return MatchIndex.build(path, Site(base=base, eng=eng,
+                                           session=session))
+    finally:
+        session.close()
+        eng.dispose()
+
+
+if __name__ == '__main__':
+    pass
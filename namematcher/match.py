@@ -5,10 +5,15 @@ Common cross-reference functions
 '''
 
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+import functools
+import itertools
 import logging
+import os
+import pickle
 import signal
 
-from fuzzywuzzy import process
+from .score import get_scorer
 
 logging.getLogger(__name__).addHandler(logging.NullHandler())
 
@@ -17,76 +22,299 @@ def match_name(to_match,
                match_from,
                thresh=90,
                timeout=2,
-               interactive=False):
+               interactive=False,
+               index=None,
+               scorer=None,
+               aliases=None):
     '''
-    Tries direct match, then fuzzy match, then interactive (optional)
+    Tries direct match, then alias, then fuzzy match,
+    then interactive (optional)
 
     Args:
         to_match(str):
-        match_from(list): of str
+        match_from(list): of str, or Choices
         thresh(int): threshold for quality of match (1-100), default 90
         timeout(int): how long to wait for interactive prompt, default 2
         interactive(bool):
+        index: NgramIndex or PhoneticIndex over match_from, default None
+        scorer: scorer backend name or object, default 'fuzzywuzzy'
+        aliases(AliasIndex): known aliases of names in match_from,
+            default None
 
     Returns:
         str
 
     '''
     # try direct match first
-    # if not, go fuzzy and then interactive
+    # if not, try aliases, go fuzzy and then interactive
     matches = [nm for nm in match_from if nm == to_match]
     if matches and len(matches) == 1:
         return matches[0]
 
-    matches, conf = match_fuzzy(to_match, match_from)
+    if aliases is not None:
+        match = aliases.match(to_match)
+        if match:
+            return match[aliases.name_key]
+
+    matches, conf = match_fuzzy(to_match, match_from, index=index,
+                                thresh=thresh, scorer=scorer)
     if conf >= thresh:
         return matches
 
     if interactive:
-        return match_interactive(to_match, match_from, timeout=timeout)
+        return match_interactive(to_match, match_from, timeout=timeout,
+                                 scorer=scorer)
     else:
         return None
 
 
-def match_fuzzy(to_match, match_from):
+def match_fuzzy(to_match, match_from, index=None, thresh=0, scorer=None):
     '''
     Matches player with fuzzy match
 
     Args:
         to_match (str): name to match
-        match_from (list): list of names to match against
+        match_from (list): list of names to match against, or Choices
+        index: NgramIndex or PhoneticIndex over match_from, default None
+        thresh (int): score the match must reach, default 0
+        scorer: scorer backend name or object, default 'fuzzywuzzy'
 
     Returns:
         match(str): matched name from match_from list
         confidence(int): confidence of match
+        (None, 0) if no name reaches thresh
 
     Example:
         name, conf = match_player(name, names)
 
     '''
-    return process.extractOne(to_match, match_from)
+    names = None
+    if index is not None:
+        names = index.candidates(to_match, thresh)
+        if not names:
+            return (None, 0)
+    match = get_scorer(scorer).extract_one(to_match, match_from, names=names,
+                                           score_cutoff=thresh)
+    return match if match else (None, 0)
+
+
+def match_many(names,
+               match_from,
+               thresh=90,
+               workers=None,
+               index=None,
+               chunksize=None,
+               scorer=None,
+               executor=None):
+    '''
+    Fuzzy matches many names, split across a process pool
+
+    Args:
+        names(list): of str, names to match
+        match_from(list): list of names to match against, or Choices
+        thresh(int): threshold for quality of match (1-100), default 90
+        workers(int): number of processes, default os.cpu_count()
+        index: NgramIndex or PhoneticIndex over match_from, default None
+        chunksize(int): names sent to a process at a time,
+            default None splits names evenly across workers
+        scorer: scorer backend name or object, default 'fuzzywuzzy'
+        executor(ProcessPoolExecutor): pool to run in, default None
+            starts one for this call; pass one to reuse it across calls
+
+    Returns:
+        list: of (str, int), in the order of names
+        (None, 0) if no name reaches thresh
+
+    '''
+    unique = list(dict.fromkeys(names))
+    chunks, workers = _chunks(unique, workers, chunksize)
+    if workers > 1 or executor is not None and len(chunks) > 1:
+        results = [r for chunk in _pool_map(_match_chunk, chunks,
+                                            (match_from, index, thresh,
+                                             scorer),
+                                            workers, executor)
+                   for r in chunk]
+    else:
+        _init_many(match_from, index, thresh, scorer)
+        try:
+            results = [r for chunk in chunks for r in _match_chunk(chunk)]
+        finally:
+            _many_state.clear()
+    scored = dict(zip(unique, results))
+    return [scored[nm] for nm in names]
+
+
+def extract_many(names,
+                 match_from,
+                 limit=3,
+                 workers=None,
+                 chunksize=25,
+                 scorer=None,
+                 score_cutoff=0,
+                 executor=None):
+    '''
+    Top fuzzy matches of many names, split across a process pool
+    Results are yielded in the order of names as soon as their chunk
+    is scored, so a caller can work on the first names while the
+    rest are scored
+
+    Args:
+        names(list): of str, names to match
+        match_from(list): list of names to match against, or Choices
+        limit(int): matches per name, default 3
+        workers(int): number of processes, default os.cpu_count()
+        chunksize(int): names sent to a process at a time, default 25
+        scorer: scorer backend name or object, default 'fuzzywuzzy'
+        score_cutoff(int): minimum score of a match, default 0
+        executor(ProcessPoolExecutor): pool to run in, default None
+            starts one for this call; pass one to reuse it across calls
+
+    Returns:
+        generator: of (str, list of (str, int))
+
+    '''
+    unique = list(dict.fromkeys(names))
+    if not unique:
+        return
+    chunks, workers = _chunks(unique, workers, chunksize)
+    if workers > 1 or executor is not None and len(chunks) > 1:
+        found = _pool_map(_extract_chunk, chunks,
+                          (match_from, None, score_cutoff, scorer, limit),
+                          workers, executor)
+        for chunk, matches in zip(chunks, found):
+            yield from zip(chunk, matches)
+    else:
+        scorer = get_scorer(scorer)
+        for nm in unique:
+            yield nm, scorer.top(nm, match_from, limit=limit,
+                                 score_cutoff=score_cutoff)
+
+
+def _chunks(unique, workers, chunksize):
+    '''
+    Splits names into chunks, chunksize names each or evenly across
+    workers if chunksize is None, and caps workers at the chunk count
+
+    Returns:
+        tuple: of list of list of str, int
+
+    '''
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, -(-len(unique) // workers))
+    chunks = [unique[i:i + chunksize] for i in range(0, len(unique), chunksize)]
+    return chunks, min(workers, len(chunks))
+
+
+def _pool_map(func, chunks, initargs, workers, executor):
+    '''
+    Maps func over chunks in executor, or in a pool of workers
+    started for the call
+
+    initargs go with every chunk, pickled once here; each worker
+    unpickles them on its first chunk of the call, so a long-lived
+    executor can serve calls over different names and indexes
+
+    Returns:
+        generator: of func results, in the order of chunks
+
+    '''
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            yield from _pool_map(func, chunks, initargs, workers, pool)
+        return
+    key = (os.getpid(), next(_calls))
+    data = pickle.dumps(initargs, pickle.HIGHEST_PROTOCOL)
+    yield from executor.map(functools.partial(_run_chunk, func, key, data),
+                            chunks)
+
+
+_calls = itertools.count()
+_many_state = {}
+
+
+def _run_chunk(func, key, data, chunk):
+    '''
+    Runs func over a chunk in a worker process, loading the call's
+    arguments unless this worker already has them
+
+    '''
+    if _many_state.get('key') != key:
+        _many_state.clear()
+        _init_many(*pickle.loads(data))
+        _many_state['key'] = key
+    return func(chunk)
+
+
+def _init_many(match_from, index, thresh, scorer, limit=None):
+    '''
+    Stores match_many and extract_many arguments in the process that
+    scores them
+
+    '''
+    _many_state.update(match_from=match_from, index=index, thresh=thresh,
+                       scorer=get_scorer(scorer), limit=limit)
+
+
+def _extract_chunk(chunk):
+    '''
+    Top matches of a chunk of names in a worker process
+
+    Args:
+        chunk(list): of str
+
+    Returns:
+        list: of list of (str, int)
+
+    '''
+    return [_many_state['scorer'].top(nm, _many_state['match_from'],
+                                      limit=_many_state['limit'],
+                                      score_cutoff=_many_state['thresh'])
+            for nm in chunk]
+
+
+def _match_chunk(chunk):
+    '''
+    Fuzzy matches a chunk of names in a worker process
+
+    Args:
+        chunk(list): of str
+
+    Returns:
+        list: of (str, int)
+
+    '''
+    return [match_fuzzy(nm, _many_state['match_from'],
+                        index=_many_state['index'],
+                        thresh=_many_state['thresh'],
+                        scorer=_many_state['scorer'])
+            for nm in chunk]
 
 
 def match_interactive(to_match,
                       match_from,
                       default=None,
                       choices=3,
-                      timeout=15):
+                      timeout=15,
+                      scorer=None):
     '''
     Matches name with fuzzy match, interactive confirmation
 
     Args:
         to_match(str): name to match
-        match_from(list): list of names to match against
+        match_from(list): list of names to match against, or Choices
         default: default value is None
         choices(int): number of matches to try
         timeout(int): seconds to wait before providing default value
+        scorer: scorer backend name or object, default 'fuzzywuzzy'
 
     Returns:
         (str, int)
 
     '''
-    for match in process.extract(to_match, match_from, limit=choices):
+    matches = get_scorer(scorer).top(to_match, match_from, limit=choices)
+    for match in matches:
         msg = 'Matched {} to {} with conf {}: '.format(to_match, match[0], match[1])
         resp = read_input(prompt=msg, timeout=timeout, default=default)
         if resp:
@@ -120,7 +348,7 @@ def name_dict(names,
     elif first_name_key and last_name_key:
         for nm in names:
             k = '{} {}'.format(nm[first_name_key], nm[last_name_key])
-            d[k].append(p)
+            d[k].append(nm)
     else:
         msg = 'must specify full_name_key or first_name + last_name key'
         raise ValueError(msg)
@@ -150,12 +378,12 @@ def namepos_dict(names,
     if full_name_key:
         for nm in names:
             k = '{}_{}'.format(nm[full_name_key], nm[pos_key])
-            d[k].append(p)
+            d[k].append(nm)
     elif first_name_key and last_name_key:
         for nm in names:
             k = '{} {}_{}'.format(nm[first_name_key],
                                   nm[last_name_key], nm[pos_key])
-            d[k].append(p)
+            d[k].append(nm)
     else:
         msg = 'must specify full_name_key or first_name + last_name key'
         raise ValueError(msg)
@@ -174,6 +402,19 @@ def read_input(prompt,
         timeoutmsg(str): optional message to print if timed out
 
     '''
+    # once a review has started reading stdin on a thread,
+    # input() would race it for lines, so ask through that thread
+    from .review import active_reader
+    reader = active_reader()
+    if reader is not None:
+        timed_out = object()
+        answer = reader.ask(prompt, timeout=timeout, default=timed_out)
+        if answer is not timed_out:
+            return answer
+        if timeoutmsg:
+            print(timeoutmsg)
+        return default
+
     # based on https://stackoverflow.com/questions/44037060/
     # how-to-set-a-timeout-for-input
     def timeout_error(*_):
@@ -4,12 +4,60 @@ Common name functions
 
 '''
 
+from concurrent.futures import ProcessPoolExecutor
+import functools
 import logging
+import unicodedata
+
+import attr
 from nameparser import HumanName
 
 logging.getLogger(__name__).addHandler(logging.NullHandler())
 
 
+PARSE_CACHE_SIZE = 65536
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_name(name):
+    '''
+    First and last name from HumanName, cached
+
+    HumanName is mutable, so only its parts are cached
+
+    Args:
+        name(str)
+
+    Returns:
+        tuple: of str
+
+    '''
+    hn = HumanName(name)
+    return (hn.first, hn.last)
+
+
+def parse_cache_info():
+    '''
+    Hits, misses and size of the parse_name cache
+
+    Returns:
+        CacheInfo
+
+    '''
+    return parse_name.cache_info()
+
+
+def parse_cache_clear():
+    '''
+    Empties the parse_name cache
+
+    Returns:
+        None
+
+    '''
+    parse_name.cache_clear()
+
+
 def first_last(name):
     '''
     Returns name in First Last format
@@ -21,8 +69,7 @@ def first_last(name):
         str
 
     '''
-    hn = HumanName(name)
-    return '{0} {1}'.format(hn.first, hn.last)
+    return '{0} {1}'.format(*parse_name(name))
 
 
 def first_last_pair(name):
@@ -36,8 +83,7 @@ def first_last_pair(name):
         tuple: of str
 
     '''
-    hn = HumanName(name)
-    return (hn.first, hn.last)
+    return parse_name(name)
 
 
 def last_first(name):
@@ -51,9 +97,199 @@ def last_first(name):
         str
 
     '''
+    return '{1}, {0}'.format(*parse_name(name))
 
-    hn = HumanName(name)
-    return '{1}, {0}'.format(hn.first, hn.last)
+
+def _many(func, names, workers=1, chunksize=10000):
+    '''
+    Applies func once per unique name, optionally in a process pool
+
+    Args:
+        func(callable): module-level function of one name
+        names(list): of str
+        workers(int): number of processes, default 1
+        chunksize(int): names sent to a process at a time, default 10000
+
+    Returns:
+        list: in the order of names
+
+    '''
+    unique = list(dict.fromkeys(names))
+    if workers and workers > 1 and len(unique) > chunksize:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(func, unique, chunksize=chunksize))
+    else:
+        results = [func(nm) for nm in unique]
+    parsed = dict(zip(unique, results))
+    return [parsed[nm] for nm in names]
+
+
+def first_last_many(names, workers=1, chunksize=10000):
+    '''
+    first_last for many names, parsing each unique name once
+
+    Args:
+        names(list): of str
+        workers(int): number of processes, default 1
+        chunksize(int): names sent to a process at a time, default 10000
+
+    Returns:
+        list: of str
+
+    '''
+    return _many(first_last, names, workers, chunksize)
+
+
+def first_last_pair_many(names, workers=1, chunksize=10000):
+    '''
+    first_last_pair for many names, parsing each unique name once
+
+    Args:
+        names(list): of str
+        workers(int): number of processes, default 1
+        chunksize(int): names sent to a process at a time, default 10000
+
+    Returns:
+        list: of tuple
+
+    '''
+    return _many(first_last_pair, names, workers, chunksize)
+
+
+def last_first_many(names, workers=1, chunksize=10000):
+    '''
+    last_first for many names, parsing each unique name once
+
+    Args:
+        names(list): of str
+        workers(int): number of processes, default 1
+        chunksize(int): names sent to a process at a time, default 10000
+
+    Returns:
+        list: of str
+
+    '''
+    return _many(last_first, names, workers, chunksize)
+
+
+# combining marks left behind by NFKD decomposition
+COMBINING_RANGES = ((0x0300, 0x0370), (0x1AB0, 0x1B00), (0x1DC0, 0x1E00),
+                    (0x20D0, 0x2100), (0xFE20, 0xFE30))
+
+
+@attr.s
+class Normalizer:
+    '''
+    Name normalization compiled once into a single function:
+        * suffixes, punctuation and commas removed in order,
+          skipping tokens the name does not contain
+        * a trailing " V" dropped without re-splitting the name
+        * optional diacritic removal (NFKD plus one str.translate
+          table of combining marks), casefold and whitespace collapse
+
+    Default settings give the same output as namestrip
+
+    '''
+    suffixes = attr.ib(type=tuple, default=('Jr.', 'III', 'IV', 'II'),
+                       converter=tuple)
+    punctuation = attr.ib(type=str, default="'.")
+    commas = attr.ib(type=bool, default=True)
+    trailing_v = attr.ib(type=bool, default=True)
+    diacritics = attr.ib(type=bool, default=False)
+    casefold = attr.ib(type=bool, default=False)
+    collapse = attr.ib(type=bool, default=False)
+
+    def __attrs_post_init__(self):
+        self.normalize = self._compile()
+
+    def _compile(self):
+        '''
+        Builds the normalizing function for these settings
+
+        Returns:
+            callable
+
+        '''
+        # replacing in order differs from one regex pass (e.g. "IIV"), and
+        # for short names guarded str.replace beats str.translate and re.sub
+        steps = self.suffixes + tuple(self.punctuation)
+        if self.commas:
+            steps += (', ', ',')
+        if self.diacritics:
+            marks = dict.fromkeys(
+                cp for lo, hi in COMBINING_RANGES for cp in range(lo, hi)
+                if unicodedata.combining(chr(cp)))
+        else:
+            marks = None
+        trailing_v = self.trailing_v
+        casefold = self.casefold
+        collapse = self.collapse
+
+        def normalize(nm):
+            if marks is not None:
+                nm = unicodedata.normalize('NFKD', nm).translate(marks)
+            for step in steps:
+                if step in nm:
+                    nm = nm.replace(step, '')
+            stripped = nm.rstrip()
+            if trailing_v and stripped[-1:] == 'V' and \
+                    (len(stripped) == 1 or stripped[-2].isspace()):
+                nm = ' '.join(stripped.split()[:-1])
+            else:
+                nm = nm.strip()
+            if casefold:
+                nm = nm.casefold()
+            if collapse:
+                nm = ' '.join(nm.split())
+            return nm
+
+        return normalize
+
+    def __call__(self, nm):
+        '''
+        Normalizes one name
+
+        Args:
+            nm(str):
+
+        Returns:
+            str
+
+        '''
+        return self.normalize(nm)
+
+    def many(self, names):
+        '''
+        Normalizes many names, each unique name once
+
+        Args:
+            names(list): of str
+
+        Returns:
+            list: of str
+
+        '''
+        normalize = self.normalize
+        normalized = {nm: normalize(nm) for nm in dict.fromkeys(names)}
+        return [normalized[nm] for nm in names]
+
+
+DEFAULT_NORMALIZER = Normalizer()
+
+
+def normalize_many(names, normalizer=None):
+    '''
+    Normalizes many names, each unique name once
+
+    Args:
+        names(list): of str
+        normalizer(Normalizer): default matches namestrip
+
+    Returns:
+        list: of str
+
+    '''
+    return (normalizer or DEFAULT_NORMALIZER).many(names)
 
 
 def namestrip(nm, tostrip=None):
@@ -69,7 +305,7 @@ def namestrip(nm, tostrip=None):
 
     '''
     if not tostrip:
-        tostrip = ['Jr.', 'III', 'IV', 'II', "'", '.', ', ', ',']
+        return DEFAULT_NORMALIZER.normalize(nm)
     for char in tostrip:
         nm = nm.replace(char, '')
     if len(nm.split()) > 0 and nm.split()[-1] == 'V':
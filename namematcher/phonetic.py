@@ -0,0 +1,307 @@
+'''
+phonetic.py
+Phonetic blocking keys for fuzzy matching
+
+'''
+
+from collections import defaultdict
+import logging
+
+import attr
+from fuzzywuzzy import utils
+
+from .name import namestrip
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+SOUNDEX_CODES = {c: str(d) for d, letters in
+                 enumerate(('aeiouy', 'bfpv', 'cgjkqsxz', 'dt', 'l',
+                            'mn', 'r')) for c in letters}
+
+# encoders whose codes keep only the start of a word
+TRUNCATING = frozenset(('soundex',))
+
+SUFFIXES = frozenset(('jr', 'sr', 'ii', 'iii', 'iv', 'v'))
+
+
+def soundex(word):
+    '''
+    American Soundex code of a word
+
+    Args:
+        word(str):
+
+    Returns:
+        str
+
+    '''
+    letters = [c for c in word.lower() if c.isalpha() and c.isascii()]
+    if not letters:
+        return ''
+    code = [letters[0].upper()]
+    last = SOUNDEX_CODES.get(letters[0])
+    for c in letters[1:]:
+        digit = SOUNDEX_CODES.get(c)
+        if digit is None:
+            # h and w do not separate letters with the same code
+            continue
+        if digit != '0' and digit != last:
+            code.append(digit)
+        last = digit
+    return ''.join(code)[:4].ljust(4, '0')
+
+
+def _jellyfish():
+    '''
+    The optional jellyfish package
+
+    '''
+    try:
+        import jellyfish
+    except ImportError:
+        raise ImportError('nysiis and metaphone encoders require '
+                          'jellyfish: pip install jellyfish')
+    return jellyfish
+
+
+def nysiis(word):
+    '''
+    NYSIIS code of a word, requires jellyfish
+
+    Args:
+        word(str):
+
+    Returns:
+        str
+
+    '''
+    return _jellyfish().nysiis(word) if word else ''
+
+
+def metaphone(word):
+    '''
+    Metaphone code of a word, requires jellyfish
+
+    Args:
+        word(str):
+
+    Returns:
+        str
+
+    '''
+    return _jellyfish().metaphone(word) if word else ''
+
+
+ENCODERS = {
+    'soundex': soundex,
+    'nysiis': nysiis,
+    'metaphone': metaphone,
+}
+
+
+def get_encoders(encoders=None):
+    '''
+    Encoder functions by name, module-level so indexes pickle
+
+    Args:
+        encoders(list): names in ENCODERS, default all
+
+    Returns:
+        tuple: of (name, callable)
+
+    '''
+    if encoders is None:
+        encoders = tuple(ENCODERS)
+    try:
+        return tuple((name, ENCODERS[name]) for name in encoders)
+    except KeyError as e:
+        raise ValueError('invalid encoder: {}'.format(e.args[0]))
+
+
+def name_parts(name):
+    '''
+    First and last token of a name, without suffixes or punctuation
+
+    Args:
+        name(str):
+
+    Returns:
+        tuple: of str
+
+    '''
+    tokens = [t for t in utils.full_process(namestrip(name)).split()
+              if t not in SUFFIXES]
+    if not tokens:
+        return '', ''
+    return tokens[0], tokens[-1]
+
+
+@attr.s
+class PhoneticIndex:
+    '''
+    Buckets of names by phonetic codes of their first and last names
+
+    candidates() returns names whose first and last names share a
+    code with the query's under any encoder, or whose full name
+    shares one. Unlike NgramIndex, recall is not guaranteed: a
+    candidate list trades a few misses for far fewer names scored.
+
+    '''
+    names = attr.ib(type=list)
+    firsts = attr.ib(type=list, default=None)
+    lasts = attr.ib(type=list, default=None)
+    encoders = attr.ib(default=None)
+
+    def __attrs_post_init__(self):
+        self._encoders = get_encoders(self.encoders)
+        self.choices = []
+        self.first_buckets = defaultdict(set)
+        self.last_buckets = defaultdict(set)
+        self.full_buckets = defaultdict(set)
+        self._seen = {}
+        self._index(self.names, self.firsts, self.lasts)
+
+    def add(self, names, firsts=None, lasts=None):
+        '''
+        Indexes more names, as if they ended the original list
+
+        Args:
+            names(list): of str
+            firsts(list): of str, default None
+            lasts(list): of str, default None
+
+        Returns:
+            None
+
+        '''
+        names = list(names)
+        self.names = self.names + names
+        self._index(names, firsts, lasts)
+
+    def add_records(self, records, name_key='full_name',
+                    first_key='first_name', last_key='last_name'):
+        '''
+        Indexes more player records, like from_records
+
+        Args:
+            records(list): of dict
+            name_key(str): default 'full_name'
+            first_key(str): default 'first_name'
+            last_key(str): default 'last_name'
+
+        Returns:
+            None
+
+        '''
+        self.add(*self._columns(records, name_key, first_key, last_key))
+
+    def _index(self, names, firsts, lasts):
+        '''
+        Adds names to the choices and phonetic buckets
+
+        '''
+        for i, name in enumerate(names):
+            if name in self._seen:
+                idx = self._seen[name]
+            else:
+                idx = self._seen[name] = len(self.choices)
+                self.choices.append(name)
+            first, last = name_parts(name)
+            if firsts is not None and firsts[i]:
+                first = utils.full_process(firsts[i])
+            if lasts is not None and lasts[i]:
+                last = utils.full_process(namestrip(lasts[i]))
+            # multi-word name columns (e.g. "St. Brown", "Arcega-Whiteside")
+            # are indexed whole and by the token name_parts would pick
+            for key in self.keys(first) | self.keys(first.split()[0]
+                                                    if first else ''):
+                self.first_buckets[key].add(idx)
+            for key in self.keys(last) | self.keys(last.split()[-1]
+                                                   if last else ''):
+                self.last_buckets[key].add(idx)
+            for key in self.keys(first + last, whole=True):
+                self.full_buckets[key].add(idx)
+
+    @classmethod
+    def from_records(cls, records, name_key='full_name',
+                     first_key='first_name', last_key='last_name',
+                     encoders=None):
+        '''
+        Index over player records, using their first and last name
+        columns when they have them
+
+        Args:
+            records(list): of dict
+            name_key(str): default 'full_name'
+            first_key(str): default 'first_name'
+            last_key(str): default 'last_name'
+            encoders(list): default all
+
+        Returns:
+            PhoneticIndex
+
+        '''
+        names, firsts, lasts = cls._columns(records, name_key, first_key,
+                                            last_key)
+        return cls(names=names, firsts=firsts, lasts=lasts,
+                   encoders=encoders)
+
+    @staticmethod
+    def _columns(records, name_key, first_key, last_key):
+        '''
+        Name, first and last name columns of records,
+        first and last None when records lack them
+
+        '''
+        has_parts = records and first_key in records[0] and \
+            last_key in records[0]
+        return ([r[name_key] for r in records],
+                [r[first_key] for r in records] if has_parts else None,
+                [r[last_key] for r in records] if has_parts else None)
+
+    def keys(self, word, whole=False):
+        '''
+        (encoder, code) keys of a word
+
+        Args:
+            word(str):
+            whole(bool): word is a whole name, skip encoders that
+                truncate, default False
+
+        Returns:
+            set: of tuple
+
+        '''
+        word = word.replace(' ', '')
+        if not word:
+            return set()
+        return {(name, encode(word)) for name, encode in self._encoders
+                if not (whole and name in TRUNCATING)}
+
+    def candidates(self, to_match, thresh=None):
+        '''
+        Names sharing a phonetic bucket with to_match, in the original order
+
+        Args:
+            to_match(str): name to match
+            thresh(int): unused, for the NgramIndex interface
+
+        Returns:
+            list: of str
+
+        '''
+        first, last = name_parts(to_match)
+        by_first = set().union(*(self.first_buckets.get(k, ())
+                                 for k in self.keys(first)))
+        by_last = set().union(*(self.last_buckets.get(k, ())
+                                for k in self.keys(last)))
+        found = (by_first & by_last).union(
+            *(self.full_buckets.get(k, ())
+              for k in self.keys(first + last, whole=True)))
+        logging.debug('%s phonetic candidates for %s', len(found), to_match)
+        return [self.choices[i] for i in sorted(found)]
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,81 @@
+'''
+position.py
+Mapping of source position codes to base player positions
+
+'''
+
+import logging
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+# primary_pos values in the base player table
+BASE_POSITIONS = frozenset(('QB', 'RB', 'WR', 'TE', 'K', 'P', 'DST', 'OL',
+                            'DL', 'LB', 'DB'))
+
+# source position code: base positions it can mean
+POSITION_MAP = {
+    'D': ('DST',),
+    'DEF': ('DST',),
+    'DST': ('DST',),
+    'D/ST': ('DST',),
+    'PK': ('K',),
+    'PN': ('P',),
+    'FB': ('RB',),
+    'HB': ('RB',),
+    'C': ('OL',),
+    'G': ('OL',),
+    'T': ('OL',),
+    'OT': ('OL',),
+    'OG': ('OL',),
+    'LS': ('OL',),
+    'DE': ('DL',),
+    'DT': ('DL',),
+    'NT': ('DL',),
+    'EDR': ('DL', 'LB'),
+    'EDGE': ('DL', 'LB'),
+    'ILB': ('LB',),
+    'OLB': ('LB',),
+    'CB': ('DB',),
+    'S': ('DB',),
+    'FS': ('DB',),
+    'SS': ('DB',),
+}
+
+
+def base_positions(pos, position_map=None):
+    '''
+    Base player positions a source position code can mean
+
+    Multi-position codes such as "DE,DT" or "WR/TE" give the union
+    of their parts; codes in POSITION_MAP, like "D/ST", are looked
+    up whole before being split
+
+    Args:
+        pos(str): source position
+        position_map(dict): overrides merged into POSITION_MAP, default None
+
+    Returns:
+        frozenset: of str, empty if pos is unknown
+
+    '''
+    if not pos:
+        return frozenset()
+    mapping = POSITION_MAP if position_map is None else \
+        dict(POSITION_MAP, **position_map)
+    positions = set()
+    for code in str(pos).upper().split(','):
+        code = code.strip()
+        parts = [code] if code in mapping else code.split('/')
+        for part in parts:
+            part = part.strip()
+            if part in mapping:
+                positions.update(mapping[part])
+            elif part in BASE_POSITIONS:
+                positions.add(part)
+            elif part:
+                return frozenset()
+    return frozenset(positions)
+
+if __name__ == '__main__':
+    pass
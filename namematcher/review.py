@@ -0,0 +1,284 @@
+'''
+review.py
+Interactive review queue with candidates scored ahead of the reviewer
+
+'''
+
+import logging
+import queue
+import sys
+import threading
+
+import attr
+
+from .match import extract_many
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+@attr.s
+class LineReader:
+    '''
+    Reads answers from a stream on a daemon thread, so prompts can
+    time out without SIGALRM, off the main thread and on Windows
+
+    '''
+    stream = attr.ib(default=None)
+    output = attr.ib(default=None)
+
+    def __attrs_post_init__(self):
+        self._lines = queue.Queue()
+        self._thread = None
+        self._timed_out = False
+
+    def _read(self):
+        '''
+        Queues lines until end of stream, then None
+
+        '''
+        for line in iter((self.stream or sys.stdin).readline, ''):
+            self._lines.put(line.rstrip('\r\n'))
+        self._lines.put(None)
+
+    def write(self, text):
+        '''
+        Writes text to output without a newline
+
+        Args:
+            text(str):
+
+        Returns:
+            None
+
+        '''
+        out = self.output or sys.stdout
+        out.write(text)
+        out.flush()
+
+    def ask(self, prompt, timeout=None, default=None):
+        '''
+        Reads one answer
+
+        Args:
+            prompt(str):
+            timeout(float): seconds to wait, default None waits forever
+            default: returned on timeout or end of input, default None
+
+        Returns:
+            str
+
+        '''
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._read, daemon=True)
+            self._thread.start()
+        # after a timeout, lines already read are late replies
+        # to that prompt, not answers to this one
+        while self._timed_out:
+            try:
+                line = self._lines.get_nowait()
+            except queue.Empty:
+                break
+            if line is None:
+                self._lines.put(None)
+                break
+        self._timed_out = False
+        self.write(prompt)
+        try:
+            line = self._lines.get(timeout=timeout)
+        except queue.Empty:
+            self._timed_out = True
+            self.write('\n')
+            return default
+        if line is None:
+            self._lines.put(None)
+            return default
+        return line
+
+
+# one LineReader per stream, see shared_reader
+_READERS = {}
+_READERS_LOCK = threading.Lock()
+
+
+def shared_reader(stream=None):
+    '''
+    The LineReader of a stream, made on first use
+
+    A LineReader's thread reads its stream until end of input, so two
+    readers of one stream would split its lines between them. Reviews
+    and read_input share this one instead.
+
+    Args:
+        stream(file): default sys.stdin
+
+    Returns:
+        LineReader
+
+    '''
+    stream = stream or sys.stdin
+    with _READERS_LOCK:
+        if stream not in _READERS:
+            _READERS[stream] = LineReader(stream=stream)
+        return _READERS[stream]
+
+
+def active_reader(stream=None):
+    '''
+    The shared LineReader of a stream if it has started reading
+
+    Args:
+        stream(file): default sys.stdin
+
+    Returns:
+        LineReader or None
+
+    '''
+    reader = _READERS.get(stream or sys.stdin)
+    if reader is not None and reader._thread is not None:
+        return reader
+    return None
+
+
+@attr.s
+class ReviewQueue:
+    '''
+    Human review of names without a direct, alias or cached match
+
+    Top candidates for every name are scored up front on a background
+    thread (and a process pool when workers > 1), so the reviewer
+    answers from a ready queue instead of waiting on the scorer between
+    prompts. Only candidates scoring floor or better are shown.
+    Answers are collected through a LineReader, by default the one
+    shared by everything reading stdin, and decisions are handed to
+    on_batch every batch_size answers.
+
+    '''
+    limit = attr.ib(type=int, default=3)
+    floor = attr.ib(type=int, default=0)
+    timeout = attr.ib(default=30)
+    batch_size = attr.ib(type=int, default=25)
+    workers = attr.ib(default=1)
+    chunksize = attr.ib(type=int, default=25)
+    reader = attr.ib(factory=shared_reader)
+
+    def review(self, groups, scorer=None, on_batch=None):
+        '''
+        Reviews names, group by group
+
+        Args:
+            groups(list): of (names, choices, scope): names to review
+                against choices, scope is returned with each decision
+            scorer: scorer backend name or object, default 'fuzzywuzzy'
+            on_batch(callable): gets lists of (name, scope, match, conf)
+                decisions as they accumulate, default None
+
+        Returns:
+            dict: of (name, scope): (str, int), (None, 0) if skipped
+
+        '''
+        ready = queue.Queue()
+        stop = threading.Event()
+        producer = threading.Thread(target=self._produce,
+                                    args=(groups, scorer, ready, stop),
+                                    daemon=True)
+        producer.start()
+        total = sum(len(dict.fromkeys(names)) for names, _, _ in groups)
+        reviewed, batch = {}, []
+        try:
+            while True:
+                item = ready.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                name, scope, found = item
+                answer = self.ask(name, found, len(reviewed) + 1, total)
+                if answer == 'quit':
+                    break
+                reviewed[name, scope] = answer or (None, 0)
+                if answer:
+                    batch.append((name, scope) + answer)
+                if on_batch is not None and len(batch) >= self.batch_size:
+                    on_batch(batch)
+                    batch = []
+        finally:
+            stop.set()
+            if on_batch is not None and batch:
+                on_batch(batch)
+        logging.info('reviewed %s of %s names', len(reviewed), total)
+        return reviewed
+
+    def _produce(self, groups, scorer, ready, stop):
+        '''
+        Scores candidates for each group onto the ready queue,
+        then None; exceptions are passed to the reviewer
+
+        '''
+        try:
+            for names, choices, scope in groups:
+                for name, found in extract_many(names, choices,
+                                                limit=self.limit,
+                                                workers=self.workers,
+                                                chunksize=self.chunksize,
+                                                scorer=scorer,
+                                                score_cutoff=self.floor):
+                    if stop.is_set():
+                        return
+                    ready.put((name, scope, found))
+        except Exception as e:
+            ready.put(e)
+        finally:
+            ready.put(None)
+
+    def ask(self, name, found, number, total):
+        '''
+        Prompts for one name
+
+        Args:
+            name(str): name to match
+            found(list): of (str, int) candidates
+            number(int): position in the queue
+            total(int): names in the queue
+
+        Returns:
+            (str, int) chosen candidate, None if skipped,
+            'quit' to end the review
+
+        '''
+        if not found:
+            return None
+        lines = ['\n[{}/{}] {}\n'.format(number, total, name)]
+        lines.extend('  {}) {} ({})\n'.format(i, nm, conf)
+                     for i, (nm, conf) in enumerate(found, 1))
+        self.reader.write(''.join(lines))
+        answer = self.reader.ask('Match [1-{}, enter to skip, q to quit]: '
+                                 .format(len(found)), timeout=self.timeout,
+                                 default='')
+        answer = answer.strip().lower()
+        if answer == 'q':
+            return 'quit'
+        if answer.isdigit() and 1 <= int(answer) <= len(found):
+            return tuple(found[int(answer) - 1][:2])
+        return None
+
+
+def get_queue(interactive):
+    '''
+    ReviewQueue for the interactive argument of Site.match
+
+    Args:
+        interactive: bool, 'review' or ReviewQueue
+
+    Returns:
+        ReviewQueue, or None for per-name prompts or no prompts
+
+    '''
+    if isinstance(interactive, ReviewQueue):
+        return interactive
+    if interactive == 'review':
+        return ReviewQueue()
+    return None
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,228 @@
+'''
+score.py
+Pluggable scorer backends for fuzzy matching
+
+'''
+
+import logging
+
+import attr
+from fuzzywuzzy import process, utils
+
+from .choices import Choices, compile_query
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+@attr.s
+class FuzzywuzzyScorer:
+    '''
+    fuzz.WRatio from fuzzywuzzy, the reference behavior
+
+    With Choices, candidates that cannot reach score_cutoff are
+    skipped before any SequenceMatcher work
+
+    '''
+    name = 'fuzzywuzzy'
+
+    def extract_one(self, query, match_from, names=None, score_cutoff=0):
+        '''
+        Best match for query
+
+        Args:
+            query(str): name to match
+            match_from(list): list of names to match against, or Choices
+            names(list): subset of match_from to score, default None
+            score_cutoff(int): minimum score, default 0
+
+        Returns:
+            tuple: (str, int) or None
+
+        '''
+        if isinstance(match_from, Choices):
+            return match_from.extract_one(query, names=names,
+                                          score_cutoff=score_cutoff)
+        return process.extractOne(query,
+                                  match_from if names is None else names,
+                                  score_cutoff=score_cutoff)
+
+    def extract(self, query, match_from, limit=5, names=None):
+        '''
+        Best matches for query, highest score first
+
+        Args:
+            query(str): name to match
+            match_from(list): list of names to match against, or Choices
+            limit(int): number of matches, default 5
+            names(list): subset of match_from to score, default None
+
+        Returns:
+            list: of (str, int)
+
+        '''
+        if isinstance(match_from, Choices):
+            return match_from.extract(query, limit=limit, names=names)
+        return process.extract(query,
+                               match_from if names is None else names,
+                               limit=limit)
+
+    def top(self, query, match_from, limit=5, names=None, score_cutoff=0):
+        '''
+        Best distinct matches for query scoring at least score_cutoff
+
+        Args:
+            query(str): name to match
+            match_from(list): list of names to match against, or Choices
+            limit(int): number of matches, None for all, default 5
+            names(list): subset of match_from to score, default None
+            score_cutoff(int): minimum score, default 0
+
+        Returns:
+            list: of (str, int), highest score first
+
+        '''
+        if isinstance(match_from, Choices):
+            return match_from.top(query, limit=limit, names=names,
+                                  score_cutoff=score_cutoff)
+        choices = list(dict.fromkeys(match_from if names is None else names))
+        return process.extractBests(query, choices, score_cutoff=score_cutoff,
+                                    limit=limit)
+
+
+@attr.s
+class RapidfuzzScorer:
+    '''
+    fuzz.WRatio from rapidfuzz, compiled and score-cutoff aware
+
+    rapidfuzz stops scoring a candidate once it can no longer reach
+    score_cutoff. Scores are rounded to int but can differ slightly
+    from fuzzywuzzy. Requires the optional rapidfuzz package.
+
+    '''
+    name = 'rapidfuzz'
+
+    def __attrs_post_init__(self):
+        try:
+            import rapidfuzz
+        except ImportError:
+            raise ImportError('rapidfuzz scorer requires rapidfuzz: '
+                              'pip install rapidfuzz')
+
+    def _prepare(self, query, match_from, names):
+        '''
+        Query and choices in the form rapidfuzz scores
+
+        Choices are already processed, so rapidfuzz skips its processor
+
+        '''
+        from rapidfuzz import utils as rf_utils
+        if names is None:
+            names = list(match_from)
+        if isinstance(match_from, Choices):
+            processed = [match_from.forms[nm].processed for nm in names]
+            return compile_query(query).processed, names, processed, None
+        return query, names, names, rf_utils.default_process
+
+    def extract_one(self, query, match_from, names=None, score_cutoff=0):
+        '''
+        Best match for query
+
+        Args:
+            query(str): name to match
+            match_from(list): list of names to match against, or Choices
+            names(list): subset of match_from to score, default None
+            score_cutoff(int): minimum score, default 0
+
+        Returns:
+            tuple: (str, int) or None
+
+        '''
+        from rapidfuzz import fuzz as rf_fuzz, process as rf_process
+        if names is None and isinstance(match_from, Choices):
+            names = list(match_from.forms)
+        query, names, choices, processor = self._prepare(query, match_from,
+                                                         names)
+        best = rf_process.extractOne(query, choices,
+                                     scorer=rf_fuzz.WRatio,
+                                     processor=processor,
+                                     score_cutoff=max(score_cutoff - .5, 0))
+        if best is None or utils.intr(best[1]) < score_cutoff:
+            return None
+        return (names[best[2]], utils.intr(best[1]))
+
+    def extract(self, query, match_from, limit=5, names=None):
+        '''
+        Best matches for query, highest score first
+
+        Args:
+            query(str): name to match
+            match_from(list): list of names to match against, or Choices
+            limit(int): number of matches, default 5
+            names(list): subset of match_from to score, default None
+
+        Returns:
+            list: of (str, int)
+
+        '''
+        from rapidfuzz import fuzz as rf_fuzz, process as rf_process
+        query, names, choices, processor = self._prepare(query, match_from,
+                                                         names)
+        return [(names[idx], utils.intr(score)) for _, score, idx in
+                rf_process.extract(query, choices, scorer=rf_fuzz.WRatio,
+                                   processor=processor, limit=limit)]
+
+    def top(self, query, match_from, limit=5, names=None, score_cutoff=0):
+        '''
+        Best distinct matches for query scoring at least score_cutoff
+
+        Args:
+            query(str): name to match
+            match_from(list): list of names to match against, or Choices
+            limit(int): number of matches, None for all, default 5
+            names(list): subset of match_from to score, default None
+            score_cutoff(int): minimum score, default 0
+
+        Returns:
+            list: of (str, int), highest score first
+
+        '''
+        from rapidfuzz import fuzz as rf_fuzz, process as rf_process
+        names = list(dict.fromkeys(match_from if names is None else names))
+        query, names, choices, processor = self._prepare(query, match_from,
+                                                         names)
+        found = rf_process.extract(query, choices, scorer=rf_fuzz.WRatio,
+                                   processor=processor, limit=limit,
+                                   score_cutoff=max(score_cutoff - .5, 0))
+        return [(names[idx], utils.intr(score)) for _, score, idx in found
+                if utils.intr(score) >= score_cutoff]
+
+
+SCORERS = {
+    FuzzywuzzyScorer.name: FuzzywuzzyScorer,
+    RapidfuzzScorer.name: RapidfuzzScorer,
+}
+
+
+def get_scorer(scorer=None):
+    '''
+    Scorer backend by name
+
+    Args:
+        scorer: name in SCORERS, a scorer object, or None for fuzzywuzzy
+
+    Returns:
+        scorer object
+
+    '''
+    if scorer is None:
+        scorer = FuzzywuzzyScorer.name
+    if isinstance(scorer, str):
+        try:
+            return SCORERS[scorer]()
+        except KeyError:
+            raise ValueError('invalid scorer: {}'.format(scorer))
+    return scorer
+
+
+if __name__ == '__main__':
+    pass
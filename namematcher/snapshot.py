@@ -0,0 +1,384 @@
+'''
+snapshot.py
+Columnar in-memory copies of database tables
+
+'''
+
+from collections.abc import MutableMapping
+import functools
+import hashlib
+import logging
+
+import attr
+from sqlalchemy import func, select
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+@attr.s
+class Snapshot:
+    '''
+    Columnar copy of a table, loaded with a single select
+    and no ORM object hydration
+
+    '''
+    columns = attr.ib(type=dict, factory=dict)
+
+    @classmethod
+    def load(cls, session, table, whereclause=None):
+        '''
+        Reads table into columns
+
+        Args:
+            session(sqlalchemy session):
+            table(sqlalchemy Table):
+            whereclause: optional filter, default None
+
+        Returns:
+            Snapshot
+
+        '''
+        result = session.execute(cls.query(table, whereclause))
+        return cls.from_result(result, table)
+
+    @classmethod
+    async def load_async(cls, conn, table, whereclause=None):
+        '''
+        Reads table into columns over an async connection
+
+        Args:
+            conn(sqlalchemy AsyncConnection):
+            table(sqlalchemy Table):
+            whereclause: optional filter, default None
+
+        Returns:
+            Snapshot
+
+        '''
+        result = await conn.execute(cls.query(table, whereclause))
+        return cls.from_result(result, table)
+
+    @staticmethod
+    def query(table, whereclause=None):
+        '''
+        Select of every column of table, optionally filtered
+
+        Args:
+            table(sqlalchemy Table):
+            whereclause: optional filter, default None
+
+        Returns:
+            sqlalchemy Select
+
+        '''
+        query = table.select()
+        if whereclause is not None:
+            query = query.where(whereclause)
+        return query
+
+    @classmethod
+    def from_result(cls, result, table):
+        '''
+        Snapshot of a buffered result
+
+        Args:
+            result(sqlalchemy Result):
+            table(sqlalchemy Table):
+
+        Returns:
+            Snapshot
+
+        '''
+        keys = list(result.keys())
+        rows = result.fetchall()
+        logging.debug('loaded %s rows from %s', len(rows), table.name)
+        if rows:
+            return cls(columns={k: list(col) for k, col in
+                                zip(keys, zip(*rows))})
+        return cls(columns={k: [] for k in keys})
+
+    def watermark(self, key):
+        '''
+        Watermark of the loaded rows
+
+        Args:
+            key(str): primary key column
+
+        Returns:
+            Watermark
+
+        '''
+        return Watermark(len(self), max(self.columns[key], default=None))
+
+    def extend(self, other):
+        '''
+        Appends the rows of another snapshot of the same table
+
+        Args:
+            other(Snapshot):
+
+        Returns:
+            None
+
+        '''
+        for k, col in self.columns.items():
+            col.extend(other.columns[k])
+
+    def startswith(self, other):
+        '''
+        True if the first rows are those of other
+
+        Args:
+            other(Snapshot):
+
+        Returns:
+            bool
+
+        '''
+        n = len(other)
+        return len(self) >= n and all(self.columns[k][:n] == col
+                                      for k, col in other.columns.items())
+
+    def tail(self, start):
+        '''
+        Snapshot of the rows from start on
+
+        Args:
+            start(int):
+
+        Returns:
+            Snapshot
+
+        '''
+        return Snapshot(columns={k: col[start:]
+                                 for k, col in self.columns.items()})
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()), ()))
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def rows(self, *columns, mask=None):
+        '''
+        Tuples of the given columns, optionally filtered
+
+        Args:
+            columns(str): column names
+            mask(list): of bool, rows to keep, default None
+
+        Returns:
+            list: of tuple
+
+        '''
+        return self._filter(zip(*(self.columns[c] for c in columns)), mask)
+
+    def records(self, mask=None):
+        '''
+        Row dicts with every value converted to str, as row2dict does
+
+        Args:
+            mask(list): of bool, rows to keep, default None
+
+        Returns:
+            list: of dict
+
+        '''
+        keys = list(self.columns)
+        return [{k: str(v) for k, v in zip(keys, row)} for row in
+                self._filter(zip(*self.columns.values()), mask)]
+
+    def compact(self, mask=None):
+        '''
+        Slotted records with native values, see Record
+
+        Values are shared with the columns rather than copied,
+        so a record costs one small object per row
+
+        Args:
+            mask(list): of bool, rows to keep, default None
+
+        Returns:
+            list: of Record
+
+        '''
+        cls = record_type(tuple(self.columns))
+        return [cls(*row) for row in
+                self._filter(zip(*self.columns.values()), mask)]
+
+    def _filter(self, rows, mask):
+        '''
+        Keeps rows where mask is true
+
+        '''
+        if mask is None:
+            return list(rows)
+        return [row for row, keep in zip(rows, mask) if keep]
+
+
+class Record(MutableMapping):
+    '''
+    Compact table row that reads and writes like a dict
+
+    Subclasses made by record_type hold one slot per column and keep
+    native values (ints stay ints, NULL stays None). Keys outside the
+    columns, like the ids written by Site.match, go to a dict made
+    on first use.
+
+    '''
+    __slots__ = ('_extra',)
+    _fields = {}
+
+    def __init__(self, *values, **extra):
+        for slot, value in zip(self._fields.values(), values):
+            object.__setattr__(self, slot, value)
+        if extra:
+            self._extra = extra
+
+    def __getitem__(self, key):
+        try:
+            slot = self._fields.get(key)
+            if slot is None:
+                return self._extra[key]
+            return getattr(self, slot)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        slot = self._fields.get(key)
+        if slot is not None:
+            setattr(self, slot, value)
+        elif hasattr(self, '_extra'):
+            self._extra[key] = value
+        else:
+            self._extra = {key: value}
+
+    def __delitem__(self, key):
+        try:
+            slot = self._fields.get(key)
+            if slot is None:
+                del self._extra[key]
+            else:
+                delattr(self, slot)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __iter__(self):
+        for key, slot in self._fields.items():
+            if hasattr(self, slot):
+                yield key
+        yield from getattr(self, '_extra', ())
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, key):
+        slot = self._fields.get(key)
+        if slot is None:
+            return key in getattr(self, '_extra', ())
+        return hasattr(self, slot)
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, dict(self))
+
+    def __reduce__(self):
+        return _rebuild, (tuple(self._fields), dict(self))
+
+    def copy(self):
+        '''
+        Shallow copy, like dict.copy
+
+        Returns:
+            Record
+
+        '''
+        return _rebuild(tuple(self._fields), dict(self))
+
+
+@functools.lru_cache(maxsize=None)
+def record_type(columns):
+    '''
+    Record subclass with a slot per column
+
+    Slots are numbered, so any column name works as a key
+
+    Args:
+        columns(tuple): of str
+
+    Returns:
+        type
+
+    '''
+    fields = {key: '_{}'.format(i) for i, key in enumerate(columns)}
+    return type('Record', (Record,), {'__slots__': tuple(fields.values()),
+                                      '_fields': fields})
+
+
+def _rebuild(columns, items):
+    '''
+    Record from its columns and items, for pickle and copy
+
+    '''
+    record = record_type(columns)()
+    record.update(items)
+    return record
+
+
+def checksum(session, query):
+    '''
+    Digest of every row a query returns, in order
+
+    Unlike a Watermark it changes when rows are updated in place,
+    at the cost of reading them
+
+    Args:
+        session(sqlalchemy session or connection):
+        query(sqlalchemy Select): with an ORDER BY
+
+    Returns:
+        str
+
+    '''
+    digest = hashlib.sha1()
+    for row in session.execute(query):
+        digest.update(repr(tuple(row)).encode())
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+@attr.s(frozen=True)
+class Watermark:
+    '''
+    Row count and largest primary key of a table
+
+    Rows appended past max_id raise both; deletes lower count.
+    Updates in place change neither, see Site.refresh(full=True).
+
+    '''
+    count = attr.ib(type=int, default=0)
+    max_id = attr.ib(default=None)
+
+    @classmethod
+    def load(cls, session, table, key, whereclause=None):
+        '''
+        Watermark of a table in the database, without reading its rows
+
+        Args:
+            session(sqlalchemy session or connection):
+            table(sqlalchemy Table):
+            key(str): primary key column
+            whereclause: optional filter, default None
+
+        Returns:
+            Watermark
+
+        '''
+        query = select(func.count(), func.max(table.c[key])).select_from(table)
+        if whereclause is not None:
+            query = query.where(whereclause)
+        count, max_id = session.execute(query).one()
+        return cls(count, max_id)
+
+
+if __name__ == '__main__':
+    pass
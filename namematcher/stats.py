@@ -0,0 +1,179 @@
+'''
+stats.py
+Per-stage counters and latencies for Site.match
+
+'''
+
+from collections import Counter, defaultdict
+import logging
+import math
+import random
+
+import attr
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+OUTCOMES = ('direct', 'duplicate', 'alias', 'cached', 'fuzzy',
+            'interactive', 'unmatched')
+
+
+def percentile(values, pct):
+    '''
+    Nearest-rank percentile
+
+    Args:
+        values(list): of float, sorted
+        pct(float): 0-100
+
+    Returns:
+        float or None
+
+    '''
+    if not values:
+        return None
+    rank = math.ceil(pct / 100 * len(values))
+    return values[max(0, min(len(values), rank) - 1)]
+
+
+@attr.s
+class Reservoir:
+    '''
+    Count, total and a bounded uniform sample of values
+
+    '''
+    size = attr.ib(type=int, default=10000)
+    count = attr.ib(type=int, default=0)
+    total = attr.ib(type=float, default=0.0)
+    sample = attr.ib(type=list, factory=list)
+    _rnd = attr.ib(factory=lambda: random.Random(0), repr=False)
+
+    def add(self, value):
+        '''
+        Adds one value
+
+        Args:
+            value(float):
+
+        Returns:
+            None
+
+        '''
+        self.count += 1
+        self.total += value
+        if len(self.sample) < self.size:
+            self.sample.append(value)
+        else:
+            idx = self._rnd.randrange(self.count)
+            if idx < self.size:
+                self.sample[idx] = value
+
+    def summary(self):
+        '''
+        Count, total, mean and p50/p90/p99
+
+        Returns:
+            dict
+
+        '''
+        ordered = sorted(self.sample)
+        return {'count': self.count,
+                'total': self.total,
+                'mean': self.total / self.count if self.count else None,
+                'p50': percentile(ordered, 50),
+                'p90': percentile(ordered, 90),
+                'p99': percentile(ordered, 99)}
+
+
+@attr.s
+class MatchStats:
+    '''
+    Aggregates the per-record events Site.match emits
+
+    Pass as stats= to have it filled and returned with the results,
+    or as hook= alongside any other callback. Site.match builds no
+    events when neither is given.
+
+    Events are dicts with name, outcome, confidence, elapsed (seconds),
+    timings (stage: seconds), candidates (names scored, or None)
+    and cache_hit (bool, or None without a cache)
+
+    '''
+    sample_size = attr.ib(type=int, default=10000)
+
+    def __attrs_post_init__(self):
+        self.outcomes = Counter()
+        self.latency = Reservoir(self.sample_size)
+        self.stages = defaultdict(lambda: Reservoir(self.sample_size))
+        self.candidates = Reservoir(self.sample_size)
+        self.cache_lookups = 0
+        self.cache_hits = 0
+        self.batch = {}
+
+    def __call__(self, event):
+        self.record(event)
+
+    def record(self, event):
+        '''
+        Adds one record's event
+
+        Args:
+            event(dict):
+
+        Returns:
+            None
+
+        '''
+        self.outcomes[event['outcome']] += 1
+        self.latency.add(event['elapsed'])
+        for stage, elapsed in event['timings'].items():
+            self.stages[stage].add(elapsed)
+        if event.get('candidates') is not None:
+            self.candidates.add(event['candidates'])
+        if event.get('cache_hit') is not None:
+            self.cache_lookups += 1
+            self.cache_hits += event['cache_hit']
+
+    def record_batch(self, stage, elapsed, count):
+        '''
+        Adds time spent on a whole batch, e.g. the process pool pre-pass
+
+        Args:
+            stage(str):
+            elapsed(float): seconds
+            count(int): names in the batch
+
+        Returns:
+            None
+
+        '''
+        total = self.batch.setdefault(stage, {'count': 0, 'total': 0.0})
+        total['count'] += count
+        total['total'] += elapsed
+
+    @property
+    def cache_hit_rate(self):
+        if not self.cache_lookups:
+            return None
+        return self.cache_hits / self.cache_lookups
+
+    def summary(self):
+        '''
+        Counts, latencies, candidates and cache hit rate
+
+        Returns:
+            dict
+
+        '''
+        return {'records': self.latency.count,
+                'outcomes': {k: self.outcomes[k] for k in OUTCOMES},
+                'latency': self.latency.summary(),
+                'stages': {k: v.summary() for k, v in self.stages.items()},
+                'batch': dict(self.batch),
+                'candidates': self.candidates.summary(),
+                'cache_lookups': self.cache_lookups,
+                'cache_hit_rate': self.cache_hit_rate}
+
+
+if __name__ == '__main__':
+    pass
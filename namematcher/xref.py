@@ -6,12 +6,30 @@ class for matching players across sites
 '''
 
 from collections import defaultdict
+import itertools
 import logging
+import time
 import typing
 
 import attr
+from sqlalchemy import and_, select
 
-from .match import match_fuzzy, match_interactive
+from .alias import AliasIndex
+from .assign import ASSIGN_CANDIDATES, assign
+from .blocking import NgramIndex
+from .cache import normalize
+from .choices import Choices
+from .match import match_interactive, match_many, name_dict
+from .phonetic import PhoneticIndex
+from .position import base_positions
+from .review import get_queue
+from .score import get_scorer
+from .snapshot import Snapshot, Watermark
+from .stats import MatchStats
+
+
+# number of match_from indexes kept by a Site
+INDEX_CACHE_SIZE = 64
 
 
 def add_xref(xref_dict, base, session):
@@ -55,18 +73,505 @@ def add_xref(xref_dict, base, session):
           )
         )
 
+def add_xrefs(records, base, session):
+    '''
+    Adds many playerxref rows to database in one set-based pass
+    Records whose (source, source_player_id) is already in the table,
+    or earlier in records, are skipped. Like add_xref, the caller
+    commits the session.
+
+    Args:
+        records(list): of dict
+        base(sqlalchemy base):
+        session(sqlalchemy session):
+
+    Returns:
+        dict: inserted and skipped counts
+
+    Raises:
+        ValueError: if a record has no source_player_id, since it
+            could not be told apart from other records of its source
+
+    '''
+    records = list(records)
+    for i, r in enumerate(records):
+        # str() records from row2dict hold 'None' for NULL
+        if str(r.get('source_player_id', '')) in ('', 'None'):
+            raise ValueError('record {} ({}) has no source_player_id'
+                             .format(i, r.get('source_player_name')))
+    table = base.classes.player_xref.__table__
+    sources = {r['source'] for r in records}
+    existing = set()
+    if sources:
+        query = select(table.c.source, table.c.source_player_id) \
+            .where(table.c.source.in_(sources))
+        existing = {(source, str(source_player_id)) for
+                    source, source_player_id in session.execute(query)}
+
+    rows = []
+    for r in records:
+        key = (r['source'], str(r.get('source_player_id')))
+        if key in existing:
+            continue
+        existing.add(key)
+        rows.append({
+            'player_id': r['player_id'],
+            'source': r['source'],
+            'source_player_id': r.get('source_player_id'),
+            'source_player_code': r.get('source_player_code'),
+            'source_player_name': r['source_player_name'],
+            'source_player_position': r['source_player_position']
+        })
+
+    inserted = 0
+    if rows:
+        result = session.execute(_insert_ignore(table, session), rows)
+        inserted = len(rows) if result.rowcount < 0 else result.rowcount
+    logging.debug('added %s xrefs, skipped %s', inserted,
+                  len(records) - inserted)
+    return {'inserted': inserted, 'skipped': len(records) - inserted}
+
+
+def _insert_ignore(table, session):
+    '''
+    INSERT that skips conflicting rows where the dialect supports it
+
+    Args:
+        table(sqlalchemy Table):
+        session(sqlalchemy session):
+
+    Returns:
+        sqlalchemy Insert
+
+    '''
+    dialect = session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert(table).on_conflict_do_nothing()
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert(table).on_conflict_do_nothing()
+    return table.insert()
+
+
 row2dict = lambda r: {c.name: str(getattr(r, c.name)) for c in r.__table__.columns}
 
 
+def _emitter(stats, hook):
+    '''
+    Single callable for the stats and hook arguments of Site.match
+
+    Args:
+        stats(MatchStats): or None
+        hook(callable): or None
+
+    Returns:
+        callable or None
+
+    '''
+    if stats is None:
+        return hook
+    if hook is None:
+        return stats.record
+
+    def emit(event):
+        stats.record(event)
+        hook(event)
+
+    return emit
+
+
+@attr.s
+class _Matcher:
+    '''
+    Decides one name at a time for Site.match and Site.match_iter:
+    direct, then alias, then cached, then interactive or fuzzy
+
+    With scope set, names with a known position are matched within
+    their position bucket first: duplicates are narrowed to the bucket
+    and fuzzy search runs on the bucket, then on everything
+
+    With emit set, each decision is timed by stage and reported
+    as an event (see MatchStats)
+
+    With reviewed set (see review), interactive decisions come from
+    a ReviewQueue run up front instead of per-name prompts
+
+    '''
+    names_from = attr.ib(type=dict)
+    choices = attr.ib()
+    index = attr.ib()
+    scorer = attr.ib()
+    thresh = attr.ib(type=int)
+    interactive = attr.ib(type=bool)
+    use_cache = attr.ib(type=bool, default=False)
+    cached_raw = attr.ib(type=dict, factory=dict)
+    cached_norm = attr.ib(type=dict, factory=dict)
+    ids_from = attr.ib(type=dict, factory=dict)
+    emit = attr.ib(default=None)
+    pos_key = attr.ib(type=str, default=None)
+    position_map = attr.ib(type=dict, default=None)
+    scope = attr.ib(default=None)
+    aliases = attr.ib(default=None)
+    reviewed = attr.ib(type=dict, default=None)
+
+    def __attrs_post_init__(self):
+        self._buckets = {}
+
+    def bucket(self, pos):
+        '''
+        Base positions for a source position, None outside position mode
+
+        Args:
+            pos(str):
+
+        Returns:
+            frozenset or None
+
+        '''
+        if self.scope is None or pos is None:
+            return None
+        if pos not in self._buckets:
+            self._buckets[pos] = base_positions(pos, self.position_map) \
+                or None
+        return self._buckets[pos]
+
+    def cached(self, name):
+        '''
+        Record for a decision cached from an earlier run
+
+        Args:
+            name(str):
+
+        Returns:
+            dict or None
+
+        '''
+        if not self.use_cache:
+            return None
+        entry = self.cached_raw.get(name) or \
+            self.cached_norm.get(normalize(name))
+        if entry:
+            return self.ids_from.get(str(entry['player_id']))
+        return None
+
+    def alias(self, name, bucket=None):
+        '''
+        The one record with name as an alias, if aliases are used
+
+        Args:
+            name(str):
+            bucket(frozenset): base positions narrowing shared aliases,
+                default None
+
+        Returns:
+            dict or None
+
+        '''
+        if self.aliases is None:
+            return None
+        records = self.aliases.lookup(name)
+        if len(records) > 1 and bucket:
+            records = [r for r in records if r.get(self.pos_key) in bucket]
+        return records[0] if len(records) == 1 else None
+
+    def pending(self, names, positions=None):
+        '''
+        Names without a direct, alias or cached match, by position bucket
+
+        Args:
+            names(list): of str
+            positions(list): of str, source positions of names, default None
+
+        Returns:
+            dict: of frozenset or None: list of str
+
+        '''
+        if positions is None:
+            positions = [None] * len(names)
+        pending = defaultdict(list)
+        for nm, bucket in dict.fromkeys(
+                (nm, self.bucket(pos)) for nm, pos in zip(names, positions)):
+            if nm not in self.names_from and not self.alias(nm, bucket) and \
+                    not self.cached(nm):
+                pending[bucket].append(nm)
+        return pending
+
+    def review(self, review_queue, names, positions=None, on_batch=None):
+        '''
+        Runs a ReviewQueue over names without a direct, alias or cached
+        match; decide then reads interactive decisions from it
+
+        Args:
+            review_queue(ReviewQueue):
+            names(list): of str
+            positions(list): of str, source positions of names, default None
+            on_batch(callable): gets lists of (name, match, confidence,
+                method) decisions as the reviewer makes them, default None
+
+        Returns:
+            None
+
+        '''
+        def decisions(batch):
+            found = []
+            for name, bucket, match_name, confidence in batch:
+                matches = self.scopes(bucket)[0][0].get(match_name)
+                if matches and len(matches) == 1:
+                    found.append((name, matches[0], confidence,
+                                  'interactive'))
+            on_batch(found)
+
+        groups = [(bucket_names, self.scopes(bucket)[0][1], bucket)
+                  for bucket, bucket_names in
+                  self.pending(names, positions).items()]
+        self.reviewed = review_queue.review(
+            groups, scorer=self.scorer,
+            on_batch=decisions if on_batch is not None else None)
+
+    def prefuzz(self, names, workers, stats=None, positions=None,
+                executor=None):
+        '''
+        Fuzzy matches names without a direct or cached match
+        in a process pool, per position bucket when positions are given
+
+        Args:
+            names(list): of str
+            workers(int): number of processes, None for all cores
+            stats(MatchStats): gets the pre-pass time, default None
+            positions(list): of str, source positions of names, default None
+            executor(ProcessPoolExecutor): pool to reuse, default None
+
+        Returns:
+            dict: of (str, frozenset): (str, int)
+
+        '''
+        start = time.perf_counter()
+        pending = self.pending(names, positions)
+        fuzzy = {}
+        for bucket, bucket_names in pending.items():
+            _, choices, index = self.scopes(bucket)[0]
+            fuzzy.update(zip(((nm, bucket) for nm in bucket_names),
+                             match_many(bucket_names,
+                                        choices,
+                                        thresh=self.thresh,
+                                        workers=workers,
+                                        index=index,
+                                        scorer=self.scorer,
+                                        executor=executor)))
+        if stats is not None:
+            stats.record_batch('prefuzz', time.perf_counter() - start,
+                               sum(len(v) for v in pending.values()))
+        return fuzzy
+
+    def scopes(self, bucket):
+        '''
+        (names_from, choices, index) to search, narrowest first
+
+        Args:
+            bucket(frozenset): base positions, or None
+
+        Returns:
+            list: of tuple
+
+        '''
+        everything = (self.names_from, self.choices, self.index)
+        if bucket is None:
+            return [everything]
+        return [self.scope(bucket), everything]
+
+    def fuzzy(self, name, choices, index):
+        '''
+        match_fuzzy that also counts the names scored
+
+        Args:
+            name(str):
+            choices(Choices): names to search
+            index: blocking index over choices, or None
+
+        Returns:
+            tuple: str, int, int
+
+        '''
+        names = None
+        if index is not None:
+            names = index.candidates(name, self.thresh)
+            if not names:
+                return None, 0, 0
+        match = self.scorer.extract_one(name, choices, names=names,
+                                        score_cutoff=self.thresh)
+        scored = len(choices) if names is None else len(names)
+        return (match or (None, 0)) + (scored,)
+
+    def candidates(self, name, pos=None, limit=ASSIGN_CANDIDATES):
+        '''
+        Every record name could be, for assignment mode: direct,
+        alias and cached matches at 100, then the best fuzzy matches
+        reaching thresh
+
+        Args:
+            name(str):
+            pos(str): source position, default None
+            limit(int): fuzzy matched names, default ASSIGN_CANDIDATES
+
+        Returns:
+            list: of (dict, int, str) record, score and method
+
+        '''
+        found = [(record, 100, 'direct')
+                 for record in self.names_from.get(name, ())]
+        if not found:
+            found = [(record, 100, 'alias') for record in
+                     (self.aliases.lookup(name) if self.aliases else ())]
+        record = self.cached(name)
+        if record is not None:
+            found.append((record, 100, 'cached'))
+        if not found:
+            names = None
+            if self.index is not None:
+                names = self.index.candidates(name, self.thresh)
+            if names is None or names:
+                found = [(record, score, 'fuzzy') for match_name, score in
+                         self.scorer.top(name, self.choices, limit=limit,
+                                         names=names,
+                                         score_cutoff=self.thresh)
+                         for record in self.names_from[match_name]]
+        return found
+
+    def decide(self, name, fuzzy=None, pos=None):
+        '''
+        Matches one name: direct, alias, cached, then interactive or fuzzy
+
+        Args:
+            name(str):
+            fuzzy(dict): results of prefuzz, default None
+            pos(str): source position, default None
+
+        Returns:
+            tuple: list of dict, int, str
+            matching records (one if matched, several if duplicate,
+            empty if unmatched), confidence and method
+
+        '''
+        if self.emit is None:
+            return self._decide(name, fuzzy, pos)
+        event = {'name': name, 'timings': {}, 'candidates': None,
+                 'cache_hit': None}
+        start = time.perf_counter()
+        matches, confidence, method = self._decide(name, fuzzy, pos, event)
+        event['elapsed'] = time.perf_counter() - start
+        event['confidence'] = confidence
+        if not matches:
+            event['outcome'] = 'unmatched'
+        elif len(matches) > 1:
+            event['outcome'] = 'duplicate'
+        else:
+            event['outcome'] = method
+        self.emit(event)
+        return matches, confidence, method
+
+    def _decide(self, name, fuzzy, pos=None, event=None):
+        '''
+        decide, filling in event timings when given
+
+        '''
+        if event is not None:
+            timings = event['timings']
+            start = time.perf_counter()
+        bucket = self.bucket(pos)
+
+        # first option is to see if direct match
+        matches = self.names_from.get(name)
+        if matches and len(matches) > 1 and bucket:
+            matches = [m for m in matches if m[self.pos_key] in bucket] \
+                or matches
+        if event is not None:
+            timings['direct'] = time.perf_counter() - start
+        if matches:
+            logging.debug('%s match %s',
+                          'direct' if len(matches) == 1 else 'duplicate', name)
+            return matches, 100, 'direct'
+
+        # then a known alias of one player
+        if self.aliases is not None:
+            if event is not None:
+                start = time.perf_counter()
+            match = self.alias(name, bucket)
+            if event is not None:
+                timings['alias'] = time.perf_counter() - start
+            if match:
+                logging.debug('alias match %s', name)
+                return [match], 100, 'alias'
+
+        # then a decision made on an earlier run
+        if self.use_cache:
+            if event is not None:
+                start = time.perf_counter()
+            match = self.cached(name)
+            if event is not None:
+                timings['cache'] = time.perf_counter() - start
+                event['cache_hit'] = match is not None
+            if match:
+                logging.debug('cached match %s', name)
+                return [match], 100, 'cached'
+
+        if event is not None:
+            start = time.perf_counter()
+        # try interactive match
+        match_name = None
+        if self.interactive:
+            method = 'interactive'
+            names_from, choices, _ = self.scopes(bucket)[0]
+            if self.reviewed is not None:
+                match_name, confidence = self.reviewed.get((name, bucket),
+                                                           (None, 0))
+            else:
+                match_name, confidence = match_interactive(
+                    to_match=name, match_from=choices, scorer=self.scorer)
+        else:
+            method = 'fuzzy'
+            for names_from, choices, index in self.scopes(bucket):
+                key = (name, None if choices is self.choices else bucket)
+                if fuzzy and key in fuzzy:
+                    match_name, confidence = fuzzy[key]
+                else:
+                    match_name, confidence, scored = self.fuzzy(name, choices,
+                                                                index)
+                    if event is not None:
+                        event['candidates'] = scored
+                if match_name and confidence >= self.thresh:
+                    break
+            else:
+                match_name = None
+        if event is not None:
+            timings[method] = time.perf_counter() - start
+        if match_name:
+            matches = names_from.get(match_name)
+            if matches:
+                logging.debug('%s match %s %s', method, name, confidence)
+                return matches, confidence, method
+
+        # if unmatched, log and add to unmatched
+        logging.debug('no match %s', name)
+        return [], 0, None
+
+
 @attr.s(kw_only=True)
 class Site:
     '''
     Base class for matching players
 
+    With compact=True, player lists hold slotted Records with native
+    values (see snapshot.Record) instead of dicts of str
+
+    With index_file (an indexfile.MatchIndex), the base player table
+    and its indexes come from the file, and base, session and eng
+    are only needed for source tables and refresh()
+
     '''
-    base = attr.ib()
-    session = attr.ib()
-    eng = attr.ib()
+    base = attr.ib(default=None)
+    session = attr.ib(default=None)
+    eng = attr.ib(default=None)
     based = attr.ib(type=dict,
                     factory=dict,
                     validator=attr.validators.instance_of(dict))
@@ -106,11 +611,200 @@ class Site:
     xref_query = attr.ib(type=str,
                          default=("SELECT {} FROM base.player_xref "
                                   "WHERE SOURCE = '{}'"))
+    compact = attr.ib(type=bool, default=False)
+    index_file = attr.ib(default=None, repr=False)
+    _name_indexes = attr.ib(type=dict, factory=dict, init=False, repr=False)
+    _player_snapshot = attr.ib(default=None, init=False, repr=False)
+    _xref_snapshots = attr.ib(type=dict, factory=dict, init=False, repr=False)
+    _caches = attr.ib(type=list, factory=list, init=False, repr=False)
 
     def __attrs_post_init__(self):
         logging.getLogger(__name__).addHandler(logging.NullHandler())
-        self.Player = self.base.classes.player
-        self.PlayerXref = self.base.classes.player_xref
+        if self.base is not None:
+            self.Player = self.base.classes.player
+            self.PlayerXref = self.base.classes.player_xref
+        if self.index_file is not None:
+            self._player_snapshot = self.index_file.snapshot
+            self.base_players = self.index_file.lists['players']
+            self.mfl_players = self.index_file.lists['mfl_players']
+
+    def get_player_snapshot(self):
+        '''
+        Columnar snapshot of the base player table, loaded once
+
+        Returns:
+            Snapshot
+
+        '''
+        if self._player_snapshot is None:
+            self._player_snapshot = Snapshot.load(self.session,
+                                                  self.Player.__table__)
+        return self._player_snapshot
+
+    def get_xref_snapshot(self, source_name=None):
+        '''
+        Columnar snapshot of player_xref rows for a source, loaded once
+
+        Args:
+            source_name(str): default self.source_name
+
+        Returns:
+            Snapshot
+
+        '''
+        if source_name is None:
+            source_name = self.source_name
+        if source_name not in self._xref_snapshots:
+            table = self.PlayerXref.__table__
+            self._xref_snapshots[source_name] = Snapshot.load(
+                self.session, table, table.c.source == source_name)
+        return self._xref_snapshots[source_name]
+
+    def refresh(self, full=False):
+        '''
+        Brings loaded tables and the caches built from them up to date
+
+        Each loaded table's watermark (row count, max primary key) is
+        compared with the database's. When a table only gained rows
+        past its max key, just those rows are read and appended to the
+        snapshot and the cached record lists; match indexes over those
+        lists are patched with the new records when next used. Other
+        changes, such as deletes, reload the table and reset its caches.
+        Watermarks miss updates in place: full=True reads every loaded
+        table and compares the rows themselves. Match caches this site
+        has matched with get their player fingerprint recomputed
+        unless the player table is unchanged.
+
+        Args:
+            full(bool): compare rows, not just watermarks, default False
+
+        Returns:
+            dict: of table: 'unchanged', 'appended' or 'reloaded',
+                tables are 'player' and 'player_xref.<source>'
+
+        '''
+        return self._refresh(self.session, full)
+
+    def _refresh(self, session, full=False):
+        '''
+        refresh over a sync session or connection
+
+        '''
+        changes = {}
+        if self._player_snapshot is not None:
+            change, tail = self._refresh_table(
+                session, self._player_snapshot, self.Player.__table__,
+                'player_id', None, full)
+            if change == 'appended':
+                self._append_players(tail)
+            elif change == 'reloaded':
+                self._player_snapshot = tail
+                self._reset('base_players', 'base_playernames',
+                            'base_playernamepos', 'mfl_players',
+                            'mfl_playernames')
+            changes['player'] = change
+        xref = self.PlayerXref.__table__
+        for source_name, snapshot in list(self._xref_snapshots.items()):
+            change, tail = self._refresh_table(
+                session, snapshot, xref, 'player_xref_id',
+                xref.c.source == source_name, full)
+            if change == 'reloaded':
+                self._xref_snapshots[source_name] = tail
+            if source_name == self.source_name and change != 'unchanged':
+                if change == 'appended' and self.source_players:
+                    self.source_players.extend(self._records(tail))
+                self._reset('source_playernames', 'source_playernamepos',
+                            *(('source_players',) if change == 'reloaded'
+                              else ()))
+            changes['player_xref.{}'.format(source_name)] = change
+        if changes.get('player') != 'unchanged':
+            for cache in self._caches:
+                cache.refresh()
+        logging.info('refreshed %s', changes)
+        return changes
+
+    def _refresh_table(self, session, snapshot, table, key, whereclause,
+                       full):
+        '''
+        Compares a snapshot with its table and reads what changed
+
+        Returns:
+            tuple: of change, Snapshot
+                'unchanged', None
+                'appended', snapshot of the new rows (already appended)
+                'reloaded', snapshot of the whole table
+
+        '''
+        old = snapshot.watermark(key)
+        if full:
+            current = Snapshot.load(session, table, whereclause)
+            if not current.startswith(snapshot):
+                return 'reloaded', current
+            tail = current.tail(len(snapshot))
+        else:
+            if Watermark.load(session, table, key, whereclause) == old:
+                return 'unchanged', None
+            if old.max_id is None:
+                return 'reloaded', Snapshot.load(session, table, whereclause)
+            # rows at or below the old max key must be the ones loaded
+            kept = table.c[key] <= old.max_id
+            if Watermark.load(session, table, key,
+                              kept if whereclause is None
+                              else and_(whereclause, kept)) != old:
+                return 'reloaded', Snapshot.load(session, table, whereclause)
+            newer = table.c[key] > old.max_id
+            tail = Snapshot.load(session, table,
+                                 newer if whereclause is None
+                                 else and_(whereclause, newer))
+        if not len(tail):
+            return 'unchanged', None
+        snapshot.extend(tail)
+        return 'appended', tail
+
+    def _append_players(self, tail):
+        '''
+        Appends new player rows to the base and mfl caches in place,
+        so indexes over those lists extend instead of rebuilding
+
+        '''
+        if self.base_players:
+            self.base_players.extend(self._records(tail))
+        if self.base_playernames:
+            self.base_playernames.extend(tail['full_name'])
+        if self.base_playernamepos:
+            self.base_playernamepos.extend(
+                tail.rows('full_name', 'primary_pos'))
+        mask = self._mfl_mask(tail)
+        if self.mfl_players:
+            self.mfl_players.extend(self._records(tail, mask))
+        if self.mfl_playernames:
+            self.mfl_playernames.extend(
+                name for name, in tail.rows('full_name', mask=mask))
+
+    def _reset(self, *names):
+        '''
+        Empties cached lists so they reload from the snapshots,
+        dropping match indexes built over them
+
+        '''
+        stale = {id(getattr(self, name)) for name in names}
+        for (kind, list_id, _), (_, _, index) in self._name_indexes.items():
+            if kind == 'position' and list_id in stale:
+                stale.update(id(bucket) for bucket in index.values())
+        for key in [k for k in self._name_indexes if k[1] in stale]:
+            del self._name_indexes[key]
+        for name in names:
+            setattr(self, name, [])
+
+    def _mfl_mask(self, snapshot=None):
+        '''
+        Rows of the player snapshot that have an mfl id
+
+        '''
+        if snapshot is None:
+            snapshot = self.get_player_snapshot()
+        return [mfl_id is not None and mfl_id > 0 for mfl_id in
+                snapshot['mfl_player_id']]
 
     def get_based(self, first='name'):
         '''
@@ -121,13 +815,13 @@ class Site:
 	        dict(if first=id) or defaultdict(if first=name)
 
         '''
+        rows = self.get_player_snapshot().rows('full_name', 'player_id')
         if first == 'name':
             self.based = defaultdict(list)
-            for p in self.session.query(self.Player):
-                self.based[p.full_name].append(p.player_id)
+            for name, player_id in rows:
+                self.based[name].append(player_id)
         else:
-            self.based = {p.player_id: p.full_name for p in
-                          self.session.query(self.Player)}
+            self.based = {player_id: name for name, player_id in rows}
         return self.based
 
     def get_base_playernamepos(self):
@@ -144,8 +838,7 @@ class Site:
         '''
         if not self.base_playernamepos:
             self.base_playernamepos = \
-                [(p.full_name, p.primary_pos)
-                 for p in self.session.query(self.Player)]
+                self.get_player_snapshot().rows('full_name', 'primary_pos')
         return self.base_playernamepos
 
     def get_base_playernames(self):
@@ -157,10 +850,18 @@ class Site:
 
         '''
         if not self.base_playernames:
-            self.base_playernames = [p.full_name for p in
-                                     self.session.query(self.Player)]
+            self.base_playernames = list(self.get_player_snapshot()['full_name'])
         return self.base_playernames
 
+    def _records(self, snapshot, mask=None):
+        '''
+        Player records of a snapshot, compact or dicts of str
+
+        '''
+        if self.compact:
+            return snapshot.compact(mask)
+        return snapshot.records(mask)
+
     def get_base_players(self):
         '''
         List of player dicts from base players table
@@ -170,9 +871,8 @@ class Site:
 
         '''
         if not self.base_players:
-            self.base_playernames = [row2dict(p) for p in
-                                     self.session.query(self.Player)]
-        return self.base_playernames
+            self.base_players = self._records(self.get_player_snapshot())
+        return self.base_players
 
     def get_mfld(self, first='name'):
         '''
@@ -183,14 +883,15 @@ class Site:
 	        dict(if first=id) or defaultdict(if first=name)
 
         '''
+        snapshot = self.get_player_snapshot()
         if first == 'name':
             self.mfld = defaultdict(list)
-            for p in self.session.query(self.Player) \
-                    .filter(self.Player.mfl_player_id > 0):
-                self.mfld[p.full_name].append(p.mfl_player_id)
+            for name, mfl_id in snapshot.rows('full_name', 'mfl_player_id',
+                                              mask=self._mfl_mask()):
+                self.mfld[name].append(mfl_id)
         else:
-            self.mfld = {p.mfl_player_id: p.full_name for p in
-                          self.session.query(self.Player)}
+            self.mfld = {mfl_id: name for name, mfl_id in
+                         snapshot.rows('full_name', 'mfl_player_id')}
         return self.mfld
 
     def get_mfl_playernames(self):
@@ -203,8 +904,8 @@ class Site:
         '''
         if not self.mfl_playernames:
             self.mfl_playernames = \
-                [p.full_name for p in self.session.query(self.Player) \
-                    .filter(self.Player.mfl_player_id > 0)]
+                [name for name, in self.get_player_snapshot().rows(
+                    'full_name', mask=self._mfl_mask())]
         return self.mfl_playernames
 
     def get_mfl_players(self):
@@ -216,9 +917,8 @@ class Site:
 
         '''
         if not self.mfl_players:
-            self.mfl_players = [row2dict(p) for p in
-                                self.session.query(self.Player) \
-                                .filter(self.Player.mfl_player_id > 0)]
+            self.mfl_players = self._records(self.get_player_snapshot(),
+                                             self._mfl_mask())
         return self.mfl_players
 
     def get_sourced(self, first='name'):
@@ -233,15 +933,14 @@ class Site:
 	        dict(if first=id) or defaultdict(if first=name)
 
         '''
+        rows = self.get_xref_snapshot().rows('source_player_name',
+                                             'source_player_id')
         if first == 'name':
             self.sourced = defaultdict(list)
-            for p in self.session.query(self.PlayerXref) \
-                    .filter(self.PlayerXref.source == self.source_name):
-                self.sourced[p.full_name].append(p.source_player_id)
+            for name, source_id in rows:
+                self.sourced[name].append(source_id)
         else:
-            self.sourced = {p.source_player_id: p.source_player_name
-                            for p in self.session.query(self.PlayerXref) \
-                              .filter(self.PlayerXref.source == self.source_name)}
+            self.sourced = {source_id: name for name, source_id in rows}
         return self.sourced
 
     def get_source_players(self):
@@ -253,9 +952,7 @@ class Site:
 
         '''
         if not self.source_players:
-            self.source_players = [row2dict(p) for p in
-                                   self.session.query(self.PlayerXref) \
-                                     .filter(self.PlayerXref.source == self.source_name)]
+            self.source_players = self._records(self.get_xref_snapshot())
         return self.source_players
 
     def get_source_playernamepos(self,
@@ -274,9 +971,7 @@ class Site:
         '''
         if not self.source_playernamepos:
             self.source_playernamepos = \
-                [(p.source_player_name, p.source_player_position)
-                 for p in self.session.query(self.PlayerXref) \
-                    .filter(self.PlayerXref.source == self.source_name)]
+                self.get_xref_snapshot().rows(name_key, pos_key)
         return self.source_playernamepos
 
     def get_source_playernames(self, name_key='source_player_name'):
@@ -291,11 +986,217 @@ class Site:
 
         '''
         if not self.source_playernames:
-            self.source_playernames = [p.source_player_name for p in
-                                       self.session.query(self.PlayerXref) \
-                                      .filter(self.PlayerXref.source == self.source_name)]
+            self.source_playernames = \
+                list(self.get_xref_snapshot()[name_key])
         return self.source_playernames
 
+    def get_name_index(self, match_from, name_key='full_name'):
+        '''
+        Dict of name: list of records from match_from
+        Index is cached per match_from list, so repeated calls
+        with the same list do not rebuild it
+
+        Args:
+            match_from(list): of dict
+            name_key(str): default 'full_name'
+
+        Returns:
+            dict
+
+        '''
+        def extend(index, new):
+            for mf in new:
+                index.setdefault(mf[name_key], []).append(mf)
+
+        return self._cached_index(
+            'name', match_from, name_key,
+            lambda: dict(name_dict(match_from, full_name_key=name_key)),
+            extend)
+
+    def get_namepos_index(self, match_from, name_key='full_name',
+                          pos_key='primary_pos'):
+        '''
+        Dict of (name, pos): list of records from match_from
+        Index is cached per match_from list, like get_name_index
+
+        Args:
+            match_from(list): of dict
+            name_key(str): default 'full_name'
+            pos_key(str): default 'primary_pos'
+
+        Returns:
+            dict
+
+        '''
+        def extend(index, new):
+            for mf in new:
+                index.setdefault((mf[name_key], mf[pos_key]), []).append(mf)
+            return index
+
+        return self._cached_index('namepos', match_from,
+                                  (name_key, pos_key),
+                                  lambda: extend({}, match_from), extend)
+
+    def get_id_index(self, match_from, id_key='player_id'):
+        '''
+        Dict of str(id): record from match_from
+        Index is cached per match_from list, like get_name_index
+
+        Args:
+            match_from(list): of dict
+            id_key(str): default 'player_id'
+
+        Returns:
+            dict
+
+        '''
+        def extend(index, new):
+            index.update((str(mf.get(id_key)), mf) for mf in new)
+            return index
+
+        return self._cached_index('id', match_from, id_key,
+                                  lambda: extend({}, match_from), extend)
+
+    def get_ngram_index(self, match_from, name_key='full_name'):
+        '''
+        NgramIndex over the names in match_from
+        Index is cached per match_from list, like get_name_index
+
+        Args:
+            match_from(list): of dict
+            name_key(str): default 'full_name'
+
+        Returns:
+            NgramIndex
+
+        '''
+        return self._cached_index(
+            'ngram', match_from, name_key,
+            lambda: NgramIndex([mf[name_key] for mf in match_from]),
+            lambda index, new: index.add(mf[name_key] for mf in new))
+
+    def get_phonetic_index(self, match_from, name_key='full_name'):
+        '''
+        PhoneticIndex over match_from, from its first_name and
+        last_name columns when present
+        Index is cached per match_from list, like get_name_index
+
+        Args:
+            match_from(list): of dict
+            name_key(str): default 'full_name'
+
+        Returns:
+            PhoneticIndex
+
+        '''
+        return self._cached_index(
+            'phonetic', match_from, name_key,
+            lambda: PhoneticIndex.from_records(match_from, name_key),
+            lambda index, new: index.add_records(new, name_key))
+
+    def get_position_bucket(self, match_from, positions,
+                            pos_key='primary_pos'):
+        '''
+        Records of match_from at any of positions, in their original order
+        The same list is returned for the same positions, so indexes
+        over it are cached too
+
+        Args:
+            match_from(list): of dict
+            positions(frozenset): of str
+            pos_key(str): default 'primary_pos'
+
+        Returns:
+            list: of dict
+
+        '''
+        def extend(buckets, new):
+            for bucket_positions, bucket in buckets.items():
+                bucket.extend(mf for mf in new
+                              if mf[pos_key] in bucket_positions)
+
+        buckets = self._cached_index('position', match_from, pos_key, dict,
+                                     extend)
+        if positions not in buckets:
+            buckets[positions] = [mf for mf in match_from
+                                  if mf[pos_key] in positions]
+        return buckets[positions]
+
+    def get_alias_index(self, match_from, name_key='full_name'):
+        '''
+        AliasIndex over match_from from its names, alt_names
+        and first/last/suffix columns
+        Index is cached per match_from list, like get_name_index
+
+        Args:
+            match_from(list): of dict
+            name_key(str): default 'full_name'
+
+        Returns:
+            AliasIndex
+
+        '''
+        return self._cached_index(
+            'alias', match_from, name_key,
+            lambda: AliasIndex(match_from, name_key),
+            lambda index, new: index.add(new))
+
+    def get_choices(self, match_from, name_key='full_name'):
+        '''
+        Choices compiled from the names in match_from
+        Cached per match_from list, like get_name_index
+
+        Args:
+            match_from(list): of dict
+            name_key(str): default 'full_name'
+
+        Returns:
+            Choices
+
+        '''
+        return self._cached_index(
+            'choices', match_from, name_key,
+            lambda: Choices([mf[name_key] for mf in match_from]),
+            lambda index, new: index.add(mf[name_key] for mf in new))
+
+    def _cached_index(self, kind, match_from, name_key, build, extend=None):
+        '''
+        Looks up or builds an index over match_from
+        When match_from has grown since the index was built,
+        extend patches the index with the appended records
+
+        Args:
+            kind(str): type of index
+            match_from(list): of dict
+            name_key(str):
+            build(callable): creates the index
+            extend(callable): adds a list of records to the index,
+                default None rebuilds instead
+
+        Returns:
+            index created by build
+
+        '''
+        key = (kind, id(match_from), name_key)
+        cached = self._name_indexes.get(key)
+        if cached and cached[0] is match_from:
+            if cached[1] == len(match_from):
+                return cached[2]
+            if extend is not None and cached[1] < len(match_from):
+                extend(cached[2], match_from[cached[1]:])
+                self._name_indexes[key] = (match_from, len(match_from),
+                                           cached[2])
+                return cached[2]
+        if len(self._name_indexes) >= INDEX_CACHE_SIZE:
+            self._name_indexes.pop(next(iter(self._name_indexes)))
+        idx = None
+        if self.index_file is not None:
+            idx = self.index_file.get(kind, match_from, name_key)
+        if idx is None:
+            idx = build()
+        self._name_indexes[key] = (match_from, len(match_from), idx)
+        return idx
+
     def make_source_based(self,
                           source_keys,
                           dict_key='name',
@@ -324,25 +1225,8 @@ class Site:
                                    {Michael Thomas WR 2 dict}]
 
         '''
-        source_based = {}
-        base_players = self.get_base_players()
-        if dict_key == 'name':
-            for key in source_keys:
-                logging.info('starting %s', key)
-                matches = [p for p in base_players
-                           if key == p[name_key]]
-                if matches:
-                    source_based[key] = matches
-        elif dict_key == 'namepos':
-            for key in source_keys:
-                matches = [p for p in base_players
-                           if key == (p[name_key],
-                                      p[pos_key])]
-                if matches:
-                    source_based[key] = matches
-        else:
-            raise ValueError('invalid key name: %s', dict_key)
-        return source_based
+        return self._make_based(self.get_base_players(), source_keys,
+                                dict_key, name_key, pos_key)
 
     def make_source_mfld(self,
                           source_keys,
@@ -372,26 +1256,254 @@ class Site:
                                    {Michael Thomas WR 2 dict}]
 
         '''
-        source_based = {}
-        mfl_players = self.get_mfl_players()
+        return self._make_based(self.get_mfl_players(), source_keys,
+                                dict_key, name_key, pos_key)
+
+    def _make_based(self, players, source_keys, dict_key, name_key, pos_key):
+        '''
+        Answers source_keys from one grouping pass over players
+
+        Args:
+            players(list): of dict
+            source_keys(list): names or (name, pos) tuples
+            dict_key(str): 'name' or 'namepos'
+            name_key(str):
+            pos_key(str):
+
+        Returns:
+            dict
+
+        '''
         if dict_key == 'name':
-            for key in source_keys:
-                logging.info('starting %s', key)
-                matches = [p for p in mfl_players
-                           if key == p[name_key]]
-                if matches:
-                    source_based[key] = matches
+            index = self.get_name_index(players, name_key)
         elif dict_key == 'namepos':
-            for key in source_keys:
-                matches = [p for p in mfl_players
-                           if key == (p[name_key],
-                                      p[pos_key])]
-                if matches:
-                    source_based[key] = matches
+            index = self.get_namepos_index(players, name_key, pos_key)
         else:
             raise ValueError('invalid key name: %s', dict_key)
-        return source_based
+        based = {key: list(index[key]) for key in source_keys if key in index}
+        logging.debug('matched %s keys', len(based))
+        return based
+
+    def _matcher(self, match_from, name_key_from, thresh=90,
+                 interactive=False, blocking=False, choices=None,
+                 scorer=None, cache=None, emit=None, pos_key_from=None,
+                 position_map=None, aliases=False):
+        '''
+        Indexes and settings shared by match and match_iter
+
+        Args:
+            match_from(list): of dict
+            name_key_from(str): name key in match_from
+            thresh(int): default 90
+            interactive: bool, 'review' or ReviewQueue, default False
+            blocking: False, True or 'ngram', or 'phonetic', default False
+            choices(Choices): default None
+            scorer: scorer backend name or object, default 'fuzzywuzzy'
+            cache(MatchCache): default None
+            emit(callable): receives one event per decision, default None
+            pos_key_from(str): position key in match_from, turns on
+                position buckets, default None
+            position_map(dict): source position overrides, default None
+            aliases(bool): match known aliases before fuzzy, default False
+
+        Returns:
+            _Matcher
+
+        '''
+        if choices is None:
+            choices = self.get_choices(match_from, name_key_from)
+        scope = None
+        if pos_key_from is not None:
+            def scope(bucket):
+                records = self.get_position_bucket(match_from, bucket,
+                                                   pos_key_from)
+                return (self.get_name_index(records, name_key_from),
+                        self.get_choices(records, name_key_from),
+                        self._blocking_index(records, name_key_from,
+                                             blocking))
+        cached_raw, cached_norm, ids_from = {}, {}, {}
+        if cache is not None:
+            if not any(c is cache for c in self._caches):
+                self._caches.append(cache)
+            cached_raw, cached_norm = cache.load(self.source_name)
+            ids_from = self.get_id_index(match_from)
+        return _Matcher(names_from=self.get_name_index(match_from,
+                                                       name_key_from),
+                        choices=choices,
+                        index=self._blocking_index(match_from, name_key_from,
+                                                   blocking),
+                        scorer=get_scorer(scorer),
+                        thresh=thresh,
+                        interactive=bool(interactive),
+                        use_cache=cache is not None,
+                        cached_raw=cached_raw,
+                        cached_norm=cached_norm,
+                        ids_from=ids_from,
+                        emit=emit,
+                        pos_key=pos_key_from,
+                        position_map=position_map,
+                        scope=scope,
+                        aliases=self.get_alias_index(match_from, name_key_from)
+                        if aliases else None)
+
+    def _blocking_index(self, match_from, name_key, blocking):
+        '''
+        Blocking index for the blocking argument of match
+
+        Args:
+            match_from(list): of dict
+            name_key(str):
+            blocking: False, True or 'ngram', or 'phonetic'
+
+        Returns:
+            NgramIndex, PhoneticIndex or None
 
+        '''
+        if blocking == 'phonetic':
+            return self.get_phonetic_index(match_from, name_key)
+        if blocking:
+            return self.get_ngram_index(match_from, name_key)
+        return None
+
+    def _assign(self, matcher, to_match, name_key_to, pos_key_to, stats):
+        '''
+        Matches a whole roster one-to-one
+
+        Each record gets weighted edges to its candidate records
+        (see _Matcher.candidates), twice the score plus one at a base
+        position of the record's position, so position only breaks ties.
+        assign() then picks the set of distinct matches with the largest
+        total weight. A record whose assigned match ties with another
+        of its candidates is not matched, since the choice between
+        them would be a guess; its tied candidates are returned instead.
+
+        Args:
+            matcher(_Matcher):
+            to_match(list): of dict
+            name_key_to(str):
+            pos_key_to(str): or None
+            stats(MatchStats): gets the solve time, default None
+
+        Returns:
+            list: per record in to_match, (dict, int, str) the assigned
+            record, its score and method; a list of tied records;
+            or None
+
+        '''
+        found, elapsed, weights, records = {}, {}, {}, {}
+        keys = []
+        for row, p in enumerate(to_match):
+            pos = p.get(pos_key_to) if pos_key_to else None
+            key = (p[name_key_to], matcher.bucket(pos))
+            keys.append(key)
+            if key not in found:
+                start = time.perf_counter()
+                found[key] = {id(record): (record, score, method)
+                              for record, score, method in
+                              matcher.candidates(key[0], pos)}
+                elapsed[key] = time.perf_counter() - start
+            bucket = key[1]
+            weights[row] = {
+                col: 2 * score + (bucket is not None and
+                                  record.get(matcher.pos_key) in bucket)
+                for col, (record, score, _) in found[key].items()}
+            records.update(found[key])
+        start = time.perf_counter()
+        assigned = assign(weights)
+        if stats is not None:
+            stats.record_batch('assign', time.perf_counter() - start,
+                               len(to_match))
+        results = []
+        for row in range(len(to_match)):
+            col = assigned[row]
+            if col is None:
+                results.append(None)
+                continue
+            tied = [records[other][0] for other, weight in weights[row].items()
+                    if weight == weights[row][col]]
+            results.append(records[col] if len(tied) == 1 else tied)
+        if matcher.emit is not None:
+            for key, result in zip(keys, results):
+                if isinstance(result, list):
+                    outcome, confidence = 'duplicate', 0
+                elif result:
+                    outcome, confidence = result[2], result[1]
+                else:
+                    outcome, confidence = 'unmatched', 0
+                matcher.emit({'name': key[0],
+                              'outcome': outcome,
+                              'confidence': confidence,
+                              'elapsed': elapsed[key],
+                              'timings': {'candidates': elapsed[key]},
+                              'candidates': len(found[key]),
+                              'cache_hit': None})
+        return results
+
+    def _store_decisions(self, cache, decisions):
+        '''
+        Writes fuzzy and interactive decisions to the cache
+
+        Args:
+            cache(MatchCache): or None
+            decisions(list): of (name, match, confidence, method)
+
+        Returns:
+            None
+
+        '''
+        if cache is None:
+            return
+        cache.store([{'source': self.source_name, 'raw_name': name,
+                      'player_id': match['player_id'], 'score': confidence,
+                      'method': method}
+                     for name, match, confidence, method in decisions
+                     if match.get('player_id') not in (None, 'None')])
+
+    def top_matches(self,
+                    to_match,
+                    match_from,
+                    limit=5,
+                    score_cutoff=0,
+                    name_key='full_name',
+                    id_key='player_id',
+                    blocking=False,
+                    scorer=None):
+        '''
+        Ranked candidate records for one name
+
+        Scores go through a bounded heap that raises its own cutoff as
+        it fills (see Choices.top), so asking for a few candidates does
+        not score and sort every name in full
+
+        Args:
+            to_match(str): name to match
+            match_from(list): of dict
+            limit(int): number of distinct names, default 5
+            score_cutoff(int): minimum score, default 0
+            name_key(str): default 'full_name'
+            id_key(str): default 'player_id'
+            blocking: False, True or 'ngram', or 'phonetic', default False
+            scorer(str): default None
+
+        Returns:
+            list: of dict with id, name, score and record, highest score
+            first; players sharing a name each get an entry
+
+        '''
+        names = None
+        index = self._blocking_index(match_from, name_key, blocking)
+        if index is not None:
+            names = index.candidates(to_match, score_cutoff)
+            if not names:
+                return []
+        found = get_scorer(scorer).top(to_match,
+                                       self.get_choices(match_from, name_key),
+                                       limit=limit, names=names,
+                                       score_cutoff=score_cutoff)
+        names_from = self.get_name_index(match_from, name_key)
+        return [{'id': record.get(id_key), 'name': name, 'score': score,
+                 'record': record}
+                for name, score in found for record in names_from[name]]
 
     def match(self,
               to_match,
@@ -399,7 +1511,19 @@ class Site:
               id_keys=('source_player_id', 'player_id'),
               name_keys=('source_player_name', 'full_name'),
               interactive=False,
-              thresh=90):
+              thresh=90,
+              blocking=False,
+              workers=1,
+              executor=None,
+              choices=None,
+              scorer=None,
+              cache=None,
+              stats=None,
+              hook=None,
+              pos_keys=None,
+              position_map=None,
+              aliases=True,
+              assignment=False):
         '''
         Generic match routine
 
@@ -408,92 +1532,281 @@ class Site:
             match_from(list): of dict
             id_keys(tuple): default ('source_player_id', 'player_id')
             name_keys(tuple): default ('source_player_name', 'full_name')
-            interactive(bool): default False,
+            interactive: True prompts name by name; 'review' or a
+                ReviewQueue reviews every name without a direct, alias
+                or cached match from a queue scored up front, saving
+                decisions to cache in batches; default False
             thresh(int): default 90
+            blocking: fuzzy match only candidates from an n-gram index
+                (True or 'ngram') or phonetic buckets ('phonetic'),
+                default False
+            workers(int): processes for fuzzy matching, None for all cores,
+                default 1
+            executor(ProcessPoolExecutor): process pool for fuzzy matching,
+                reused across calls instead of one started per call;
+                workers still sets how the names are split, default None
+            choices(Choices): compiled names of match_from, default None
+            scorer: scorer backend name or object, default 'fuzzywuzzy'
+            cache(MatchCache): earlier decisions for self.source_name,
+                consulted before fuzzy matching and updated after, default None
+            stats(MatchStats): filled with per-stage counts and latencies
+                and returned after the results, True for a new one,
+                default None
+            hook(callable): called with each decision's event, default None
+            pos_keys(tuple): position keys in to_match and match_from,
+                e.g. ('source_player_position', 'primary_pos'); narrows
+                duplicates and fuzzy search to the position, default None
+            position_map(dict): source position: base positions,
+                merged into position.POSITION_MAP, default None
+            aliases(bool): match names that are an alias of one player
+                (alt_names, first/last/suffix permutations) before
+                fuzzy matching, default True
+            assignment(bool): match the whole of to_match one-to-one,
+                so no two records get the same match_from record;
+                records tied between candidates go to duplicates.
+                Candidates are scored in this process, so workers and
+                executor are ignored; default False
 
         Returns:
             tuple: list of dict, dict of list, list of dict
+            and MatchStats if stats is set
+
+        Raises:
+            ValueError: if assignment is combined with interactive,
+                since assignment decides every record itself
 
         '''
+        if assignment and interactive:
+            raise ValueError('assignment cannot be combined with interactive')
         matched = []
+        decisions = []
         duplicates = {}
         unmatched = []
         id_key_to, id_key_from = id_keys
         name_key_to, name_key_from = name_keys
-        playernames_from = [mf[name_key_from] for mf in match_from]
+        if stats is True:
+            stats = MatchStats()
+        pos_key_to, pos_key_from = pos_keys or (None, None)
+        matcher = self._matcher(match_from, name_key_from, thresh=thresh,
+                                interactive=interactive, blocking=blocking,
+                                choices=choices, scorer=scorer, cache=cache,
+                                emit=_emitter(stats, hook),
+                                pos_key_from=pos_key_from,
+                                position_map=position_map,
+                                aliases=aliases)
+
+        if assignment:
+            results = self._assign(matcher, to_match, name_key_to,
+                                   pos_key_to if pos_keys else None, stats)
+            for p, result in zip(to_match, results):
+                if result is None:
+                    unmatched.append(p)
+                    continue
+                if isinstance(result, list):
+                    duplicates[p[name_key_to]] = result
+                    continue
+                match, confidence, method = result
+                p[id_key_from] = match[id_key_from]
+                matched.append(p)
+                if method == 'fuzzy':
+                    decisions.append((p[name_key_to], match, confidence,
+                                      'assignment'))
+            self._store_decisions(cache, decisions)
+            if stats is not None:
+                return matched, duplicates, unmatched, stats
+            return matched, duplicates, unmatched
+
+        # fuzzy match everything without a direct match up front
+        fuzzy = {}
+        if (workers != 1 or executor is not None) and not interactive:
+            fuzzy = matcher.prefuzz(
+                [p[name_key_to] for p in to_match], workers, stats,
+                [p.get(pos_key_to) for p in to_match] if pos_keys else None,
+                executor)
+        review_queue = get_queue(interactive)
+        if review_queue is not None:
+            matcher.review(
+                review_queue, [p[name_key_to] for p in to_match],
+                [p.get(pos_key_to) for p in to_match] if pos_keys else None,
+                on_batch=lambda batch: self._store_decisions(cache, batch))
 
         for p in to_match:
-            # first option is to see if direct match
-            matches = [mf for mf in match_from if
-                       p[name_key_to] == mf[name_key_from]]
+            matches, confidence, method = matcher.decide(
+                p[name_key_to], fuzzy, p.get(pos_key_to) if pos_keys else None)
             if matches and len(matches) == 1:
-                logging.debug('direct match %s', p[name_key_to])
                 match = matches[0]
                 p[id_key_from] = match[id_key_from]
                 matched.append(p)
-                continue
-            elif matches and len(matches) > 1:
-                logging.debug('duplicate match %s', p[name_key_to])
+                # reviewed decisions were saved batch by batch
+                if method == 'fuzzy' or (method == 'interactive' and
+                                         review_queue is None):
+                    decisions.append((p[name_key_to], match, confidence,
+                                      method))
+            elif matches:
                 duplicates[p[name_key_to]] = matches
-                continue
-
-            # try interactive match
-            if interactive:
-                match_name, confidence = match_interactive(
-                            to_match=p[name_key_to],
-                            match_from=playernames_from)
-                if match_name:
-                    matches = [mf for mf in match_from if
-                               mf[name_key_from] == match_name]
-                    if matches and len(matches) == 1:
-                        logging.debug('fuzzy match %s %s', (p[name_key_to], confidence))
-                        match = matches[0]
-                        p[id_key_from] = match[id_key_from]
-                        matched.append(p)
-                        continue
-                    elif matches and len(matches) > 1:
-                        logging.debug('duplicate match %s', p[name_key_to])
-                        duplicates[p[name_key_to]] = matches
-                        continue
             else:
-                match_name, confidence = match_fuzzy(
-                            to_match=p[name_key_to],
-                            match_from=playernames_from)
-                if match_name and confidence >= thresh:
-                    matches = [mf for mf in match_from if
-                               mf[name_key_from] == match_name]
-                    if matches and len(matches) == 1:
-                        logging.debug('fuzzy match %s %s', (p[name_key_to], confidence))
-                        match = matches[0]
-                        p[id_key_from] = match[id_key_from]
-                        matched.append(p)
-                        continue
-                    elif matches and len(matches) > 1:
-                        logging.debug('duplicate match %s', p[name_key_to])
-                        duplicates[p[name_key_to]] = matches
-                        continue
-
-            # if unmatched, log and add to unmatched
-            logging.debug('no match %s', p[name_key_to])
-            unmatched.append(p)
+                unmatched.append(p)
+
+        self._store_decisions(cache, decisions)
+        if stats is not None:
+            return matched, duplicates, unmatched, stats
         return matched, duplicates, unmatched
 
+    def match_iter(self,
+                   to_match,
+                   match_from,
+                   id_keys=('source_player_id', 'player_id'),
+                   name_keys=('source_player_name', 'full_name'),
+                   interactive=False,
+                   thresh=90,
+                   blocking=False,
+                   workers=1,
+                   executor=None,
+                   chunksize=1000,
+                   choices=None,
+                   scorer=None,
+                   cache=None,
+                   stats=None,
+                   hook=None,
+                   pos_keys=None,
+                   position_map=None,
+                   aliases=True):
+        '''
+        Streaming match routine, same decisions as match
+
+        Reads to_match lazily, chunksize records at a time, and
+        yields each result once decided. Records in to_match are not
+        modified; matched records are yielded as copies with the id added.
+
+        Args:
+            to_match(iterable): of dict
+            match_from(list): of dict
+            id_keys(tuple): default ('source_player_id', 'player_id')
+            name_keys(tuple): default ('source_player_name', 'full_name')
+            interactive: True prompts name by name; 'review' or a
+                ReviewQueue reviews every name without a direct, alias
+                or cached match from a queue scored up front, saving
+                decisions to cache in batches; default False
+            thresh(int): default 90
+            blocking: fuzzy match only candidates from an n-gram index
+                (True or 'ngram') or phonetic buckets ('phonetic'),
+                default False
+            workers(int): processes for fuzzy matching, None for all cores,
+                default 1
+            executor(ProcessPoolExecutor): process pool for fuzzy matching,
+                reused across calls instead of one started per call;
+                workers still sets how the names are split, default None
+            chunksize(int): records read at a time, default 1000
+            choices(Choices): compiled names of match_from, default None
+            scorer: scorer backend name or object, default 'fuzzywuzzy'
+            cache(MatchCache): earlier decisions for self.source_name,
+                updated after each chunk, default None
+            stats(MatchStats): filled as records are decided; True is
+                accepted like match, but only a MatchStats passed in
+                can be read afterwards, default None
+            hook(callable): called with each decision's event, default None
+            pos_keys(tuple): position keys in to_match and match_from,
+                default None
+            position_map(dict): source position: base positions,
+                default None
+            aliases(bool): match known aliases before fuzzy, default True
+
+        Returns:
+            generator: of (str, dict, list)
+            status ('matched', 'duplicate' or 'unmatched'), record,
+            and the match_from records it matched
+
+        '''
+        id_key_to, id_key_from = id_keys
+        name_key_to, name_key_from = name_keys
+        if stats is True:
+            stats = MatchStats()
+        pos_key_to, pos_key_from = pos_keys or (None, None)
+        matcher = self._matcher(match_from, name_key_from, thresh=thresh,
+                                interactive=interactive, blocking=blocking,
+                                choices=choices, scorer=scorer, cache=cache,
+                                emit=_emitter(stats, hook),
+                                pos_key_from=pos_key_from,
+                                position_map=position_map,
+                                aliases=aliases)
+        review_queue = get_queue(interactive)
+        records = iter(to_match)
+        while True:
+            chunk = list(itertools.islice(records, chunksize))
+            if not chunk:
+                break
+            fuzzy = {}
+            if (workers != 1 or executor is not None) and not interactive:
+                fuzzy = matcher.prefuzz(
+                    [p[name_key_to] for p in chunk], workers, stats,
+                    [p.get(pos_key_to) for p in chunk] if pos_keys else None,
+                    executor)
+            if review_queue is not None:
+                matcher.review(
+                    review_queue, [p[name_key_to] for p in chunk],
+                    [p.get(pos_key_to) for p in chunk] if pos_keys else None,
+                    on_batch=lambda batch: self._store_decisions(cache,
+                                                                 batch))
+            decisions = []
+            for p in chunk:
+                matches, confidence, method = matcher.decide(
+                    p[name_key_to], fuzzy,
+                    p.get(pos_key_to) if pos_keys else None)
+                if matches and len(matches) == 1:
+                    match = matches[0]
+                    if method == 'fuzzy' or (method == 'interactive' and
+                                             review_queue is None):
+                        decisions.append((p[name_key_to], match, confidence,
+                                          method))
+                    record = dict(p)
+                    record[id_key_from] = match[id_key_from]
+                    yield 'matched', record, matches
+                elif matches:
+                    yield 'duplicate', p, matches
+                else:
+                    yield 'unmatched', p, []
+            self._store_decisions(cache, decisions)
+
     def match_base(self,
                    to_match,
                    name_key_to='source_player_name',
                    interactive=False,
-                   thresh=90):
+                   thresh=90,
+                   blocking=False,
+                   workers=1,
+                   scorer=None,
+                   cache=None,
+                   stats=None,
+                   hook=None,
+                   pos_key_to=None,
+                   position_map=None,
+                   aliases=True,
+                   assignment=False):
         """
         Adds player_id to list of players
 
         Args:
             to_match(list):
             name_key_to(str): default 'source_player_name'
-            interactive(bool): default False,
+            interactive: default False, see match
             thresh(int): default 90
+            blocking: False, True or 'ngram', or 'phonetic', default False
+            workers(int): default 1
+            scorer(str): default None
+            cache(MatchCache): default None
+            stats(MatchStats): default None
+            hook(callable): default None
+            pos_key_to(str): position key in to_match, e.g.
+                'source_player_position', to match within positions,
+                default None
+            position_map(dict): default None
+            aliases(bool): default True
+            assignment(bool): one-to-one matching, not with interactive,
+                default False
 
         Returns:
             list of dict, dict of list, list of dict
+            and MatchStats if stats is set
 
         """
         name_keys = (name_key_to, 'full_name')
@@ -503,14 +1816,35 @@ class Site:
                           name_keys=name_keys,
                           id_keys=id_keys,
                           interactive=interactive,
-                          thresh=thresh)
+                          thresh=thresh,
+                          blocking=blocking,
+                          workers=workers,
+                          scorer=scorer,
+                          cache=cache,
+                          stats=stats,
+                          hook=hook,
+                          pos_keys=(pos_key_to, 'primary_pos')
+                          if pos_key_to else None,
+                          position_map=position_map,
+                          aliases=aliases,
+                          assignment=assignment)
 
     def match_mfl(self,
                    to_match,
                    name_key_to='source_player_name',
                    id_key_to='source_player_id',
                    interactive=False,
-                   thresh=90):
+                   thresh=90,
+                   blocking=False,
+                   workers=1,
+                   scorer=None,
+                   cache=None,
+                   stats=None,
+                   hook=None,
+                   pos_key_to=None,
+                   position_map=None,
+                   aliases=True,
+                   assignment=False):
         """
         Adds mfl_player_id to list of players
 
@@ -518,11 +1852,25 @@ class Site:
             to_match(list):
             name_key_to(str): default 'source_player_name'
             id_key_to(str): default 'source_player_id'
-            interactive(bool): default False,
+            interactive: default False, see match
             thresh(int): default 90
+            blocking: False, True or 'ngram', or 'phonetic', default False
+            workers(int): default 1
+            scorer(str): default None
+            cache(MatchCache): default None
+            stats(MatchStats): default None
+            hook(callable): default None
+            pos_key_to(str): position key in to_match, e.g.
+                'source_player_position', to match within positions,
+                default None
+            position_map(dict): default None
+            aliases(bool): default True
+            assignment(bool): one-to-one matching, not with interactive,
+                default False
 
         Returns:
             list of dict, dict of list, list of dict
+            and MatchStats if stats is set
 
         """
         name_keys = (name_key_to, 'full_name')
@@ -532,7 +1880,18 @@ class Site:
                           name_keys=name_keys,
                           id_keys=id_keys,
                           interactive=interactive,
-                          thresh=thresh)
+                          thresh=thresh,
+                          blocking=blocking,
+                          workers=workers,
+                          scorer=scorer,
+                          cache=cache,
+                          stats=stats,
+                          hook=hook,
+                          pos_keys=(pos_key_to, 'primary_pos')
+                          if pos_key_to else None,
+                          position_map=position_map,
+                          aliases=aliases,
+                          assignment=assignment)
 
 
 if __name__ == '__main__':
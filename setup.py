@@ -15,4 +15,7 @@ setup(name='namematcher',
       author_email='eric@erictruett.com',
       license='MIT',
       packages=['namematcher'],
+      entry_points={
+          'console_scripts': ['namematcher=namematcher.cli:main'],
+      },
       zip_safe=False)
@@ -0,0 +1,113 @@
+"""
+
+# tests/test_aio.py
+
+"""
+
+import asyncio
+import os
+import unittest
+
+from namematcher.db import setup
+from namematcher.xref import Site
+
+try:
+    from namematcher.aio import AsyncSite, async_url, create_engine
+    import aiosqlite  # noqa: F401
+    import greenlet  # noqa: F401
+except ImportError:
+    AsyncSite = None
+
+
+DB_FILE = os.path.join(os.path.dirname(__file__), '..', 'namematcher.sqlite')
+SOURCES = ['pff', 'mfl', 'espn', 'fantasypros']
+
+
+@unittest.skipIf(AsyncSite is None, 'requires sqlalchemy[asyncio] aiosqlite')
+class Aio_test(unittest.TestCase):
+    """
+    Tests aio
+
+    """
+    def setUp(self):
+        """
+
+        Returns:
+
+        """
+        base, eng, session = setup(database='sqlite', database_file=DB_FILE)
+        self.x = Site(base=base, eng=eng, session=session)
+
+    def test_async_url(self):
+        """
+
+        Returns:
+
+        """
+        self.assertEqual(async_url('sqlite:///a.sqlite'),
+                         ('sqlite+aiosqlite:///a.sqlite', 'aiosqlite'))
+        self.assertEqual(async_url('postgresql://u:p@h:5432/db'),
+                         ('postgresql+asyncpg://u:p@h:5432/db', 'asyncpg'))
+
+    def test_create_engine(self):
+        """
+
+        Returns:
+
+        """
+        eng = create_engine(database_file=DB_FILE)
+        self.assertEqual(eng.url.drivername, 'sqlite+aiosqlite')
+        self.assertEqual(eng.url.database, DB_FILE)
+        asyncio.run(eng.dispose())
+
+    def test_load(self):
+        """
+
+        Returns:
+
+        """
+        async def run():
+            site = await AsyncSite.create(database_file=DB_FILE,
+                                          sources=SOURCES)
+            try:
+                return ({s: site.get_xref_snapshot(s).records()
+                         for s in SOURCES}, site.get_base_players())
+            finally:
+                await site.close()
+
+        xrefs, players = asyncio.run(run())
+        self.assertEqual(players, self.x.get_base_players())
+        for source in SOURCES:
+            self.assertEqual(xrefs[source],
+                             self.x.get_xref_snapshot(source).records())
+
+    def test_match_base(self):
+        """
+
+        Returns:
+
+        """
+        async def run():
+            site = await AsyncSite.create(database_file=DB_FILE,
+                                          source_name='pff')
+            try:
+                with self.assertRaises(RuntimeError):
+                    site.get_xref_snapshot('espn')
+                with self.assertRaises(ValueError):
+                    await site.match_base([], interactive=True)
+                return await site.match_base(site.get_source_players(),
+                                             blocking=True)
+            finally:
+                await site.close()
+
+        players, duplicates, unmatched = asyncio.run(run())
+        self.x.source_name = 'pff'
+        expected = self.x.match_base(self.x.get_source_players(),
+                                     blocking=True)
+        self.assertEqual(players, expected[0])
+        self.assertEqual(duplicates, expected[1])
+        self.assertEqual(unmatched, expected[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
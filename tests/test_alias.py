@@ -0,0 +1,107 @@
+"""
+
+# tests/test_alias.py
+
+"""
+
+import os
+import unittest
+
+from namematcher.alias import AliasIndex, parse_alt_names, record_aliases
+from namematcher.db import setup
+from namematcher.match import match_name
+from namematcher.xref import Site
+
+
+DB_FILE = os.path.join(os.path.dirname(__file__), '..', 'namematcher.sqlite')
+
+
+class Alias_test(unittest.TestCase):
+    """
+    Tests alias
+
+    """
+    def setUp(self):
+        self.records = [
+            {'player_id': 1, 'full_name': 'Odell Beckham', 'first_name': 'Odell',
+             'last_name': 'Beckham', 'suffix': 'Jr.', 'alt_names': 'OBJ'},
+            {'player_id': 2, 'full_name': 'Mike Williams', 'first_name': 'Mike',
+             'last_name': 'Williams', 'suffix': None, 'alt_names': None},
+            {'player_id': 3, 'full_name': 'Mike Williams', 'first_name': 'Mike',
+             'last_name': 'Williams', 'suffix': None,
+             'alt_names': '["Michael Williams"]'},
+        ]
+
+    def test_parse_alt_names(self):
+        """
+
+        Returns:
+
+        """
+        self.assertEqual(parse_alt_names(None), [])
+        self.assertEqual(parse_alt_names('None'), [])
+        self.assertEqual(parse_alt_names('["A B", "C D"]'), ['A B', 'C D'])
+        self.assertEqual(parse_alt_names('A B; C D|E F'),
+                         ['A B', 'C D', 'E F'])
+        self.assertEqual(parse_alt_names(['A B', ' ']), ['A B'])
+
+    def test_record_aliases(self):
+        """
+
+        Returns:
+
+        """
+        aliases = record_aliases(self.records[0])
+        for nm in ('Odell Beckham', 'OBJ', 'Beckham, Odell',
+                   'Odell Beckham Jr.', 'Beckham, Odell Jr.'):
+            self.assertIn(nm, aliases)
+
+    def test_alias_index(self):
+        """
+
+        Returns:
+
+        """
+        idx = AliasIndex(self.records)
+        self.assertEqual(idx.match('odell beckham jr.')['player_id'], 1)
+        self.assertEqual(idx.match('Beckham,  Odell')['player_id'], 1)
+        self.assertEqual(idx.match('obj')['player_id'], 1)
+        self.assertEqual(len(idx.lookup('Mike Williams')), 2)
+        self.assertIsNone(idx.match('Mike Williams'))
+        self.assertEqual(idx.match('Michael Williams')['player_id'], 3)
+        self.assertIsNone(idx.match('Nobody Here'))
+        names = [r['full_name'] for r in self.records]
+        self.assertEqual(match_name('OBJ', names, aliases=idx),
+                         'Odell Beckham')
+
+    def test_site_match(self):
+        """
+
+        Returns:
+
+        """
+        base, eng, session = setup(database='sqlite', database_file=DB_FILE)
+        x = Site(base=base, eng=eng, session=session)
+        players = x.get_base_players()
+        to_match = [{'source_player_name': 'Beckham, Odell',
+                     'source_player_id': 'x1'}]
+        matched, dups, unmatched = x.match(to_match, players,
+                                           id_keys=('source_player_id',
+                                                    'player_id'),
+                                           name_keys=('source_player_name',
+                                                      'full_name'))
+        self.assertEqual(len(matched), 1)
+        ids = {p['player_id'] for p in players
+               if p['full_name'].startswith('Odell Beckham')}
+        self.assertIn(matched[0]['player_id'], ids)
+        matched, dups, unmatched = x.match(to_match, players,
+                                           id_keys=('source_player_id',
+                                                    'player_id'),
+                                           name_keys=('source_player_name',
+                                                      'full_name'),
+                                           thresh=101, aliases=False)
+        self.assertEqual(len(unmatched), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+
+# tests/test_assign.py
+
+"""
+
+import itertools
+import random
+import unittest
+
+from namematcher.assign import assign, components
+
+
+class Assign_test(unittest.TestCase):
+    """
+    Tests assign
+
+    """
+    def best(self, weights):
+        rows = list(weights)
+        cols = sorted({c for w in weights.values() for c in w})
+        best = 0
+        for perm in itertools.permutations(cols + [None] * len(rows),
+                                           len(rows)):
+            if any(c is not None and c not in weights[r]
+                   for r, c in zip(rows, perm)):
+                continue
+            best = max(best, sum(weights[r][c] for r, c in zip(rows, perm)
+                                 if c is not None))
+        return best
+
+    def test_components(self):
+        """
+
+        Returns:
+
+        """
+        weights = {0: {'a': 1}, 1: {'b': 1, 'c': 1}, 2: {'c': 1}, 3: {}}
+        self.assertEqual(components(weights), [[0], [1, 2], [3]])
+
+    def test_assign(self):
+        """
+
+        Returns:
+
+        """
+        weights = {0: {'a': 10, 'b': 9}, 1: {'a': 8}, 2: {'a': 1}}
+        self.assertEqual(assign(weights), {0: 'b', 1: 'a', 2: None})
+        self.assertEqual(assign({}), {})
+
+    def test_assign_optimal(self):
+        """
+
+        Returns:
+
+        """
+        rnd = random.Random(0)
+        for _ in range(200):
+            cols = 'abcd'[:rnd.randint(1, 4)]
+            weights = {row: {c: rnd.randint(1, 20) for c in cols
+                             if rnd.random() < .6}
+                       for row in range(rnd.randint(1, 4))}
+            assigned = assign(weights)
+            taken = [c for c in assigned.values() if c is not None]
+            self.assertEqual(len(taken), len(set(taken)))
+            self.assertEqual(sum(weights[r][c] for r, c in assigned.items()
+                                 if c is not None), self.best(weights))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+# tests/test_blocking.py
+
+import logging
+import os
+import random
+import sqlite3
+import sys
+import unittest
+
+from fuzzywuzzy import fuzz
+
+from namematcher.blocking import NgramIndex
+from namematcher.match import match_fuzzy, match_name
+
+
+DB_FILE = os.path.join(os.path.dirname(__file__), '..', 'namematcher.sqlite')
+
+
+class Blocking_test(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with sqlite3.connect(DB_FILE) as conn:
+            cls.names = [row[0] for row in
+                         conn.execute('SELECT full_name FROM player')]
+        cls.index = NgramIndex(cls.names)
+
+    def setUp(self):
+        random.seed(0)
+        self.queries = ['Jamaal Charles', 'Charles, Jamaal', 'Odell Beckham',
+                        'TJ Logan', 'Deandre Hopkins', 'Zzyzx Qwerty',
+                        'Todd Gurley II', 'Jaguars DST', 'Beckham']
+        self.queries += [nm[:-1] for nm in random.sample(self.names, 3)]
+
+    def test_candidates_recall(self):
+        '''
+        every name with WRatio >= thresh is a candidate
+        '''
+        for query in self.queries:
+            scores = {nm: fuzz.WRatio(query, nm) for nm in set(self.names)}
+            for thresh in (60, 86, 90, 95):
+                candidates = set(self.index.candidates(query, thresh))
+                for nm, score in scores.items():
+                    if score >= thresh:
+                        self.assertIn(nm, candidates, (query, thresh))
+
+    def test_candidates_prune(self):
+        candidates = self.index.candidates('Jamaal Charles', 90)
+        self.assertIn('Jamaal Charles', candidates)
+        self.assertLess(len(candidates), len(self.names) / 20)
+        self.assertEqual(len(self.index.candidates('Jamaal Charles', 0)),
+                         len(set(self.names)))
+
+    def test_match_fuzzy_index(self):
+        for query in self.queries:
+            match, conf = match_fuzzy(query, self.names)
+            if conf >= 90:
+                self.assertEqual(
+                    match_fuzzy(query, self.names, index=self.index,
+                                thresh=90),
+                    (match, conf))
+        self.assertEqual(match_name('Jamal Charles', self.names,
+                                    index=self.index),
+                         'Jamaal Charles')
+
+
+if __name__=='__main__':
+    logging.basicConfig(stream=sys.stdout, level=logging.INFO)
+    unittest.main()
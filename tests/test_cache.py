@@ -0,0 +1,128 @@
+"""
+
+# tests/test_cache.py
+
+"""
+
+import copy
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+
+from namematcher.cache import MatchCache, normalize
+from namematcher.db import setup
+from namematcher.xref import Site
+
+
+DB_FILE = os.path.join(os.path.dirname(__file__), '..', 'namematcher.sqlite')
+
+
+class MatchCache_test(unittest.TestCase):
+    """
+    Tests MatchCache on a copy of the database
+
+    """
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        dbfile = os.path.join(self.tmpdir, 'namematcher.sqlite')
+        shutil.copy(DB_FILE, dbfile)
+        self.base, self.eng, self.session = setup(database='sqlite',
+                                                  database_file=dbfile)
+        self.cache = MatchCache(self.eng, self.base)
+
+    def tearDown(self):
+        self.session.close()
+        self.eng.dispose()
+        shutil.rmtree(self.tmpdir)
+
+    def test_normalize(self):
+        """
+
+        Returns:
+
+        """
+        self.assertEqual(normalize("Odell  Beckham Jr."), 'odell beckham')
+        self.assertEqual(normalize("D'Onta Foreman"), 'donta foreman')
+
+    def test_store_lookup(self):
+        """
+
+        Returns:
+
+        """
+        n = self.cache.store([
+            {'source': 'test', 'raw_name': 'Odell Beckham Jr.',
+             'player_id': 1, 'score': 95, 'method': 'fuzzy'},
+            {'source': 'test', 'raw_name': 'Odell Beckham Jr.',
+             'player_id': 2, 'score': 96, 'method': 'fuzzy'},
+        ])
+        self.assertEqual(n, 1)
+        self.assertEqual(self.cache.lookup('test', 'Odell Beckham Jr.')['player_id'], 2)
+        self.assertEqual(self.cache.lookup('test', 'odell beckham')['player_id'], 2)
+        self.assertIsNone(self.cache.lookup('other', 'Odell Beckham Jr.'))
+
+    def test_invalidation(self):
+        """
+
+        Returns:
+
+        """
+        self.cache.store([{'source': 'test', 'raw_name': 'Joe Thomas',
+                           'player_id': 1}])
+        Player = self.base.classes.player
+        last = self.session.query(Player).order_by(Player.player_id.desc()).first()
+        self.session.add(Player(player_id=last.player_id + 1,
+                                first_name='Cache', last_name='Test',
+                                full_name='Cache Test', pos='QB'))
+        self.session.commit()
+        old = self.cache.fingerprint
+        self.assertNotEqual(self.cache.refresh(), old)
+        self.assertIsNone(self.cache.lookup('test', 'Joe Thomas'))
+        self.assertEqual(self.cache.purge(), 1)
+
+    def test_invalidation_rename(self):
+        """
+
+        Returns:
+
+        """
+        Player = self.base.classes.player
+        first, second = self.session.query(Player) \
+            .order_by(Player.player_id).limit(2).all()
+        old = self.cache.fingerprint
+        # same length rename
+        first.full_name = first.full_name[:-1] + \
+            ('x' if first.full_name[-1] != 'x' else 'y')
+        self.session.commit()
+        renamed = self.cache.refresh()
+        self.assertNotEqual(renamed, old)
+        # swap names between two players
+        first.full_name, second.full_name = second.full_name, first.full_name
+        self.session.commit()
+        self.assertNotEqual(self.cache.refresh(), renamed)
+
+    def test_site_match(self):
+        """
+
+        Returns:
+
+        """
+        x = Site(base=self.base, eng=self.eng, session=self.session,
+                 source_name='pff')
+        to_match = x.get_source_players()
+        expected = x.match_base(copy.deepcopy(to_match), blocking=True)
+        first = x.match_base(copy.deepcopy(to_match), blocking=True,
+                             cache=self.cache)
+        stored = self.cache.load('pff')[0]
+        self.assertGreater(len(stored), 0)
+        self.assertEqual(first, expected)
+        second = x.match_base(copy.deepcopy(to_match), blocking=True,
+                              cache=self.cache)
+        self.assertEqual(second, expected)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
@@ -0,0 +1,91 @@
+# tests/test_choices.py
+
+import logging
+import os
+import random
+import sqlite3
+import sys
+import unittest
+
+from fuzzywuzzy import fuzz, process
+
+from namematcher.choices import Choices, compile_name, wratio
+from namematcher.match import match_fuzzy, match_name
+
+
+DB_FILE = os.path.join(os.path.dirname(__file__), '..', 'namematcher.sqlite')
+
+
+class Choices_test(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        random.seed(0)
+        with sqlite3.connect(DB_FILE) as conn:
+            names = [row[0] for row in
+                     conn.execute('SELECT full_name FROM player')]
+        cls.names = random.sample(names, 400) + ['Michael Thomas'] * 2
+        cls.choices = Choices(cls.names)
+
+    def setUp(self):
+        self.queries = ['Michael Thomas', 'Thomas, Michael', 'Mike Thomas Jr.',
+                        'Beckham', 'Ted Ginn Jr.', 'Jaguars DST', "D'Andre",
+                        'José Ramírez', '...', 'Odell Beckham Jr.']
+        self.queries += [nm[:-2] for nm in random.sample(self.names, 5)]
+
+    def test_wratio(self):
+        for query in self.queries:
+            for nm in self.names[:50]:
+                self.assertEqual(
+                    wratio(compile_name(query), compile_name(nm)),
+                    fuzz.WRatio(query, nm), (query, nm))
+
+    def test_extract_one(self):
+        for query in self.queries:
+            self.assertEqual(self.choices.extract_one(query),
+                             process.extractOne(query, self.names))
+            self.assertEqual(match_fuzzy(query, self.choices),
+                             match_fuzzy(query, self.names))
+        self.assertIsNone(Choices([]).extract_one('Joe Thomas'))
+
+    def test_extract(self):
+        for query in self.queries:
+            self.assertEqual(self.choices.extract(query, limit=3),
+                             process.extract(query, self.names, limit=3))
+
+    def test_top(self):
+        unique = list(dict.fromkeys(self.names))
+        for query in self.queries:
+            self.assertEqual(self.choices.top(query, limit=3),
+                             process.extract(query, unique, limit=3))
+            for cutoff in (60, 90):
+                self.assertEqual(
+                    self.choices.top(query, limit=3, score_cutoff=cutoff),
+                    process.extractBests(query, unique, limit=3,
+                                         score_cutoff=cutoff))
+        self.assertEqual(self.choices.top('Michael Thomas', limit=2)[0],
+                         ('Michael Thomas', 100))
+        self.assertEqual(self.choices.top('Zzyzx', score_cutoff=95), [])
+
+    def test_top_limit(self):
+        unique = list(dict.fromkeys(self.names))
+        query = self.queries[0]
+        self.assertEqual(self.choices.top(query, limit=0), [])
+        self.assertEqual(self.choices.top(query, limit=-1), [])
+        self.assertEqual(process.extractBests(query, unique, limit=0), [])
+        self.assertEqual(self.choices.top(query, limit=None, score_cutoff=60),
+                         process.extractBests(query, unique, limit=None,
+                                              score_cutoff=60))
+        self.assertEqual(len(self.choices.top(query, limit=None)),
+                         len(unique))
+
+    def test_match_name(self):
+        self.assertEqual(match_name('Michael Thomas', self.choices),
+                         'Michael Thomas')
+        self.assertEqual(len(self.choices), len(self.names))
+        self.assertEqual(list(self.choices), self.names)
+
+
+if __name__=='__main__':
+    logging.basicConfig(stream=sys.stdout, level=logging.INFO)
+    unittest.main()
@@ -0,0 +1,129 @@
+"""
+
+# tests/test_cli.py
+
+"""
+
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from namematcher.cli import file_format, main, parse_args, read_records, run
+
+
+DB_FILE = os.path.join(os.path.dirname(__file__), '..', 'namematcher.sqlite')
+
+
+class Cli_test(unittest.TestCase):
+    """
+    Tests cli
+
+    """
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.names = ['Patrick Mahomes', 'Odell Beckham Jr', 'Zzyzx Qwerty',
+                      'Patrick Mahomes']
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write_csv(self):
+        path = os.path.join(self.tmpdir, 'names.csv')
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=['id', 'name'])
+            writer.writeheader()
+            for i, nm in enumerate(self.names):
+                writer.writerow({'id': i, 'name': nm})
+        return path
+
+    def test_file_format(self):
+        """
+
+        Returns:
+
+        """
+        self.assertEqual(file_format('a.CSV'), 'csv')
+        self.assertEqual(file_format('a.ndjson'), 'jsonl')
+        self.assertEqual(file_format('a.txt', 'csv'), 'csv')
+        with self.assertRaises(ValueError):
+            file_format('a.txt')
+
+    def test_read_records(self):
+        """
+
+        Returns:
+
+        """
+        path = os.path.join(self.tmpdir, 'names.jsonl')
+        with open(path, 'w') as f:
+            for nm in self.names:
+                f.write(json.dumps({'name': nm}) + '\n')
+        self.assertEqual([r['name'] for r in read_records(path)], self.names)
+        self.assertEqual([r['name'] for r in read_records(self.write_csv())],
+                         self.names)
+
+    def test_run(self):
+        """
+
+        Returns:
+
+        """
+        args = parse_args([self.write_csv(), '--name-column', 'name',
+                           '--output-dir', self.tmpdir, '--blocking',
+                           '--output-format', 'csv', '--chunksize', '2',
+                           '--database-file', DB_FILE])
+        out = io.StringIO()
+        counts = run(args, out=out)
+        self.assertEqual(sum(counts.values()), len(self.names))
+        self.assertEqual(counts['unmatched'], 1)
+        self.assertIn('records in', out.getvalue())
+        with open(os.path.join(self.tmpdir, 'names_matched.csv')) as f:
+            matched = list(csv.DictReader(f))
+        self.assertTrue(all(r['player_id'] for r in matched))
+
+    def test_run_index(self):
+        """
+
+        Returns:
+
+        """
+        index = os.path.join(self.tmpdir, 'players.idx')
+        argv = [self.write_csv(), '--name-column', 'name', '--quiet',
+                '--output-dir', self.tmpdir, '--blocking',
+                '--database-file', DB_FILE]
+        counts = run(parse_args(argv))
+        self.assertEqual(run(parse_args(argv + ['--index', index])), counts)
+        self.assertTrue(os.path.exists(index))
+        self.assertEqual(run(parse_args(argv + ['--index', index])), counts)
+
+    def test_run_workers(self):
+        """
+
+        Returns:
+
+        """
+        argv = [self.write_csv(), '--name-column', 'name', '--quiet',
+                '--output-dir', self.tmpdir, '--blocking', '--chunksize', '2',
+                '--database-file', DB_FILE]
+        self.assertEqual(run(parse_args(argv + ['--workers', '2'])),
+                         run(parse_args(argv)))
+
+    def test_main(self):
+        """
+
+        Returns:
+
+        """
+        self.assertEqual(main([self.write_csv(), '--name-column', 'name',
+                               '--output-dir', self.tmpdir, '--quiet',
+                               '--blocking', '--database-file', DB_FILE]), 0)
+        self.assertTrue(os.path.exists(
+            os.path.join(self.tmpdir, 'names_matched.jsonl')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,190 @@
+"""
+
+# tests/test_indexfile.py
+
+"""
+
+import copy
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from sqlalchemy import create_engine
+
+from namematcher.db import setup
+from namematcher.indexfile import (INDEX_VERSION, MAGIC, MatchIndex,
+                                   fingerprint, load_index)
+from namematcher.xref import Site
+
+
+DB_FILE = os.path.join(os.path.dirname(__file__), '..', 'namematcher.sqlite')
+
+
+class Indexfile_test(unittest.TestCase):
+    """
+    Tests indexfile on a copy of the database
+
+    """
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.dbfile = os.path.join(self.tmpdir, 'namematcher.sqlite')
+        shutil.copy(DB_FILE, self.dbfile)
+        self.path = os.path.join(self.tmpdir, 'players.idx')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_load_index(self):
+        """
+
+        Returns:
+
+        """
+        index = load_index(self.path, database_file=self.dbfile)
+        self.assertEqual(index.header['version'], INDEX_VERSION)
+        base, eng, session = setup(database='sqlite',
+                                   database_file=self.dbfile)
+        try:
+            x = Site(base=base, eng=eng, session=session, source_name='pff')
+            self.assertEqual(index.lists['players'], x.get_base_players())
+            self.assertEqual(index.lists['mfl_players'], x.get_mfl_players())
+            to_match = x.get_source_players()
+            expected = x.match_base(copy.deepcopy(to_match), blocking=True)
+        finally:
+            session.close()
+            eng.dispose()
+
+        site = Site(index_file=load_index(self.path,
+                                          database_file=self.dbfile))
+        players = site.get_base_players()
+        self.assertIs(players, site.index_file.lists['players'])
+        self.assertEqual(site.match_base(copy.deepcopy(to_match),
+                                         blocking=True), expected)
+        names = site.get_name_index(players)
+        self.assertIs(names['Patrick Mahomes'][0],
+                      next(p for p in players
+                           if p['full_name'] == 'Patrick Mahomes'))
+        self.assertIs(site.get_ngram_index(players),
+                      site.index_file.get('ngram', players, 'full_name'))
+        self.assertIsNone(site.index_file.get('ngram', [], 'full_name'))
+        site.index_file.close()
+        self.assertIsNone(site.index_file.get('phonetic', players,
+                                              'full_name'))
+        self.assertIsNotNone(site.get_phonetic_index(players))
+
+    def test_stale(self):
+        """
+
+        Returns:
+
+        """
+        load_index(self.path, database_file=self.dbfile)
+        with sqlite3.connect(self.dbfile) as conn:
+            conn.execute("INSERT INTO player (player_id, first_name, "
+                         "last_name, full_name, pos, primary_pos) SELECT "
+                         "max(player_id) + 1, 'Zzyzx', 'Quillfeather', "
+                         "'Zzyzx Quillfeather', 'WR', 'WR' FROM player")
+        conn.close()
+        base, eng, session = setup(database='sqlite',
+                                   database_file=self.dbfile)
+        try:
+            with self.assertRaises(ValueError):
+                MatchIndex.open(self.path, eng)
+        finally:
+            session.close()
+            eng.dispose()
+        index = load_index(self.path, database_file=self.dbfile)
+        self.assertEqual(index.lists['players'][-1]['full_name'],
+                         'Zzyzx Quillfeather')
+
+    def test_fingerprint_checksum(self):
+        """
+
+        Returns:
+
+        """
+        # no database file, so the rows are checksummed
+        eng = create_engine('sqlite://',
+                            creator=lambda: sqlite3.connect(self.dbfile))
+        try:
+            before = fingerprint(eng)
+            self.assertIn('checksum', before)
+            self.assertEqual(fingerprint(eng), before)
+            with sqlite3.connect(self.dbfile) as conn:
+                conn.execute("UPDATE player SET full_name = 'Jim Doe' "
+                             "WHERE player_id = (SELECT min(player_id) "
+                             "FROM player)")
+            conn.close()
+            self.assertNotEqual(fingerprint(eng), before)
+        finally:
+            eng.dispose()
+
+    def test_open_invalid(self):
+        """
+
+        Returns:
+
+        """
+        load_index(self.path, database_file=self.dbfile)
+        with open(self.path, 'r+b') as f:
+            f.seek(len(MAGIC))
+            f.write((INDEX_VERSION + 1).to_bytes(4, 'little'))
+        with self.assertRaises(ValueError):
+            MatchIndex.open(self.path)
+        index = load_index(self.path, database_file=self.dbfile)
+        self.assertEqual(index.header['version'], INDEX_VERSION)
+        with open(self.path, 'wb') as f:
+            f.write(b'not an index')
+        with self.assertRaises(ValueError):
+            MatchIndex.open(self.path)
+
+    def test_open_unreadable(self):
+        """
+
+        Returns:
+
+        """
+        index = load_index(self.path, database_file=self.dbfile)
+        offset, size = index.header['sections']['players']
+        start = index._start
+        index.close()
+        with open(self.path, 'r+b') as f:
+            f.seek(start + offset)
+            f.write(b'\xff' * size)
+        with self.assertRaises(ValueError):
+            MatchIndex.open(self.path)
+        index = load_index(self.path, database_file=self.dbfile)
+        self.assertTrue(index.lists['players'])
+
+        section = 'players/ngram:full_name'
+        offset, size = index.header['sections'][section]
+        start = index._start
+        index.close()
+        with open(self.path, 'r+b') as f:
+            f.seek(start + offset)
+            f.write(b'\xff' * size)
+        index = MatchIndex.open(self.path)
+        self.assertIsNone(index.get('ngram', index.lists['players'],
+                                    'full_name'))
+        index.close()
+
+    def test_open_other_code(self):
+        """
+
+        Returns:
+
+        """
+        load_index(self.path, database_file=self.dbfile).close()
+        with mock.patch('namematcher.indexfile.code_hash', return_value='0'):
+            with self.assertRaises(ValueError):
+                MatchIndex.open(self.path)
+            index = load_index(self.path, database_file=self.dbfile)
+        self.assertEqual(index.header['code'], '0')
+        index.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 # tests/test_match.py
 
+from concurrent.futures import ProcessPoolExecutor
 import logging
 import random
 import sys
@@ -43,6 +44,36 @@ class Match_test(unittest.TestCase):
         self.assertEqual(match, nm)
         self.assertGreater(conf, 0)
 
+    def test_match_many(self):
+        '''
+        names, match_from, thresh, workers
+        returns list of (match, conf) in input order
+        '''
+        names = ['Joe Thomas', 'Timmy Johnson', 'Joe Thomas', 'Zzyzx Qwerty']
+        for workers in (1, 2):
+            results = match_many(names, self.names, thresh=85,
+                                 workers=workers, chunksize=1)
+            self.assertEqual(len(results), len(names))
+            self.assertEqual([r[0] for r in results],
+                             ['Joe Thomas', 'Timmy Johnson', 'Joe Thomas', None])
+            self.assertEqual(results[0][1], 100)
+            self.assertLess(results[3][1], 85)
+
+    def test_match_many_executor(self):
+        '''
+        one executor reused across calls with different match_from
+        '''
+        names = ['Joe Thomas', 'Timmy Johnson', 'Zzyzx Qwerty']
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            results = match_many(names, self.names, thresh=85, workers=2,
+                                 executor=executor)
+            self.assertEqual([r[0] for r in results],
+                             ['Joe Thomas', 'Timmy Johnson', None])
+            results = match_many(names, ['Zzyzx Qwerty', 'Joe Thomas'],
+                                 thresh=85, workers=2, executor=executor)
+            self.assertEqual([r[0] for r in results],
+                             ['Joe Thomas', None, 'Zzyzx Qwerty'])
+
     def test_name_dict(self):
         '''
         names, full_name_key, first_name_key, last_name_key
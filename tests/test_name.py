@@ -40,11 +40,48 @@ class Name_test(unittest.TestCase):
         fl = first_last_pair('John Smith Jr.')
         self.assertEqual(fl, ('John', 'Smith'))
 
+    def test_parse_cache(self):
+        parse_cache_clear()
+        first_last('Thomas, Joe')
+        last_first('Thomas, Joe')
+        info = parse_cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+        parse_cache_clear()
+        self.assertEqual(parse_cache_info().currsize, 0)
+
+    def test_many(self):
+        names = ['Thomas, Joe', 'John Smith Jr.', 'Thomas, Joe']
+        self.assertEqual(first_last_many(names),
+                         ['Joe Thomas', 'John Smith', 'Joe Thomas'])
+        self.assertEqual(last_first_many(names),
+                         [last_first(nm) for nm in names])
+        self.assertEqual(first_last_pair_many(names, workers=2, chunksize=1),
+                         [first_last_pair(nm) for nm in names])
+
     def test_namestrip(self):
         pl = self.name
         for char in ['Jr.', 'III', 'IV', 'II', "'", '.', ', ', ',']:
             self.assertEqual(namestrip(pl + char), pl)
 
+    def test_normalizer_matches_namestrip(self):
+        tostrip = ['Jr.', 'III', 'IV', 'II', "'", '.', ', ', ',']
+        rnd = random.Random(0)
+        parts = list("JrIV.', \tVab") + ['Jr.', 'III', ' V']
+        normalizer = Normalizer()
+        for _ in range(20000):
+            nm = ''.join(rnd.choice(parts) for _ in range(rnd.randint(0, 12)))
+            self.assertEqual(normalizer(nm), namestrip(nm, tostrip))
+
+    def test_normalizer_options(self):
+        normalizer = Normalizer(diacritics=True, casefold=True, collapse=True)
+        self.assertEqual(normalizer("Ñandú  O'Neil Jr."), 'nandu oneil')
+        self.assertEqual(Normalizer(trailing_v=False)('Joe Smith V'),
+                         'Joe Smith V')
+
+    def test_normalize_many(self):
+        names = ["D'Onta Foreman", 'Smith, John', "D'Onta Foreman"]
+        self.assertEqual(normalize_many(names), [namestrip(nm) for nm in names])
+
 
 if __name__=='__main__':
     unittest.main()
@@ -0,0 +1,91 @@
+"""
+
+# tests/test_phonetic.py
+
+"""
+
+import os
+import pickle
+import unittest
+
+from namematcher.db import setup
+from namematcher.match import match_fuzzy
+from namematcher.phonetic import PhoneticIndex, name_parts, soundex
+from namematcher.xref import Site
+
+
+DB_FILE = os.path.join(os.path.dirname(__file__), '..', 'namematcher.sqlite')
+
+
+class Phonetic_test(unittest.TestCase):
+    """
+    Tests phonetic
+
+    """
+    def setUp(self):
+        self.names = ['Jamaal Charles', 'DeAndre Hopkins', 'Odell Beckham',
+                      'Jamal Lewis', 'Trey Hopkins', 'JJ Arcega-Whiteside']
+
+    def test_soundex(self):
+        """
+
+        Returns:
+
+        """
+        for word, code in (('Robert', 'R163'), ('Rupert', 'R163'),
+                           ('Ashcraft', 'A261'), ('Tymczak', 'T522'),
+                           ('Pfister', 'P236'), ('Lee', 'L000')):
+            self.assertEqual(soundex(word), code)
+        self.assertEqual(soundex(''), '')
+
+    def test_name_parts(self):
+        """
+
+        Returns:
+
+        """
+        self.assertEqual(name_parts('Odell Beckham Jr.'), ('odell', 'beckham'))
+        self.assertEqual(name_parts("D'Onta Foreman"), ('donta', 'foreman'))
+
+    def test_candidates(self):
+        """
+
+        Returns:
+
+        """
+        idx = PhoneticIndex(self.names)
+        self.assertIn('Jamaal Charles', idx.candidates('Jamal Charles'))
+        self.assertNotIn('Jamal Lewis', idx.candidates('Jamal Charles'))
+        self.assertEqual(idx.candidates('Deandre Hopkins'), ['DeAndre Hopkins'])
+        self.assertIn('JJ Arcega-Whiteside',
+                      idx.candidates('J.J. Arcega-Whiteside'))
+        self.assertEqual(match_fuzzy('Jamal Charles', self.names, index=idx),
+                         ('Jamaal Charles', 96))
+        with self.assertRaises(ValueError):
+            PhoneticIndex(self.names, encoders=['bogus'])
+
+    def test_pickle(self):
+        """
+
+        Returns:
+
+        """
+        idx = PhoneticIndex(self.names, encoders=['soundex'])
+        self.assertEqual(pickle.loads(pickle.dumps(idx)).candidates('Jamal Charles'),
+                         idx.candidates('Jamal Charles'))
+
+    def test_site_match(self):
+        """
+
+        Returns:
+
+        """
+        base, eng, session = setup(database='sqlite', database_file=DB_FILE)
+        x = Site(base=base, eng=eng, session=session, source_name='pff')
+        players, duplicates, unmatched = x.match_base(x.get_source_players(),
+                                                      blocking='phonetic')
+        self.assertGreater(len(players), len(unmatched))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+"""
+
+# tests/test_position.py
+
+"""
+
+import unittest
+
+from namematcher.position import base_positions
+
+
+class Position_test(unittest.TestCase):
+    """
+    Tests position
+
+    """
+    def test_base_positions(self):
+        """
+
+        Returns:
+
+        """
+        self.assertEqual(base_positions('WR'), {'WR'})
+        self.assertEqual(base_positions('DEF'), {'DST'})
+        self.assertEqual(base_positions('Def'), {'DST'})
+        self.assertEqual(base_positions('PK'), {'K'})
+        self.assertEqual(base_positions('DE,DT'), {'DL'})
+        self.assertEqual(base_positions('WR/TE'), {'WR', 'TE'})
+        self.assertEqual(base_positions('EDGE'), {'DL', 'LB'})
+        self.assertEqual(base_positions('D/ST'), {'DST'})
+        self.assertEqual(base_positions('d/st'), {'DST'})
+        self.assertEqual(base_positions('D/ST,K'), {'DST', 'K'})
+        self.assertEqual(base_positions('XX'), frozenset())
+        self.assertEqual(base_positions(None), frozenset())
+        self.assertEqual(base_positions('PK', {'PK': ('P', 'K')}), {'P', 'K'})
+
+
+if __name__ == '__main__':
+    unittest.main()
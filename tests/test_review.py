@@ -0,0 +1,173 @@
+"""
+
+# tests/test_review.py
+
+"""
+
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from namematcher.cache import MatchCache
+from namematcher.db import setup
+from namematcher.match import extract_many, read_input
+from namematcher.review import (LineReader, ReviewQueue, get_queue,
+                                shared_reader)
+from namematcher.xref import Site
+
+
+DB_FILE = os.path.join(os.path.dirname(__file__), '..', 'namematcher.sqlite')
+
+
+def scripted(answers, **kwargs):
+    """
+    ReviewQueue answering from a string
+
+    """
+    return ReviewQueue(reader=LineReader(stream=io.StringIO(answers),
+                                         output=io.StringIO()), **kwargs)
+
+
+class Review_test(unittest.TestCase):
+    """
+    Tests review
+
+    """
+    def setUp(self):
+        self.names = ['Jamaal Charles', 'DeAndre Hopkins', 'Odell Beckham',
+                      'Jamal Lewis', 'Trey Hopkins']
+
+    def test_extract_many(self):
+        """
+
+        Returns:
+
+        """
+        queries = ['Jamal Charles', 'Deandre Hopkins', 'Jamal Charles']
+        found = dict(extract_many(queries, self.names, limit=2, workers=1))
+        self.assertEqual(list(found), ['Jamal Charles', 'Deandre Hopkins'])
+        self.assertEqual(found['Jamal Charles'][0][0], 'Jamaal Charles')
+        self.assertEqual(len(found['Deandre Hopkins']), 2)
+        pooled = dict(extract_many(queries, self.names, limit=2, workers=2,
+                                   chunksize=1))
+        self.assertEqual(pooled, found)
+
+    def test_line_reader_timeout(self):
+        """
+
+        Returns:
+
+        """
+        read_fd, write_fd = os.pipe()
+        with os.fdopen(read_fd) as stream, os.fdopen(write_fd, 'w') as feed:
+            reader = LineReader(stream=stream, output=io.StringIO())
+            start = time.perf_counter()
+            self.assertEqual(reader.ask('? ', timeout=.1, default='x'), 'x')
+            self.assertLess(time.perf_counter() - start, 1)
+            # a late answer is not taken as the answer to the next prompt
+            feed.write('late\n')
+            feed.flush()
+            time.sleep(.1)
+            self.assertEqual(reader.ask('? ', timeout=.1, default='x'), 'x')
+            # answer once the next prompt is up, like a reviewer would
+            timer = threading.Timer(.2, lambda: (feed.write('2\n'),
+                                                 feed.flush()))
+            timer.start()
+            self.assertEqual(reader.ask('? ', timeout=2), '2')
+            timer.join()
+
+    def test_review(self):
+        """
+
+        Returns:
+
+        """
+        groups = [(['Jamal Charles', 'Deandre Hopkins', 'Trey Hopkns'],
+                   self.names, None)]
+        batches = []
+        review = scripted('1\n\n1\n', batch_size=1)
+        reviewed = review.review(groups, on_batch=batches.append)
+        self.assertEqual(reviewed[('Jamal Charles', None)][0],
+                         'Jamaal Charles')
+        self.assertEqual(reviewed[('Deandre Hopkins', None)], (None, 0))
+        self.assertEqual(reviewed[('Trey Hopkns', None)][0], 'Trey Hopkins')
+        self.assertEqual([len(b) for b in batches], [1, 1])
+        self.assertIn('[2/3] Deandre Hopkins', review.reader.output.getvalue())
+
+        reviewed = scripted('q\n').review(groups)
+        self.assertEqual(reviewed, {})
+        # end of input skips the rest
+        self.assertEqual(len(scripted('').review(groups)), 3)
+
+        self.assertIsNone(get_queue(True))
+        self.assertIsNone(get_queue(False))
+        self.assertIsInstance(get_queue('review'), ReviewQueue)
+        self.assertIs(get_queue(review), review)
+
+    def test_review_shared_stdin(self):
+        """
+
+        Returns:
+
+        """
+        groups = [(['Jamal Charles'], self.names, None)]
+        stdin = io.StringIO('1\n2\ny\n')
+        with mock.patch('sys.stdin', stdin), \
+                mock.patch('sys.stdout', io.StringIO()):
+            first = get_queue('review').review(groups)
+            second = get_queue('review').review(groups)
+            answer = read_input('? ', timeout=1)
+        self.assertIs(shared_reader(stdin), shared_reader(stdin))
+        self.assertEqual(first[('Jamal Charles', None)][0], 'Jamaal Charles')
+        self.assertNotIn(second[('Jamal Charles', None)][0],
+                         ('Jamaal Charles', None))
+        self.assertEqual(answer, 'y')
+
+
+class Review_site_test(unittest.TestCase):
+    """
+    Tests Site.match with a review queue on a copy of the database
+
+    """
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        dbfile = os.path.join(self.tmpdir, 'namematcher.sqlite')
+        shutil.copy(DB_FILE, dbfile)
+        base, self.eng, self.session = setup(database='sqlite',
+                                             database_file=dbfile)
+        self.x = Site(base=base, eng=self.eng, session=self.session,
+                      source_name='test')
+        self.cache = MatchCache(self.eng, base)
+
+    def tearDown(self):
+        self.session.close()
+        self.eng.dispose()
+        shutil.rmtree(self.tmpdir)
+
+    def test_match_review(self):
+        """
+
+        Returns:
+
+        """
+        players = self.x.get_base_players()
+        to_match = [{'source_player_name': nm} for nm in
+                    (players[0]['full_name'], 'Odel Beckam', 'Jamal Charls',
+                     'Odel Beckam', 'Zzyzx Quillfeather')]
+        review = scripted('1\n1\n\n', batch_size=1)
+        matched, duplicates, unmatched = self.x.match(
+            to_match, players, id_keys=(None, 'player_id'),
+            interactive=review, cache=self.cache)
+        self.assertEqual(len(matched), 4)
+        self.assertEqual([p['source_player_name'] for p in unmatched],
+                         ['Zzyzx Quillfeather'])
+        # one prompt per unique unresolved name
+        self.assertEqual(review.reader.output.getvalue().count('Match ['), 3)
+        raw, _ = self.cache.load('test')
+        self.assertEqual(set(raw), {'Odel Beckam', 'Jamal Charls'})
+        self.assertEqual(raw['Odel Beckam']['method'], 'interactive')
@@ -0,0 +1,106 @@
+# tests/test_score.py
+
+import logging
+import os
+import random
+import sqlite3
+import sys
+import unittest
+
+from fuzzywuzzy import fuzz, process
+
+from namematcher.choices import Choices, compile_name, wratio
+from namematcher.match import match_fuzzy, match_name
+from namematcher.score import FuzzywuzzyScorer, RapidfuzzScorer, get_scorer
+
+
+DB_FILE = os.path.join(os.path.dirname(__file__), '..', 'namematcher.sqlite')
+
+
+class Score_test(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        random.seed(0)
+        with sqlite3.connect(DB_FILE) as conn:
+            names = [row[0] for row in
+                     conn.execute('SELECT full_name FROM player')]
+        cls.names = random.sample(names, 400) + ['Michael Thomas']
+        cls.choices = Choices(cls.names)
+
+    def setUp(self):
+        self.queries = ['Michael Thomas', 'Thomas, Michael', 'Mike Thomas Jr.',
+                        'Beckham', 'Ted Ginn Jr.', 'Jaguars DST', "D'Andre",
+                        'Michael Thomas Thomas']
+        self.queries += [nm[:-2] for nm in random.sample(self.names, 5)]
+
+    def test_wratio_cutoff(self):
+        '''
+        scores that reach the cutoff are exact, others stay below it
+        '''
+        for query in self.queries:
+            for nm in self.names[:100]:
+                score = fuzz.WRatio(query, nm)
+                for cutoff in (50, 86, 90, 96):
+                    cut = wratio(compile_name(query), compile_name(nm), cutoff)
+                    if score >= cutoff:
+                        self.assertEqual(cut, score, (query, nm, cutoff))
+                    else:
+                        self.assertLess(cut, cutoff, (query, nm, cutoff))
+
+    def test_extract_one_cutoff(self):
+        scorer = get_scorer()
+        self.assertIsInstance(scorer, FuzzywuzzyScorer)
+        for query in self.queries:
+            for cutoff in (0, 90):
+                self.assertEqual(
+                    scorer.extract_one(query, self.choices,
+                                       score_cutoff=cutoff),
+                    process.extractOne(query, self.names,
+                                       score_cutoff=cutoff))
+
+    def test_top(self):
+        scorer = get_scorer()
+        for query in self.queries:
+            for cutoff in (0, 85):
+                self.assertEqual(
+                    scorer.top(query, self.choices, limit=4,
+                               score_cutoff=cutoff),
+                    scorer.top(query, self.names, limit=4,
+                               score_cutoff=cutoff))
+
+    def test_rapidfuzz(self):
+        try:
+            scorer = get_scorer('rapidfuzz')
+        except ImportError:
+            self.skipTest('rapidfuzz not installed')
+        self.assertIsInstance(scorer, RapidfuzzScorer)
+        for match_from in (self.names, self.choices):
+            self.assertEqual(
+                match_fuzzy('Michael Thomas', match_from, thresh=90,
+                            scorer=scorer),
+                ('Michael Thomas', 100))
+            self.assertEqual(
+                match_fuzzy('Zzyzx Qwerty', match_from, thresh=90,
+                            scorer=scorer),
+                (None, 0))
+            self.assertEqual(match_name('Thomas, Michael', match_from,
+                                        scorer='rapidfuzz'),
+                             'Michael Thomas')
+            self.assertEqual(len(scorer.extract('Michael', match_from,
+                                                limit=3)), 3)
+            found = scorer.top('Michael Thomas', match_from, limit=3,
+                               score_cutoff=80)
+            self.assertEqual(found[0], ('Michael Thomas', 100))
+            self.assertTrue(all(score >= 80 for _, score in found))
+
+    def test_get_scorer(self):
+        scorer = FuzzywuzzyScorer()
+        self.assertIs(get_scorer(scorer), scorer)
+        with self.assertRaises(ValueError):
+            get_scorer('xxx')
+
+
+if __name__=='__main__':
+    logging.basicConfig(stream=sys.stdout, level=logging.INFO)
+    unittest.main()
@@ -0,0 +1,120 @@
+# tests/test_snapshot.py
+
+import copy
+import logging
+import os
+import pickle
+import sys
+import unittest
+
+from namematcher.db import setup
+from namematcher.snapshot import Record, Snapshot, Watermark, checksum
+from namematcher.xref import row2dict
+
+
+DB_FILE = os.path.join(os.path.dirname(__file__), '..', 'namematcher.sqlite')
+
+
+class Snapshot_test(unittest.TestCase):
+
+    def setUp(self):
+        self.base, self.eng, self.session = setup(database='sqlite',
+                                                  database_file=DB_FILE)
+        self.Player = self.base.classes.player
+        self.PlayerXref = self.base.classes.player_xref
+
+    def tearDown(self):
+        self.session.close()
+        self.eng.dispose()
+
+    def test_load(self):
+        snapshot = Snapshot.load(self.session, self.Player.__table__)
+        players = self.session.query(self.Player).all()
+        self.assertEqual(len(snapshot), len(players))
+        self.assertEqual(snapshot['player_id'],
+                         [p.player_id for p in players])
+        self.assertEqual(snapshot.records(),
+                         [row2dict(p) for p in players])
+
+    def test_load_where(self):
+        table = self.PlayerXref.__table__
+        snapshot = Snapshot.load(self.session, table, table.c.source == 'pff')
+        self.assertEqual(set(snapshot['source']), {'pff'})
+        snapshot = Snapshot.load(self.session, table, table.c.source == 'xxx')
+        self.assertEqual(len(snapshot), 0)
+        self.assertEqual(snapshot.records(), [])
+        self.assertIn('source_player_name', snapshot.columns)
+
+    def test_rows(self):
+        snapshot = Snapshot.load(self.session, self.Player.__table__)
+        rows = snapshot.rows('full_name', 'primary_pos')
+        self.assertEqual(rows[0], (snapshot['full_name'][0],
+                                   snapshot['primary_pos'][0]))
+        mask = [pos == 'QB' for pos in snapshot['primary_pos']]
+        self.assertEqual({pos for _, pos in
+                          snapshot.rows('full_name', 'primary_pos', mask=mask)},
+                         {'QB'})
+        self.assertEqual(len(snapshot.records(mask=mask)), sum(mask))
+
+
+    def test_watermark(self):
+        table = self.PlayerXref.__table__
+        where = table.c.source == 'pff'
+        snapshot = Snapshot.load(self.session, table, where)
+        mark = Watermark.load(self.session, table, 'player_xref_id', where)
+        self.assertEqual(snapshot.watermark('player_xref_id'), mark)
+        self.assertEqual(mark.count, len(snapshot))
+        self.assertEqual(Snapshot(columns={'id': []}).watermark('id'),
+                         Watermark(0, None))
+
+    def test_checksum(self):
+        table = self.Player.__table__
+        query = table.select().order_by(table.c.player_id)
+        self.assertEqual(checksum(self.session, query),
+                         checksum(self.session, query))
+        self.assertNotEqual(checksum(self.session, query),
+                            checksum(self.session, query.limit(10)))
+
+    def test_extend(self):
+        snapshot = Snapshot.load(self.session, self.Player.__table__)
+        head, tail = snapshot.tail(0), snapshot.tail(10)
+        self.assertEqual(len(tail), len(snapshot) - 10)
+        self.assertTrue(snapshot.startswith(head))
+        self.assertFalse(tail.startswith(snapshot))
+        first = Snapshot(columns={k: col[:10] for k, col in
+                                  snapshot.columns.items()})
+        self.assertTrue(snapshot.startswith(first))
+        first.extend(tail)
+        self.assertEqual(first.records(), snapshot.records())
+
+    def test_compact(self):
+        snapshot = Snapshot.load(self.session, self.Player.__table__)
+        records = snapshot.compact()
+        players = self.session.query(self.Player).all()
+        self.assertEqual(len(records), len(players))
+        record, player = records[0], players[0]
+        self.assertIsInstance(record, Record)
+        self.assertEqual(record, {c.name: getattr(player, c.name)
+                                  for c in player.__table__.columns})
+        self.assertIsInstance(record['player_id'], int)
+        self.assertEqual(record.get('nope', 'x'), 'x')
+        self.assertFalse(hasattr(record, '__dict__'))
+
+        record['mfl_id'] = 1
+        record['full_name'] = 'Renamed Player'
+        self.assertEqual(list(record)[-1], 'mfl_id')
+        self.assertEqual(snapshot['full_name'][0], player.full_name)
+        for other in (copy.deepcopy(record), record.copy(),
+                      pickle.loads(pickle.dumps(record))):
+            self.assertEqual(other, record)
+            self.assertIsNot(other, record)
+        del record['mfl_id']
+        self.assertNotIn('mfl_id', record)
+        with self.assertRaises(KeyError):
+            record['mfl_id']
+        self.assertEqual(len(snapshot.compact(mask=[True, False])), 1)
+
+
+if __name__=='__main__':
+    logging.basicConfig(stream=sys.stdout, level=logging.INFO)
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+
+# tests/test_stats.py
+
+"""
+
+import unittest
+
+from namematcher.stats import MatchStats, Reservoir, percentile
+
+
+class Stats_test(unittest.TestCase):
+    """
+    Tests stats
+
+    """
+    def test_percentile(self):
+        """
+
+        Returns:
+
+        """
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile(values, 100), 100)
+        self.assertIsNone(percentile([], 50))
+
+    def test_reservoir(self):
+        """
+
+        Returns:
+
+        """
+        r = Reservoir(size=10)
+        for i in range(1000):
+            r.add(i)
+        self.assertEqual(r.count, 1000)
+        self.assertEqual(len(r.sample), 10)
+        self.assertEqual(r.summary()['mean'], 499.5)
+
+    def test_match_stats(self):
+        """
+
+        Returns:
+
+        """
+        stats = MatchStats()
+        stats({'name': 'a', 'outcome': 'direct', 'confidence': 100,
+               'elapsed': .001, 'timings': {'direct': .001},
+               'candidates': None, 'cache_hit': None})
+        stats({'name': 'b', 'outcome': 'fuzzy', 'confidence': 92,
+               'elapsed': .01, 'timings': {'direct': .001, 'cache': .001,
+                                           'fuzzy': .008},
+               'candidates': 12, 'cache_hit': False})
+        stats.record_batch('prefuzz', .5, 10)
+        summary = stats.summary()
+        self.assertEqual(summary['records'], 2)
+        self.assertEqual(summary['outcomes']['fuzzy'], 1)
+        self.assertEqual(summary['stages']['direct']['count'], 2)
+        self.assertEqual(summary['candidates']['mean'], 12)
+        self.assertEqual(summary['cache_hit_rate'], 0)
+        self.assertEqual(summary['batch']['prefuzz']['count'], 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
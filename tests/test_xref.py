@@ -5,19 +5,41 @@
 """
 
 from collections import defaultdict
+import copy
 import logging
+import os
 import random
+import shutil
+import sqlite3
 import sys
+import tempfile
 import unittest
 
-from playermatcher.db import setup
-from playermatcher.xref import Site
-from sportscraper.utility import rand_dictitem
+from namematcher.cache import MatchCache
+from namematcher.db import setup
+from namematcher.xref import Site, add_xrefs, row2dict
 
 
 logger = logging.getLogger()
 logger.level = logging.INFO
 
+DB_FILE = os.path.join(os.path.dirname(__file__), '..', 'namematcher.sqlite')
+
+
+def rand_dictitem(dict_to_sample):
+    """
+    Gets random item from dict
+
+    Args:
+        d(dict):
+
+    Returns:
+        tuple: dict key and value
+
+    """
+    k = random.choice(list(dict_to_sample.keys()))
+    return (k, dict_to_sample[k])
+
 
 class Site_test(unittest.TestCase):
     """
@@ -30,7 +52,7 @@ class Site_test(unittest.TestCase):
         Returns:
 
         """
-        base, eng, session = setup(database='sqlite')
+        base, eng, session = setup(database='sqlite', database_file=DB_FILE)
         self.x = Site(base=base, eng=eng, session=session)
         stream_handler = logging.StreamHandler(sys.stdout)
         logger.addHandler(stream_handler)
@@ -206,6 +228,59 @@ class Site_test(unittest.TestCase):
         self.assertIn('player_id', player.keys())
 
 
+    def test_player_snapshot(self):
+        """
+
+        Returns:
+
+        """
+        Player = self.x.Player
+        players = self.x.session.query(Player).all()
+        self.assertEqual(self.x.get_base_players(),
+                         [row2dict(p) for p in players])
+        self.assertEqual(self.x.get_base_playernamepos(),
+                         [(p.full_name, p.primary_pos) for p in players])
+        mfl_players = self.x.session.query(Player) \
+            .filter(Player.mfl_player_id > 0).all()
+        self.assertEqual(self.x.get_mfl_players(),
+                         [row2dict(p) for p in mfl_players])
+        self.assertEqual(self.x.get_mfl_playernames(),
+                         [p.full_name for p in mfl_players])
+        self.assertIs(self.x.get_player_snapshot(),
+                      self.x.get_player_snapshot())
+
+    def test_compact(self):
+        """
+
+        Returns:
+
+        """
+        x = Site(base=self.x.base, eng=self.x.eng, session=self.x.session,
+                 source_name='pff', compact=True)
+        players = x.get_base_players()
+        self.assertEqual([{k: str(v) for k, v in p.items()} for p in players],
+                         self.x.get_base_players())
+        self.assertIsInstance(players[0]['player_id'], int)
+        self.assertEqual(len(x.get_mfl_players()),
+                         len(self.x.get_mfl_players()))
+        to_match = x.get_source_players()
+        matched, _, _ = x.match_base(copy.deepcopy(to_match), blocking=True)
+        self.assertGreater(len(matched), 0)
+        self.assertIsInstance(matched[0]['player_id'], int)
+
+    def test_get_name_index(self):
+        """
+
+        Returns:
+
+        """
+        match_from = self.x.get_base_players()
+        idx = self.x.get_name_index(match_from)
+        self.assertIs(idx, self.x.get_name_index(match_from))
+        player = random.choice(match_from)
+        self.assertIn(player, idx[player['full_name']])
+        self.assertEqual(sum(len(v) for v in idx.values()), len(match_from))
+
     def test_make_source_based(self):
         """
 
@@ -230,6 +305,42 @@ class Site_test(unittest.TestCase):
             self.assertIsFalse(bool(source_based))
 
 
+    def test_make_source_based_scan(self):
+        """
+
+        Returns:
+
+        """
+        def scan(players, source_keys, key):
+            based = {}
+            for k in source_keys:
+                matches = [p for p in players if k == key(p)]
+                if matches:
+                    based[k] = matches
+            return based
+
+        self.x.source_name = 'pff'
+        names = self.x.get_source_playernames()[:200]
+        namepos = self.x.get_source_playernamepos()[:200] + \
+            [(p['full_name'], p['primary_pos'])
+             for p in self.x.get_mfl_players()[:20]]
+        by_name = lambda p: p['full_name']
+        by_namepos = lambda p: (p['full_name'], p['primary_pos'])
+        for make, players in ((self.x.make_source_based,
+                               self.x.get_base_players()),
+                              (self.x.make_source_mfld,
+                               self.x.get_mfl_players())):
+            expected = scan(players, names, by_name)
+            self.assertEqual(make(names), expected)
+            self.assertEqual(list(make(names)), list(expected))
+            # generators are accepted, as with the old scan
+            self.assertEqual(make(iter(names)), expected)
+            expected = scan(players, namepos, by_namepos)
+            self.assertGreater(len(expected), 0)
+            self.assertEqual(make(namepos, dict_key='namepos'), expected)
+            self.assertEqual(make((k for k in namepos), dict_key='namepos'),
+                             expected)
+
     def test_make_source_mfld(self):
         """
 
@@ -270,6 +381,130 @@ class Site_test(unittest.TestCase):
         logging.error(duplicates)
         logging.error(unmatched)
 
+    def test_match_iter(self):
+        """
+
+        Returns:
+
+        """
+        self.x.source_name = 'pff'
+        to_match = self.x.get_source_players()
+        match_from = self.x.get_base_players()
+        before = copy.deepcopy(to_match)
+        results = list(self.x.match_iter(iter(to_match), match_from,
+                                         blocking=True, chunksize=50))
+        self.assertEqual(to_match, before)
+        players, duplicates, unmatched = self.x.match(to_match, match_from,
+                                                      blocking=True)
+        self.assertEqual([r for s, r, _ in results if s == 'matched'], players)
+        self.assertEqual({r['source_player_name']: m for s, r, m in results
+                          if s == 'duplicate'}, duplicates)
+        self.assertEqual([r for s, r, _ in results if s == 'unmatched'],
+                         unmatched)
+        self.assertEqual(list(self.x.match_iter(iter(to_match), match_from,
+                                                blocking=True, stats=True)),
+                         results)
+
+    def test_match_stats(self):
+        """
+
+        Returns:
+
+        """
+        self.x.source_name = 'pff'
+        to_match = self.x.get_source_players()
+        events = []
+        players, duplicates, unmatched, stats = self.x.match_base(
+            to_match, blocking=True, stats=True, hook=events.append)
+        summary = stats.summary()
+        self.assertEqual(summary['records'], len(to_match))
+        self.assertEqual(len(events), len(to_match))
+        self.assertEqual(len(players),
+                         sum(summary['outcomes'][k] for k in
+                             ('direct', 'alias', 'cached', 'fuzzy',
+                              'interactive')))
+        self.assertEqual(len(unmatched), summary['outcomes']['unmatched'])
+        self.assertGreater(summary['candidates']['count'], 0)
+
+    def test_top_matches(self):
+        """
+
+        Returns:
+
+        """
+        players = self.x.get_base_players()
+        found = self.x.top_matches('Michael Thomas', players, limit=3,
+                                   score_cutoff=80)
+        thomases = [p for p in players if p['full_name'] == 'Michael Thomas']
+        self.assertGreater(len(thomases), 1)
+        self.assertEqual([c['record'] for c in found[:len(thomases)]],
+                         thomases)
+        self.assertEqual({c['score'] for c in found[:len(thomases)]}, {100})
+        self.assertEqual(found[0]['id'], thomases[0]['player_id'])
+        self.assertTrue(all(c['score'] >= 80 for c in found))
+        scores = [c['score'] for c in found]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual(
+            [(c['name'], c['score']) for c in
+             self.x.top_matches('Micheal Tomas', players, limit=3,
+                                score_cutoff=80, blocking=True)],
+            [(c['name'], c['score']) for c in
+             self.x.top_matches('Micheal Tomas', players, limit=3,
+                                score_cutoff=80)])
+        self.assertEqual(self.x.top_matches('Zzyzx', players,
+                                            score_cutoff=95), [])
+
+    def test_match_position(self):
+        """
+
+        Returns:
+
+        """
+        self.x.source_name = 'pff'
+        to_match = self.x.get_source_players()
+        players, duplicates, unmatched = self.x.match_base(
+            copy.deepcopy(to_match), blocking=True)
+        pos_players, pos_duplicates, pos_unmatched = self.x.match_base(
+            copy.deepcopy(to_match), blocking=True,
+            pos_key_to='source_player_position')
+        self.assertLess(len(pos_duplicates), len(duplicates))
+        self.assertLessEqual(len(pos_unmatched), len(unmatched))
+        self.assertGreater(len(pos_players), len(players))
+
+    def test_match_assignment(self):
+        """
+
+        Returns:
+
+        """
+        self.x.source_name = 'pff'
+        to_match = self.x.get_source_players()
+        players, duplicates, unmatched, stats = self.x.match_base(
+            copy.deepcopy(to_match), blocking=True, assignment=True,
+            pos_key_to='source_player_position', stats=True)
+        self.assertEqual(len(players) + len(unmatched) +
+                         sum(1 for p in to_match
+                             if p['source_player_name'] in duplicates),
+                         len(to_match))
+        ids = [p['player_id'] for p in players]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(stats.batch['assign']['count'], len(to_match))
+        self.assertEqual(sum(stats.outcomes.values()), len(to_match))
+
+        thomases = [p for p in self.x.get_base_players()
+                    if p['full_name'] == 'Michael Thomas']
+        to_match = [{'source_player_name': 'Michael Thomas'}
+                    for _ in thomases]
+        for n in (1, len(thomases)):
+            players, duplicates, unmatched = self.x.match_base(
+                copy.deepcopy(to_match[:n]), assignment=True)
+            self.assertEqual(players, [])
+            self.assertEqual(duplicates, {'Michael Thomas': thomases})
+            self.assertEqual(unmatched, [])
+        with self.assertRaises(ValueError):
+            self.x.match_base(copy.deepcopy(to_match), assignment=True,
+                              interactive='review')
+
     def test_match_base(self):
         """
 
@@ -303,5 +538,184 @@ class Site_test(unittest.TestCase):
         logging.error(unmatched)
 
 
+class Add_xrefs_test(unittest.TestCase):
+    """
+    Tests add_xrefs on a copy of the database
+
+    """
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        dbfile = os.path.join(self.tmpdir, 'namematcher.sqlite')
+        shutil.copy(DB_FILE, dbfile)
+        self.base, self.eng, self.session = setup(database='sqlite',
+                                                  database_file=dbfile)
+        self.PlayerXref = self.base.classes.player_xref
+
+    def tearDown(self):
+        self.session.close()
+        self.eng.dispose()
+        shutil.rmtree(self.tmpdir)
+
+    def test_add_xrefs(self):
+        """
+
+        Returns:
+
+        """
+        existing = self.session.query(self.PlayerXref) \
+            .filter(self.PlayerXref.source == 'pff').first()
+        records = [
+            {'player_id': existing.player_id, 'source': 'pff',
+             'source_player_id': existing.source_player_id,
+             'source_player_name': existing.source_player_name,
+             'source_player_position': existing.source_player_position},
+            {'player_id': 1, 'source': 'test', 'source_player_id': 'a',
+             'source_player_name': 'Joe Thomas',
+             'source_player_position': 'OL'},
+            {'player_id': 2, 'source': 'test', 'source_player_id': 'b',
+             'source_player_name': 'Michael Thomas',
+             'source_player_position': 'WR'},
+            {'player_id': 2, 'source': 'test', 'source_player_id': 'b',
+             'source_player_name': 'Michael Thomas',
+             'source_player_position': 'WR'},
+        ]
+        result = add_xrefs(records, self.base, self.session)
+        self.assertEqual(result, {'inserted': 2, 'skipped': 2})
+        self.session.commit()
+        added = self.session.query(self.PlayerXref) \
+            .filter(self.PlayerXref.source == 'test').all()
+        self.assertEqual(sorted(p.source_player_id for p in added), ['a', 'b'])
+        result = add_xrefs(records, self.base, self.session)
+        self.assertEqual(result, {'inserted': 0, 'skipped': 4})
+        self.assertEqual(add_xrefs([], self.base, self.session),
+                         {'inserted': 0, 'skipped': 0})
+        for missing in ({}, {'source_player_id': None},
+                        {'source_player_id': 'None'}):
+            record = dict(records[1], source_player_id='c',
+                          source_player_name='No Id')
+            record.update(missing)
+            if not missing:
+                del record['source_player_id']
+            with self.assertRaises(ValueError):
+                add_xrefs([records[1], record], self.base, self.session)
+
+
+class Refresh_test(unittest.TestCase):
+    """
+    Tests Site.refresh on a copy of the database
+
+    """
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.dbfile = os.path.join(self.tmpdir, 'namematcher.sqlite')
+        shutil.copy(DB_FILE, self.dbfile)
+        base, self.eng, self.session = setup(database='sqlite',
+                                             database_file=self.dbfile)
+        self.x = Site(base=base, eng=self.eng, session=self.session,
+                      source_name='pff')
+
+    def tearDown(self):
+        self.session.close()
+        self.eng.dispose()
+        shutil.rmtree(self.tmpdir)
+
+    def execute(self, sql, *params):
+        with sqlite3.connect(self.dbfile) as conn:
+            conn.execute(sql, params)
+
+    def add_player(self, name):
+        first, last = name.split()
+        self.execute("INSERT INTO player (player_id, first_name, last_name, "
+                     "full_name, pos, primary_pos) SELECT max(player_id) + 1, "
+                     "?, ?, ?, 'WR', 'WR' FROM player", first, last, name)
+
+    def test_refresh_appended(self):
+        """
+
+        Returns:
+
+        """
+        players = self.x.get_base_players()
+        source_players = self.x.get_source_players()
+        n, n_source = len(players), len(source_players)
+        names = self.x.get_name_index(players)
+        ngrams = self.x.get_ngram_index(players)
+        self.assertEqual(self.x.refresh(),
+                         {'player': 'unchanged',
+                          'player_xref.pff': 'unchanged'})
+
+        self.add_player('Zzyzx Quillfeather')
+        self.execute("INSERT INTO player_xref (player_id, source, "
+                     "source_player_id, source_player_name, "
+                     "source_player_position) VALUES (1, 'pff', 'new1', "
+                     "'Zzyzx Quillfeather', 'WR')")
+        self.assertEqual(self.x.refresh(),
+                         {'player': 'appended',
+                          'player_xref.pff': 'appended'})
+        self.assertIs(self.x.get_base_players(), players)
+        self.assertEqual(len(players), n + 1)
+        self.assertEqual(len(self.x.get_source_players()), n_source + 1)
+        self.assertEqual(len(self.x.get_player_snapshot()), n + 1)
+        self.assertIs(self.x.get_name_index(players), names)
+        self.assertIn('Zzyzx Quillfeather', names)
+        self.assertIs(self.x.get_ngram_index(players), ngrams)
+        self.assertIn('Zzyzx Quillfeather',
+                      ngrams.candidates('Zzyzx Quilfeather', 90))
+
+        to_match = [{'source_player_name': 'Zzyzx Quilfeather'}]
+        matched, _, _ = self.x.match_base(to_match, blocking=True)
+        self.assertEqual(matched[0]['player_id'], players[-1]['player_id'])
+        self.assertEqual(self.x.get_base_players(), Site(
+            base=self.x.base, eng=self.eng,
+            session=self.session).get_base_players())
+
+    def test_refresh_reloaded(self):
+        """
+
+        Returns:
+
+        """
+        players = self.x.get_base_players()
+        self.x.get_source_players()
+        names = self.x.get_name_index(players)
+        player = players[0]
+        self.execute("UPDATE player SET full_name = 'Renamed Player' "
+                     "WHERE player_id = ?", player['player_id'])
+        self.assertEqual(self.x.refresh()['player'], 'unchanged')
+        self.assertEqual(self.x.refresh(full=True)['player'], 'reloaded')
+        players = self.x.get_base_players()
+        self.assertEqual(players[0]['full_name'], 'Renamed Player')
+        self.assertIsNot(self.x.get_name_index(players), names)
+
+        self.execute("DELETE FROM player_xref WHERE player_xref_id = "
+                     "(SELECT min(player_xref_id) FROM player_xref "
+                     "WHERE source = 'pff')")
+        self.add_player('Zzyzx Quillfeather')
+        changes = self.x.refresh()
+        self.assertEqual(changes, {'player': 'appended',
+                                   'player_xref.pff': 'reloaded'})
+        self.assertEqual(self.x.get_source_players(),
+                         self.x.get_xref_snapshot().records())
+
+    def test_refresh_cache(self):
+        """
+
+        Returns:
+
+        """
+        cache = MatchCache(self.eng, self.x.base)
+        to_match = [{'source_player_name': 'Patrick Mahomes'}]
+        self.x.match_base(to_match, cache=cache)
+        old = cache.fingerprint
+        self.execute("UPDATE player SET full_name = 'Renamed Player' "
+                     "WHERE player_id = (SELECT min(player_id) FROM player)")
+        self.assertEqual(self.x.refresh()['player'], 'unchanged')
+        self.assertEqual(cache.fingerprint, old)
+        self.assertEqual(self.x.refresh(full=True)['player'], 'reloaded')
+        self.assertNotEqual(cache.fingerprint, old)
+        self.assertEqual(cache.fingerprint, MatchCache(
+            self.eng, self.x.base).fingerprint)
+
+
 if __name__=='__main__':
     unittest.main()